@@ -12,6 +12,8 @@ from nlg.Grid.Grid import ListOfGrids
 
 __author__ = 'Fam Rashel <fam.rashel@fuji.waseda.jp>'
 __date__, __version__ = '22/08/2017', '0.10' # Creation
+__date__, __version__ = '18/10/2026', '0.11' # Add option -b: read the clusters from a binary file (see nlg/Cluster/ClusterFile.py).
+__date__, __version__ = '18/10/2026', '0.12' # With option -b, the clusters are kept in a compact store (see nlg/Cluster/ClusterStore.py).
 __description__ = """
 	Produce analogical grids from a list of clusters (or sequence of words).
 """
@@ -23,6 +25,7 @@ def read_argv():
 	this_description = __description__
 	this_usage = """
 	%(prog)s  <  FILE_OF_CLUSTERS
+	%(prog)s  -b  BINARY_FILE_OF_CLUSTERS
 	"""
 
 	parser = argparse.ArgumentParser(description=this_description, usage=this_usage)
@@ -35,6 +38,10 @@ def read_argv():
 	parser.add_argument('--pretty-print',
 						action='store', dest='pretty_print', type=str,
 						help='print the grids in the representation for HUMAN instead of SCRIPT format')
+	parser.add_argument('-b', '--binary',
+						action='store', type=str, default=None,
+						metavar='FILE',
+						help='read the clusters from FILE in binary format instead of text on the standard input')
 	parser.add_argument('-V', '--verbose',
                   action='store_true', dest='verbose', default=False,
                   help='runs in verbose mode')
@@ -47,7 +54,10 @@ if __name__ == '__main__':
 	options = read_argv()
 	t1 = time.time()
 	if options.verbose: print('# Reading clusters...', file=sys.stderr)
-	list_of_clusters = ListOfClusters.fromFile(sys.stdin)
+	if options.binary is None:
+		list_of_clusters = ListOfClusters.fromFile(sys.stdin)
+	else:
+		list_of_clusters = ListOfClusters.load(options.binary, compact=True)
 	# print list_of_strclusters								# Print clusters
 	if options.verbose:
 		print('# Building grids...', file=sys.stderr)
@@ -9,11 +9,19 @@ import argparse
 from nlg.Vector.Vectors import Vectors
 from nlg.Cluster.Cluster import ListOfClusters
 from nlg.Cluster.Words2Clusters.StrCluster import ListOfStrClusters
+import nlg.Cluster.Words2Clusters.StrCluster as StrCluster
+import nlg.DistanceCache as DistanceCache
 
 ###############################################################################
 
 __author__ = 'Fam Rashel <fam.rashel@fuji.waseda.jp>'
 __date__, __version__ = '03/09/2020', '0.10' # Creation
+__date__, __version__ = '18/10/2026', '0.11' # Add option -j: number of processes to verify the distance constraint.
+__date__, __version__ = '18/10/2026', '0.12' # Print the statistics of the distance cache in verbose mode.
+__date__, __version__ = '18/10/2026', '0.13' # Add option -C: sort the ratios of the clusters by median ratio and normalize them.
+__date__, __version__ = '18/10/2026', '0.14' # Add option -b: output the clusters into a binary file (see nlg/Cluster/ClusterFile.py).
+__date__, __version__ = '18/10/2026', '0.15' # Option -j also gives the number of threads of the clustering (C program).
+__date__, __version__ = '18/10/2026', '0.16' # Add option --reuse-distances: with -C, sort the ratios with the distances of the distance constraint.
 __description__ = 'Produce analogical clusters from a list of vectors.'
 
 ###############################################################################
@@ -36,6 +44,22 @@ def read_argv():
 	parser.add_argument('-M','--maximal_cluster_size',
 					action='store', type=int, default=None,
 					help = 'maximal size of clusters output (default: no limit)')
+	parser.add_argument('-j', '--workers',
+					action='store', type=int, default=1,
+					help='number of workers: threads for the clustering, processes to verify the distance constraint (default: %(default)s)')
+	parser.add_argument('-C', '--clean',
+					action='store_true', default=False,
+					help='sort the ratios in each cluster by closeness to median ratio and ' \
+							'normalize them (i.e., As are shorter than Bs)')
+	parser.add_argument('--reuse-distances',
+					action='store_true', default=False,
+					help='with -C, measure the distance between ratios A : B and C : D as d(A, C) + d(B, D), ' \
+							'reusing the distances computed for the distance constraint ' \
+							'(default: distance between the ratios written as strings)')
+	parser.add_argument('-b', '--binary',
+					action='store', type=str, default=None,
+					metavar='FILE',
+					help='write the clusters into FILE in binary format instead of text on the standard output')
 	parser.add_argument('-V', '--verbose',
                   action='store_true', dest='verbose', default=False,
                   help='runs in verbose mode')
@@ -55,6 +79,7 @@ def convert_time(duration):
 
 if __name__ == '__main__':
 	options = read_argv()
+	StrCluster.__reuse_distances__ = options.reuse_distances
 	t_start = time.time()
 	if options.verbose: print('# Reading words and their vector representations...', file=sys.stderr)
 	vectors = Vectors.fromListOfVectors(lines=sys.stdin)
@@ -66,13 +91,22 @@ if __name__ == '__main__':
 	list_of_clusters = ListOfClusters.fromVectors(distinguishable_vectors,
 			minimal_size=options.minimal_cluster_size,
 			maximal_size=options.maximal_cluster_size,
-			focus=options.focus)
+			verbose=options.verbose,
+			focus=options.focus,
+			workers=options.workers)
 	if options.verbose: print('# Add the indistinguishables...', file=sys.stderr)
 	list_of_clusters.set_indistinguishables(vectors.indistinguishables)
 	if options.verbose: print('# Checking distance constraints...', file=sys.stderr)
 	list_of_strclusters = ListOfStrClusters.fromListOfClusters(clusters=list_of_clusters,
 			minimal_size=options.minimal_cluster_size,
-			maximal_size=options.maximal_cluster_size)
-	print(list_of_strclusters)
+			maximal_size=options.maximal_cluster_size,
+			workers=options.workers,
+			clean=options.clean)
+	# With several workers, each process has its own cache.
+	if options.verbose and options.workers <= 1: print(DistanceCache.statistics(), file=sys.stderr)
+	if options.binary is None:
+		print(list_of_strclusters)
+	else:
+		list_of_strclusters.save(options.binary)
 	
 	if options.verbose: print(f'# {os.path.basename(__file__)} - Processing time: {(convert_time(time.time() - t_start))}', file=sys.stderr)
@@ -10,11 +10,21 @@ import nlg.Cluster.Words2Clusters.Words2Vectors as Words2Vectors
 
 from nlg.Cluster.Cluster import Cluster, ListOfClusters
 from nlg.Cluster.Words2Clusters.StrCluster import ListOfStrClusters
+from nlg.Cluster.Words2Clusters.IncrementalClustering import IncrementalClustering
+import nlg.Cluster.Words2Clusters.StrCluster as StrCluster
+import nlg.DistanceCache as DistanceCache
 
 ###############################################################################
 
 __author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
 __date__, __version__ = '22/08/2017', '0.10' # Creation
+__date__, __version__ = '18/10/2026', '0.11' # Add option -j: number of processes to verify the distance constraint.
+__date__, __version__ = '18/10/2026', '0.12' # Print the statistics of the distance cache in verbose mode.
+__date__, __version__ = '18/10/2026', '0.13' # Add option -C: sort the ratios of the clusters by median ratio and normalize them.
+__date__, __version__ = '18/10/2026', '0.14' # Add option -b: output the clusters into a binary file (see nlg/Cluster/ClusterFile.py).
+__date__, __version__ = '18/10/2026', '0.15' # Add option -I: incremental clustering (see nlg/Cluster/Words2Clusters/IncrementalClustering.py).
+__date__, __version__ = '18/10/2026', '0.16' # Option -j also gives the number of threads of the clustering (C program).
+__date__, __version__ = '18/10/2026', '0.17' # Add option --reuse-distances: with -C, sort the ratios with the distances of the distance constraint.
 __description__ = """
 	Create clusters from a list of words (or sequence of words).
 	CAUTION: each word should appear only once in the list.
@@ -37,32 +47,79 @@ def read_argv():
 	parser.add_argument('-M','--maximal_cluster_size',
 					action='store', type=int, default=None,
 					help = 'maximal size of clusters output (default: no limit)')
+	parser.add_argument('-j', '--workers',
+					action='store', type=int, default=1,
+					help='number of workers: threads for the clustering, processes to verify the distance constraint (default: %(default)s)')
+	parser.add_argument('-C', '--clean',
+					action='store_true', default=False,
+					help='sort the ratios in each cluster by closeness to median ratio and ' \
+							'normalize them (i.e., As are shorter than Bs)')
+	parser.add_argument('--reuse-distances',
+					action='store_true', default=False,
+					help='with -C, measure the distance between ratios A : B and C : D as d(A, C) + d(B, D), ' \
+							'reusing the distances computed for the distance constraint ' \
+							'(default: distance between the ratios written as strings)')
+	parser.add_argument('-b', '--binary',
+					action='store', type=str, default=None,
+					metavar='FILE',
+					help='write the clusters into FILE in binary format instead of text on the standard output')
+	parser.add_argument('-I', '--incremental',
+					action='store', type=str, default=None,
+					metavar='DIR',
+					help='keep the clusters in the directory DIR; if it already exists, ' \
+							'only cluster the new words and merge them with the clusters kept')
 	parser.add_argument('-V', '--verbose',
 					action='store_true', default=False,
 					help='runs in verbose mode')
-	return parser.parse_args()
+	options = parser.parse_args()
+	if options.incremental is not None and options.focus is not None:
+		parser.error('option -F is not available in incremental mode (-I)')
+	return options
 
 ###############################################################################
 
 if __name__ == '__main__':
 	options = read_argv()
+	StrCluster.__reuse_distances__ = options.reuse_distances
 	t1 = time.time()
-	if options.verbose: print('# Reading words and computing feature vectors (features=characters)...', file=sys.stderr)
-	words_and_vectors = Words2Vectors.FeatureVectors(Words2Vectors.Words(), char_features=True)
-	distinguishable_words_and_vectors = words_and_vectors.get_distinguishables()
-	if options.verbose:
-			print('# Clustering strings according to their feature vectors...', file=sys.stderr)
-			print(f'#\t- min cluster size: {options.minimal_cluster_size}', file=sys.stderr)
-			print(f'#\t- max cluster size: {options.maximal_cluster_size}', file=sys.stderr)
-	list_of_clusters = ListOfClusters.fromVectors(distinguishable_words_and_vectors,
-			minimal_size=options.minimal_cluster_size,
-			maximal_size=options.maximal_cluster_size,
-			focus=options.focus)
-	if options.verbose: print('# Adding indistinguishable strings...', file=sys.stderr)
-	list_of_clusters.set_indistinguishables(words_and_vectors.indistinguishables)
-	if options.verbose: print('# Checking distance constraint...', file=sys.stderr)
-	list_of_strclusters = ListOfStrClusters.fromListOfClusters(clusters=list_of_clusters,
-			minimal_size=options.minimal_cluster_size,
-			maximal_size=options.maximal_cluster_size)
-	print(list_of_strclusters)
+	if options.incremental is not None:
+		if options.verbose: print('# Incremental clustering in %s...' % options.incremental, file=sys.stderr)
+		clustering = IncrementalClustering(options.incremental,
+				minimal_size=options.minimal_cluster_size,
+				maximal_size=options.maximal_cluster_size,
+				clean=options.clean,
+				workers=options.workers,
+				verbose=options.verbose)
+		new_words = clustering.add(sys.stdin)
+		clustering.save()
+		if options.verbose: print('# %d new words, %d words in all.' % (new_words, len(clustering.words)), file=sys.stderr)
+		list_of_strclusters = clustering.strclusters()
+	else:
+		if options.verbose: print('# Reading words and computing feature vectors (features=characters)...', file=sys.stderr)
+		words_and_vectors = Words2Vectors.FeatureVectors(Words2Vectors.Words(), char_features=True)
+		distinguishable_words_and_vectors = words_and_vectors.get_distinguishables()
+		if options.verbose:
+				print('# Clustering strings according to their feature vectors...', file=sys.stderr)
+				print(f'#\t- min cluster size: {options.minimal_cluster_size}', file=sys.stderr)
+				print(f'#\t- max cluster size: {options.maximal_cluster_size}', file=sys.stderr)
+		list_of_clusters = ListOfClusters.fromVectors(distinguishable_words_and_vectors,
+				minimal_size=options.minimal_cluster_size,
+				maximal_size=options.maximal_cluster_size,
+				verbose=options.verbose,
+				focus=options.focus,
+				workers=options.workers)
+		if options.verbose: print('# Adding indistinguishable strings...', file=sys.stderr)
+		list_of_clusters.set_indistinguishables(words_and_vectors.indistinguishables)
+		if options.verbose: print('# Checking distance constraint...', file=sys.stderr)
+		list_of_strclusters = ListOfStrClusters.fromListOfClusters(clusters=list_of_clusters,
+				minimal_size=options.minimal_cluster_size,
+				maximal_size=options.maximal_cluster_size,
+				workers=options.workers,
+				clean=options.clean)
+	# With several workers, each process has its own cache.
+	if options.verbose and options.workers <= 1: print(DistanceCache.statistics(), file=sys.stderr)
+	if options.binary is None:
+		print(list_of_strclusters)
+	else:
+		list_of_strclusters.save(options.binary)
 	if options.verbose: print('# Processing time: ' + ('%.2f' % (time.time() - t1)) + 's', file=sys.stderr)
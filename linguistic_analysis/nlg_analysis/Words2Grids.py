@@ -15,6 +15,9 @@ from nlg.Grid.Grid import ListOfGrids
 
 __author__ = 'Fam Rashel <fam.rashel@fuji.waseda.jp>'
 __date__, __version__ = '22/08/2017', '0.10' # Creation
+__date__, __version__ = '18/10/2026', '0.11' # Add option -p: pipelined clustering and verification of the distance constraint.
+                                             # Add option -j: number of processes to verify the distance constraint.
+__date__, __version__ = '18/10/2026', '0.12' # Option -j also gives the number of threads of the clustering (C program).
 __description__ = """
 	Produce analogical grids from a list of words (or sequence of words).
 """
@@ -49,6 +52,12 @@ def read_argv():
 	parser.add_argument('--pretty-print',
 						action='store', dest='pretty_print', type=str,
 						help='print the grids in the representation for HUMAN instead of SCRIPT format')
+	parser.add_argument('-p', '--pipeline',
+						action='store_true', dest='pipeline', default=False,
+						help='verify the distance constraint on the clusters as soon as they are output by the clustering')
+	parser.add_argument('-j', '--workers',
+						action='store', dest='workers', type=int, default=1,
+						help='number of workers: threads for the clustering, processes to verify the distance constraint (default = %(default)s)')
 	parser.add_argument('-V', '--verbose',
                   action='store_true', dest='verbose', default=False,
                   help='runs in verbose mode')
@@ -67,16 +76,31 @@ if __name__ == '__main__':
 		print('# Clustering the words according to their feature vectors...', file=sys.stderr)
 		print(f'#\t- min cluster size: {options.minimal_cluster_size}', file=sys.stderr)
 		print(f'#\t- max cluster size: {options.maximal_cluster_size}', file=sys.stderr)
-	list_of_clusters = ListOfClusters.fromVectors(distinguishable_words_and_vectors,
-			minimal_size=options.minimal_cluster_size,
-			maximal_size=options.maximal_cluster_size,
-			focus=options.focus)
-	if options.verbose: print('# Add the indistinguishables...', file=sys.stderr)
-	list_of_clusters.set_indistinguishables(words_and_vectors.indistinguishables)
-	if options.verbose: print('# Checking distance constraints...', file=sys.stderr)
-	list_of_strclusters = ListOfStrClusters.fromListOfClusters(clusters=list_of_clusters,
-			minimal_size=options.minimal_cluster_size,
-			maximal_size=options.maximal_cluster_size)
+	if options.pipeline:
+		# Clustering and verification of the distance constraint run at the same time:
+		# the clusters are verified by the workers as soon as they are output by the C program.
+		if options.verbose: print('# Checking distance constraints while clustering...', file=sys.stderr)
+		list_of_strclusters = ListOfStrClusters.fromVectors(distinguishable_words_and_vectors,
+				indistinguishables=words_and_vectors.indistinguishables,
+				workers=options.workers,
+				minimal_size=options.minimal_cluster_size,
+				maximal_size=options.maximal_cluster_size,
+				verbose=options.verbose,
+				focus=options.focus)
+	else:
+		list_of_clusters = ListOfClusters.fromVectors(distinguishable_words_and_vectors,
+				minimal_size=options.minimal_cluster_size,
+				maximal_size=options.maximal_cluster_size,
+				verbose=options.verbose,
+				focus=options.focus,
+				workers=options.workers)
+		if options.verbose: print('# Add the indistinguishables...', file=sys.stderr)
+		list_of_clusters.set_indistinguishables(words_and_vectors.indistinguishables)
+		if options.verbose: print('# Checking distance constraints...', file=sys.stderr)
+		list_of_strclusters = ListOfStrClusters.fromListOfClusters(clusters=list_of_clusters,
+				minimal_size=options.minimal_cluster_size,
+				maximal_size=options.maximal_cluster_size,
+				workers=options.workers)
 	# print list_of_strclusters								# Print clusters
 	if options.verbose:
 		print('# Building grids...', file=sys.stderr)
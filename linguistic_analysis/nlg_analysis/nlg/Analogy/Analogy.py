@@ -9,13 +9,14 @@ flatten = chain.from_iterable
 
 import nlg.NlgSymbols as NlgSymbols
 from nlg.Cluster.Cluster import Cluster, ListOfClusters
-from _fast_distance import fast_distance
+from nlg.DistanceCache import distance
 
 ###############################################################################
 
 __author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
 
 __date__, __version__ = '28/08/2017', '0.10' # Creation
+__date__, __version__ = '18/10/2026', '0.11' # Use the shared distance cache (nlg.DistanceCache).
 
 __description__ = """
 	Class for analogies.
@@ -125,8 +126,8 @@ class Analogy(Cluster):
 		>>> Analogy.fromFile('abc : abd :: efg : efh').DistanceConstraint()
 		True
 		"""
-		return fast_distance(self.A, self.B) == fast_distance(self.C, self.D) and \
-				fast_distance(self.A, self.C) == fast_distance(self.B, self.D)
+		return distance(self.A, self.B) == distance(self.C, self.D) and \
+				distance(self.A, self.C) == distance(self.B, self.D)
 
 ################################################################################
 
@@ -1,4 +1,8 @@
 /* Copyright (c) 1999, Yves Lepage */
+/* 18/10/2026: added solvenlg_array: solve a batch of analogies in one call. */
+/* 18/10/2026: matrix4 allocated with its l4+2 rows; freematrix4 accepts the NULL matrix of an empty l4; anticonv freed before being reallocated. */
+/* 18/10/2026: added solve and verify on words encoded once (arrays of symbols, vocabularies); no more limit of 256 characters on utf8 equations. */
+/* 18/10/2026: the empty solution is the named constant emptysolution, compared by address before freeing a solution. */
 #define MODULE "nlg"
 #define TRACE 0
 #define CONTIGUITY 0
@@ -270,7 +274,7 @@ trace(("in  newmatrix4(%d,%d)\n",l4,maxsymbols))
 
    if ( l4 > 0 )
    {
-      result = (int **) calloc(l4+1,sizeof(int *)) ;
+      result = (int **) calloc(l4+2,sizeof(int *)) ;
       for ( i4 = 0 ; i4 <= l4+1 ; ++i4 )
       {
          result[i4] = (int *) calloc(maxsymbols,sizeof(int)) ;
@@ -292,49 +296,18 @@ void freematrix4(int **result, int l4)
 
 trace(("in  freematrix4(%d)\n",l4))
 
-   for ( i4 = 0 ; i4 <= l4+1 ; ++i4 )
+   if ( result )
    {
-      free(result[i4]) ;
+      for ( i4 = 0 ; i4 <= l4+1 ; ++i4 )
+      {
+         free(result[i4]) ;
+      } ;
+      free(result) ;
    } ;
-   free(result) ;
 
 trace(("out freematrix4(%d)\n",l4))
 }
-
-
-/*
- * Management of the solutions.
- */
-
-static int equalSolns(uchar **solns1, uchar **solns2)
-{
-   int result = 1 ;
-
-   if ( solns1 && solns2 )
-   {
-      int j = 0 ;
-
-      for ( j = 0 ; result && solns1[j] && solns2[j] ; ++j )
-			result = ( 0 == strcmp((uchar *)solns1[j],(uchar *)solns2[j]) ) ;
-      result = ! ( (solns1[j] && ! solns2[j]) || (! solns1[j] && solns2[j]) ) ;
-   }
-   else
-      result = ! ( (solns1 && ! solns2) || (! solns1 && solns2) ) ;
-   return result ;
-}
-
-static void freeSolns(uchar **solns)
-{
-	if ( solns )
-	{
-		int j = 0 ;
 
-		for ( j = 0 ; solns[j] ; ++j )
-			free(solns[j]) ;
-		free(solns) ;
-	} ;
-}
-
 /*
  * Verify the contiguity constraint.
  */
@@ -405,6 +378,8 @@ void traceanticonv(void)
 {
 	int is = 0 ;
 
+	if ( ! tracet )
+		return ;
 	for ( is = 0 ; is < maxsymbols ; ++is )
 		fprintf(stderr,"%d symbol = %c\n",is,anticonv[is]) ;
 }
@@ -513,8 +488,8 @@ trace(("in  initialisation(%s(%d),%s(%d),%s(%d))\n",word1,l1,word2,l2,word3,l3))
 	{
 		VERIFY(word1[i1]) ;
 #if CONTIGUITY
-		if ( 0 <= i1 && i1 < l1 && ! convsymbols[word1[i1]] )
-			convsymbols[word1[i1]] = ++maxsymbols ;
+		if ( 0 <= i1 && i1 < l1 && ! convsymbols[(unsigned char) word1[i1]] )
+			convsymbols[(unsigned char) word1[i1]] = ++maxsymbols ;
 #endif
 		matrix12[i1+1][1] = matrix13[i1+1][1] = i1 * VERCOST ;
 	} ;
@@ -522,8 +497,8 @@ trace(("in  initialisation(%s(%d),%s(%d),%s(%d))\n",word1,l1,word2,l2,word3,l3))
 	{
 		VERIFY(word2[i2]) ;
 #if CONTIGUITY
-		if ( 0 <= i2 && i2 < l2 && ! convsymbols[word2[i2]] )
-			convsymbols[word2[i2]] = ++maxsymbols ;
+		if ( 0 <= i2 && i2 < l2 && ! convsymbols[(unsigned char) word2[i2]] )
+			convsymbols[(unsigned char) word2[i2]] = ++maxsymbols ;
 #endif
 		matrix12[1][i2+1] = i2 * HORCOST ;
 	} ;
@@ -531,8 +506,8 @@ trace(("in  initialisation(%s(%d),%s(%d),%s(%d))\n",word1,l1,word2,l2,word3,l3))
 	{
 		VERIFY(word3[i3]) ;
 #if CONTIGUITY
-		if ( 0 <= i3 && i3 < l3 && ! convsymbols[word3[i3]] )
-			convsymbols[word3[i3]] = ++maxsymbols ;
+		if ( 0 <= i3 && i3 < l3 && ! convsymbols[(unsigned char) word3[i3]] )
+			convsymbols[(unsigned char) word3[i3]] = ++maxsymbols ;
 #endif
 		matrix13[1][i3+1] = i3 * HORCOST ;
 	} ;
@@ -545,6 +520,7 @@ trace(("in  initialisation(%s(%d),%s(%d),%s(%d))\n",word1,l1,word2,l2,word3,l3))
 			matrix13[i1+1][i3+1] = min3(diag(1,3,i1,i3),hori(1,3,i1,i3),vert(1,3,i1,i3)) ;
 	} ;
 #if CONTIGUITY
+	free(anticonv) ;
 	anticonv = (uchar *) calloc(maxsymbols+1,sizeof(uchar)) ;
 	for ( is = 0 ; is < MAXALPHABET ; ++is )
 		if ( convsymbols[is] )
@@ -564,15 +540,15 @@ trace(("in  initialisation(%s(%d),%s(%d),%s(%d))\n",word1,l1,word2,l2,word3,l3))
 
 	for ( i1 = l1 ; i1 >= 1 ; --i1 )
 	{
-		int c1 = convsymbols[word1[i1]] ;
+		int c1 = convsymbols[(unsigned char) word1[i1]] ;
 
 		for ( i2 = l2 ; i2 >= 1 ; --i2 )
 		{
-			int c2 = convsymbols[word2[i2]] ;
+			int c2 = convsymbols[(unsigned char) word2[i2]] ;
    
 			for ( i3 = l3 ; i3 >= 1 ; --i3 )
 			{
-				int c3 = convsymbols[word3[i3]] ;
+				int c3 = convsymbols[(unsigned char) word3[i3]] ;
 
 				for ( is = 0 ; is < maxsymbols ; ++is )
 				{
@@ -661,7 +637,7 @@ trace(("in  charconstraint(%s,%s,%s)\n",word1,word2,word3))
 		{
 			for ( si = word[i] ; *si ; ++si )
 			{				
-				int c = *si ;
+				int c = (unsigned char) *si ;
 			
 				alphabet[c] += 1 ;
 				if ( c < min )
@@ -675,7 +651,7 @@ trace(("mid charconstraint(%s,%s,%s) len = %d\n",word1,word2,word3,len[i]))
 		/* subtract char numbers from A */
 		for ( si = word[0] ; *si ; ++si )
 		{
-			int c = *si ;
+			int c = (unsigned char) *si ;
 			
 			alphabet[c] -= 1 ;
 			result = ( 0 <= alphabet[c] ) ;
@@ -709,7 +685,7 @@ trace(("out charconstraint(%s,%s,%s) = %d\n",word1,word2,word3,result))
 
 void updatematrix4(uchar *word4, int i4, int l4)
 {
-	int c4 = convsymbols[word4[i4]] ;
+	int c4 = convsymbols[(unsigned char) word4[i4]] ;
 	int is = 0 ;
 
 trace(("in  updatematrix4(word4[%d]=%c)\n",i4,c4))
@@ -733,6 +709,13 @@ trace(("out updatematrix4(word4[%d]=%c)\n",i4,c4))
 
 #define VERIFY(x,msg) trace(("mid %s\n",msg)) if (!(x)) goto ENDOFMOVE ;
 
+/*
+ * The empty solution returned by pr_mov (and asciisolvenlg) is not allocated:
+ * it is this constant, to be compared by address before freeing a solution.
+ */
+
+static uchar emptysolution[1] = "" ;
+
 static uchar *pr_mov(uchar *word1, uchar *word2, uchar *word3, uchar *word4, int l1, int l2, int l3)
 {
    int ll = (l2+l3-l1) ;
@@ -750,7 +733,7 @@ trace(("in  pr_mov(%s(%d),%s(%d),%s(%d),%s(%d))\n",word1,l1,word2,l2,word3,l3,"?
    {
       warning(MODULE,"pr_mov","TOO LONG!") ;
       free(result) ;
-      result = (uchar *) "" ;
+      result = emptysolution ;
       return result ;
    } ;
 
@@ -939,7 +922,7 @@ trace(("mid 8 pr_mov(%s,%s,%s) %d,%d,%d,%d\n", t3words,i1,i2,i3,i4))
 		free(result) ;
 trace(("mid 9 pr_mov(%s,%s,%s) %d,%d,%d,%d\n", t3words,i1,i2,i3,i4))
 		if ( 0 == l4 )
-			result = (uchar *) "" ;
+			result = emptysolution ;
 		else
 			result = (uchar *) NULL ;
 	} ;
@@ -1058,7 +1041,7 @@ if ( tracet )
 			if ( result && ! strcmp((uchar *) result,(uchar *) word4) )
 			{
 				xresult = 1 ;
-				if ( "" != result )
+				if ( emptysolution != result )
 					free(result) ;
 			} ;
 #if CONTIGUITY
@@ -1073,76 +1056,387 @@ trace(("out asciiverifnlg(%s,%s,%s,%s) = %d\n", (uchar *)word1,(uchar *)word2,(u
 	return xresult ;
 }
 
+/*
+ * Analogies between words encoded as arrays of symbols (see SYMBOLTABLE in utf8.h).
+ * The symbols of an equation are renumbered into one-byte codes 1, 2, ...
+ * before calling asciisolvenlg or asciiverifnlg:
+ * the number of symbols of a table is not limited,
+ * only the number of different symbols in B and C of one equation is (less than 256).
+ * A symbol of A (resp. D) which is not in B or C excludes any solution (resp. the verification),
+ * as the character inclusion constraint would.
+ */
+
+#define LAST_LOCALCODE	255
+
+static int localsize = 0 ;						/* size of localcode and localstamp */
+static unsigned char *localcode = NULL ;		/* code of a symbol in the current equation */
+static unsigned int *localstamp = NULL ;		/* equation in which the code of a symbol was given */
+static unsigned int localequation = 0 ;		/* number of the current equation */
+static int localsymbol[LAST_LOCALCODE+1] ;		/* symbol of each code */
+static uchar localwords[TERM_MAX][MAXWORD+1] ;	/* the words of the current equation, coded */
+
+/*
+ * Give codes to the symbols of B and C for a new equation.
+ * Returns 0 if there are too many different symbols (or a negative one).
+ */
+
+static int localencoding(int l2, int *word2, int l3, int *word3)
+{
+	int ncodes = 0 ;
+	int i = 0, maxsymbol = -1 ;
+	int *word[2] = { word2, word3 } ;
+	int len[2] = { l2, l3 } ;
+	int k = 0 ;
+
+	for ( k = 0 ; k < 2 ; ++k )
+		for ( i = 0 ; i < len[k] ; ++i )
+		{
+			if ( word[k][i] < 0 )
+				return 0 ;
+			if ( maxsymbol < word[k][i] )
+				maxsymbol = word[k][i] ;
+		} ;
+	if ( maxsymbol >= localsize )
+	{
+		int size = ( maxsymbol+1 > 2 * localsize ) ? maxsymbol+1 : 2 * localsize ;
+
+		free(localcode) ;
+		free(localstamp) ;
+		localcode = (unsigned char *) calloc(size,sizeof(unsigned char)) ;
+		localstamp = (unsigned int *) calloc(size,sizeof(unsigned int)) ;
+		if ( NULL == localcode || NULL == localstamp )
+			error(MODULE,"localencoding","out of memory") ;
+		localsize = size ;
+	} ;
+	if ( 0 == ++localequation )
+	{
+		memset(localstamp,0,localsize * sizeof(unsigned int)) ;
+		localequation = 1 ;
+	} ;
+
+	for ( k = 0 ; k < 2 ; ++k )
+		for ( i = 0 ; i < len[k] ; ++i )
+		{
+			int symbol = word[k][i] ;
+
+			if ( localstamp[symbol] != localequation )
+			{
+				if ( ncodes == LAST_LOCALCODE )
+				{
+					warning(MODULE,"localencoding","more than 255 different characters in an equation") ;
+					return 0 ;
+				} ;
+				localstamp[symbol] = localequation ;
+				localcode[symbol] = ++ncodes ;
+				localsymbol[ncodes] = symbol ;
+			} ;
+		} ;
+	return 1 ;
+}
+
+/*
+ * Code a word of the current equation into localwords[X].
+ * Returns 0 if a symbol of the word has no code.
+ */
+
+static int localword(int X, int l, int *word)
+{
+	int i = 0 ;
+
+	for ( i = 0 ; i < l ; ++i )
+	{
+		int symbol = word[i] ;
+
+		if ( symbol < 0 || symbol >= localsize || localstamp[symbol] != localequation )
+			return 0 ;
+		localwords[X][i] = localcode[symbol] ;
+	} ;
+	localwords[X][l] = 0 ;
+	return 1 ;
+}
+
+/*
+ * Call to solve an analogy
+ * (with arrays of symbols)
+ * Returns the symbols of the solution, with their number in l4, to be freed by the caller,
+ * or NULL if there is no solution.
+ */
+
+int *solvenlg_symbols(int l1, int *word1, int l2, int *word2, int l3, int *word3, int *l4)
+{
+	int *result = NULL ;
+	uchar *solution = NULL ;
+
+trace(("in  solvenlg_symbols(%d,%d,%d)\n",l1,l2,l3))
+
+	*l4 = 0 ;
+	if ( l1 > MAXWORD || l2 > MAXWORD || l3 > MAXWORD )
+		return result ;
+	if ( ! ( localencoding(l2,word2,l3,word3)
+		&& localword(A,l1,word1) && localword(B,l2,word2) && localword(C,l3,word3) ) )
+		return result ;
+
+	solution = asciisolvenlg(localwords[A],localwords[B],localwords[C]) ;
+	if ( NULL != solution )
+	{
+		int i = 0 ;
+
+		*l4 = strlen(solution) ;
+		result = (int *) calloc(*l4+1,sizeof(int)) ;
+		for ( i = 0 ; i < *l4 ; ++i )
+			result[i] = localsymbol[(unsigned char) solution[i]] ;
+		/* The empty solution may be the constant emptysolution (see pr_mov). */
+		if ( emptysolution != solution )
+			free(solution) ;
+	} ;
+
+trace(("out solvenlg_symbols(%d,%d,%d) = %d\n",l1,l2,l3,(NULL==result)?-1:*l4))
+
+	return result ;
+}
+
+/*
+ * Call to verify an analogy
+ * (with arrays of symbols)
+ */
+
+int verifnlg_symbols(int l1, int *word1, int l2, int *word2, int l3, int *word3, int l4, int *word4)
+{
+	int result = 0 ;
+
+trace(("in  verifnlg_symbols(%d,%d,%d,%d)\n",l1,l2,l3,l4))
+
+	if ( l1 > MAXWORD || l2 > MAXWORD || l3 > MAXWORD || l4 > MAXWORD )
+		return result ;
+	if ( localencoding(l2,word2,l3,word3)
+	  && localword(A,l1,word1) && localword(B,l2,word2) && localword(C,l3,word3) && localword(D,l4,word4) )
+		result = asciiverifnlg(localwords[A],localwords[B],localwords[C],localwords[D]) ;
+
+trace(("out verifnlg_symbols(%d,%d,%d,%d) = %d\n",l1,l2,l3,l4,result))
+
+	return result ;
+}
+
+/*
+ * Vocabularies: words encoded once into symbols, designated by their numbers (handles).
+ * The symbols of all the words are kept one after the other.
+ */
+
+struct nlgvocabulary {
+	SYMBOLTABLE *table ;
+	int nwords ;			/* number of words */
+	int wordcapacity ;		/* size of starts - 1 */
+	int *starts ;			/* first symbol of each word, plus the total number of symbols */
+	int symbolcapacity ;	/* size of symbols */
+	int *symbols ;			/* symbols of all the words */
+} ;
+
+static void *xrealloc(void *block, size_t size)
+{
+	void *result = realloc(block,size) ;
+
+	if ( NULL == result )
+		error(MODULE,"xrealloc","out of memory") ;
+	return result ;
+}
+
+NLGVOCABULARY *newnlgvocabulary(void)
+{
+	NLGVOCABULARY *result = (NLGVOCABULARY *) xrealloc(NULL,sizeof(NLGVOCABULARY)) ;
+
+	result->table = newsymboltable() ;
+	result->nwords = 0 ;
+	result->wordcapacity = 1024 ;
+	result->starts = (int *) xrealloc(NULL,(result->wordcapacity+1) * sizeof(int)) ;
+	result->starts[0] = 0 ;
+	result->symbolcapacity = 8 * 1024 ;
+	result->symbols = (int *) xrealloc(NULL,result->symbolcapacity * sizeof(int)) ;
+	return result ;
+}
+
+void freenlgvocabulary(NLGVOCABULARY *vocabulary)
+{
+	if ( NULL != vocabulary )
+	{
+		freesymboltable(vocabulary->table) ;
+		free(vocabulary->starts) ;
+		free(vocabulary->symbols) ;
+		free(vocabulary) ;
+	} ;
+}
+
+int nlgvocabulary_size(NLGVOCABULARY *vocabulary)
+{
+	return vocabulary->nwords ;
+}
+
+/*
+ * Add a word to a vocabulary, returns its handle.
+ * A word added twice has two handles.
+ */
+
+int nlgvocabulary_add(NLGVOCABULARY *vocabulary, char *word)
+{
+	int length = utf8length((unsigned char *) word) ;
+	int start = vocabulary->starts[vocabulary->nwords] ;
+
+trace(("in  nlgvocabulary_add(%s)\n",word))
+
+	if ( vocabulary->nwords == vocabulary->wordcapacity )
+	{
+		vocabulary->wordcapacity *= 2 ;
+		vocabulary->starts = (int *) xrealloc(vocabulary->starts,(vocabulary->wordcapacity+1) * sizeof(int)) ;
+	} ;
+	if ( start + length > vocabulary->symbolcapacity )
+	{
+		while ( start + length > vocabulary->symbolcapacity )
+			vocabulary->symbolcapacity *= 2 ;
+		vocabulary->symbols = (int *) xrealloc(vocabulary->symbols,vocabulary->symbolcapacity * sizeof(int)) ;
+	} ;
+	encodesymbols(vocabulary->table,(unsigned char *) word,vocabulary->symbols+start) ;
+	vocabulary->starts[++vocabulary->nwords] = start + length ;
+
+trace(("out nlgvocabulary_add(%s) = %d\n",word,vocabulary->nwords-1))
+
+	return vocabulary->nwords - 1 ;
+}
+
+#define isword(v,h)		(0 <= (h) && (h) < (v)->nwords)
+#define wordlength(v,h)	((v)->starts[(h)+1] - (v)->starts[h])
+#define wordsymbols(v,h)	((v)->symbols + (v)->starts[h])
+#define handle_arg(v,h)	wordlength(v,h),wordsymbols(v,h)
+
+/*
+ * Call to solve an analogy between words of a vocabulary
+ * Returns the solution as a newly allocated utf8 string, or NULL if there is no solution.
+ */
+
+char *solvenlg_handles(NLGVOCABULARY *vocabulary, int h1, int h2, int h3)
+{
+	char *result = NULL ;
+	int *symbols = NULL ;
+	int l4 = 0 ;
+
+	if ( ! (isword(vocabulary,h1) && isword(vocabulary,h2) && isword(vocabulary,h3)) )
+	{
+		warning(MODULE,"solvenlg_handles","word not in vocabulary") ;
+		return result ;
+	} ;
+	symbols = solvenlg_symbols(handle_arg(vocabulary,h1),handle_arg(vocabulary,h2),handle_arg(vocabulary,h3),&l4) ;
+	if ( NULL != symbols )
+	{
+		result = (char *) decodesymbols(vocabulary->table,l4,symbols) ;
+		free(symbols) ;
+	} ;
+	return result ;
+}
+
+/*
+ * Call to solve a batch of analogies between words of a vocabulary
+ * (see solvenlg_array, the handles of the three words of each equation one after the other)
+ */
+
+void solvenlg_handles_array(NLGVOCABULARY *vocabulary, int n, int *handles, char **solutions)
+{
+	int i = 0 ;
+
+trace(("in  solvenlg_handles_array(%d)\n", n))
+
+	for ( i = 0 ; i < n ; ++i )
+		solutions[i] = solvenlg_handles(vocabulary,handles[3*i+A],handles[3*i+B],handles[3*i+C]) ;
+
+trace(("out solvenlg_handles_array(%d)\n", n))
+}
+
+/*
+ * Call to verify an analogy between words of a vocabulary
+ */
+
+int verifnlg_handles(NLGVOCABULARY *vocabulary, int h1, int h2, int h3, int h4)
+{
+	if ( ! (isword(vocabulary,h1) && isword(vocabulary,h2) && isword(vocabulary,h3) && isword(vocabulary,h4)) )
+	{
+		warning(MODULE,"verifnlg_handles","word not in vocabulary") ;
+		return 0 ;
+	} ;
+	return verifnlg_symbols(handle_arg(vocabulary,h1),handle_arg(vocabulary,h2),handle_arg(vocabulary,h3),handle_arg(vocabulary,h4)) ;
+}
+
+#undef isword
+#undef wordlength
+#undef wordsymbols
+#undef handle_arg
+
 /*
  * Call to solve an analogy with utf8 strings
- * assume total number of characters in all strings is less than 256
+ * The characters are encoded with a symbol table kept from one call to the next
+ * (no limit on the number of characters, see solvenlg_symbols).
+ */
+
+static SYMBOLTABLE *utf8table = NULL ;
+static int utf8words[TERM_MAX][MAXWORD+1] ;
+
+/*
+ * Encode the utf8 words of an equation into utf8words, with their lengths in len.
+ * Returns 0 if a word is too long.
  */
 
+static int utf8encoding(int n, char **uwords, int *len)
+{
+	int X = 0 ;
+
+	if ( NULL == utf8table )
+		utf8table = newsymboltable() ;
+	for ( X = 0 ; X < n ; ++X )
+	{
+		len[X] = utf8length((unsigned char *) uwords[X]) ;
+		if ( len[X] > MAXWORD )
+			return 0 ;
+		encodesymbols(utf8table,(unsigned char *) uwords[X],utf8words[X]) ;
+	} ;
+	return 1 ;
+}
+
 unsigned char *utf8solvenlg(char *uword1, char *uword2, char *uword3)
 {
 	unsigned char *result = NULL ;
-	uchar *word1 = NULL,
-		  *word2 = NULL,
-		  *word3 = NULL,
-		  *word4 = NULL ;
-
-	initializecodedict() ;
-	word1 = encode((unsigned char *) uword1) ;
-	word2 = encode((unsigned char *) uword2) ;
-	word3 = encode((unsigned char *) uword3) ;
-	word4 = asciisolvenlg(word1,word2,word3) ;
-trace(("mid utf8solvenlg(%s,%s,%s,%s)\n", (uchar *)word1,(uchar *)word2,(uchar *)word3,NULL==word4?"NULL":"not NULL"))
-trace(("mid utf8solvenlg(%s,%s,%s,%s)\n", (uchar *)word1,(uchar *)word2,(uchar *)word3,""==word4?"epsilon":"not epsilon"))
+	char *uwords[3] = { uword1, uword2, uword3 } ;
+	int len[3] = { 0 } ;
+	int *word4 = NULL ;
+	int l4 = 0 ;
+
+trace(("in  utf8solvenlg(%s,%s,%s)\n", uword1,uword2,uword3))
+
+	if ( utf8encoding(3,uwords,len) )
+		word4 = solvenlg_symbols(len[A],utf8words[A],len[B],utf8words[B],len[C],utf8words[C],&l4) ;
 	if ( NULL != word4 )
-		result = decode(word4) ;
-
-	free(word1) ;
-	free(word2) ;
-	free(word3) ;
-	/*
-		Caution with free(word4).
-		Doing free(word4) without a test in cases where word4 = ""
-		will give error 'pointer was not allocated'
-		because result is initialized to constant "" in asciisolvenlg.
-	*/
-trace(("mid utf8solvenlg(%s,%s,%s,%s)\n", (char *)uword1,(char *)uword2,(char *)uword3,NULL==result?"NULL":"not NULL"))
-trace(("mid utf8solvenlg(%s,%s,%s,%s)\n", (char *)uword1,(char *)uword2,(char *)uword3,""==result?"epsilon":"not epsilon"))
-
-	if ( NULL != word4 && "" != word4 )
-/*	if ( word4 && ( strcmp((uchar *) word4,"")) ) */
+	{
+		result = decodesymbols(utf8table,l4,word4) ;
 		free(word4) ;
+	} ;
+
+trace(("out utf8solvenlg(%s,%s,%s) = %s\n", uword1,uword2,uword3,(NULL==result)?"NULL":(char *)result))
 
 	return result ;
 }
 
 /*
  * Call to verify an analogy with utf8 strings
- * assume total number of characters in all strings is less than 256
+ * (no limit on the number of characters, see solvenlg_symbols)
  */
 
 int utf8verifnlg(char *uword1, char *uword2, char *uword3, char *uword4)
 {
 	int result = 0 ;
-	uchar *word1 = NULL,
-		  *word2 = NULL,
-		  *word3 = NULL,
-		  *word4 = NULL ;
-
-trace(("in utf8verifnlg(%s,%s,%s,%s)\n", (char *)uword1,(char *)uword2,(char *)uword3,NULL==word4?"NULL":"not NULL"))
-trace(("mid utf8verifnlg(%s,%s,%s,%s)\n", (char *)uword1,(char *)uword2,(char *)uword3,""==word4?"epsilon":"not epsilon"))
-
-	initializecodedict() ;
-	word1 = encode((unsigned char *) uword1) ;
-	word2 = encode((unsigned char *) uword2) ;
-	word3 = encode((unsigned char *) uword3) ;
-	word4 = encode((unsigned char *) uword4) ;
-	result = asciiverifnlg(word1,word2,word3,word4) ;
-trace(("mid utf8solvenlg(%s,%s,%s,%s)\n", (char *)uword1,(char *)uword2,(char *)uword3,NULL==result?"NULL":"not NULL"))
-trace(("mid utf8solvenlg(%s,%s,%s,%s)\n", (char *)uword1,(char *)uword2,(char *)uword3,""==result?"epsilon":"not epsilon"))
-	free(word1) ;
-	free(word2) ;
-	free(word3) ;
-	free(word4) ;
+	char *uwords[4] = { uword1, uword2, uword3, uword4 } ;
+	int len[4] = { 0 } ;
+
+trace(("in  utf8verifnlg(%s,%s,%s,%s)\n", uword1,uword2,uword3,uword4))
+
+	if ( utf8encoding(4,uwords,len) )
+		result = verifnlg_symbols(len[A],utf8words[A],len[B],utf8words[B],len[C],utf8words[C],len[D],utf8words[D]) ;
+
+trace(("out utf8verifnlg(%s,%s,%s,%s) = %d\n", uword1,uword2,uword3,uword4,result))
 
 	return result ;
 }
@@ -1169,6 +1463,30 @@ trace(("out solvenlg(%s,%s,%s) = %s\n", (uchar *)word1,(uchar *)word2,(uchar *)w
 	return result ;
 }
 
+/*
+ * Call to solve a batch of analogies
+ * (the solutions are always allocated, even the empty one, and are to be freed by the caller)
+ */
+
+void solvenlg_array(int n, char **words, char **solutions)
+{
+	int i = 0 ;
+
+trace(("in  solvenlg_array(%d)\n", n))
+
+	for ( i = 0 ; i < n ; ++i )
+	{
+		char *result = solvenlg(words[3*i+A],words[3*i+B],words[3*i+C]) ;
+
+		/* The empty solution may be the constant emptysolution (see pr_mov). */
+		if ( emptysolution == result )
+			result = (char *) calloc(1,sizeof(char)) ;
+		solutions[i] = result ;
+	} ;
+
+trace(("out solvenlg_array(%d)\n", n))
+}
+
 /*
  * Call to verify an analogy
  */
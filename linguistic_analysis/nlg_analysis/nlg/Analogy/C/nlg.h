@@ -17,6 +17,18 @@
 
 char *solvenlg(char *, char *, char *) ;
 
+/*
+ * solvenlg_array function:
+ * input:
+ *    a number of analogical equations n
+ *    an array of 3*n objects of type char *, the three words of each equation one after the other
+ * output:
+ *    an array of n objects of type char *, filled with the solution of each equation
+ *    (NULL if no solution), each to be freed by the caller
+ */
+
+void  solvenlg_array(int, char **, char **) ;
+
 /*
  * verifnlg function:
  * input:
@@ -26,3 +38,57 @@ char *solvenlg(char *, char *, char *) ;
  */
 
 int   verifnlg(char *, char *, char *, char *) ;
+
+/*
+ * solvenlg_symbols function:
+ * input:
+ *    three words given by their lengths and their arrays of symbols (integers >= 0, see SYMBOLTABLE in utf8.h)
+ *    a pointer to an integer
+ * output:
+ *    the symbols of the solution (NULL if no solution), to be freed by the caller,
+ *    their number in the integer pointed to
+ * the number of different symbols in the second and third words should be less than 256
+ */
+
+int  *solvenlg_symbols(int, int *, int, int *, int, int *, int *) ;
+
+/*
+ * verifnlg_symbols function:
+ * input:
+ *    four words given by their lengths and their arrays of symbols
+ * output:
+ *    1 if analogy is verified, 0 else
+ */
+
+int   verifnlg_symbols(int, int *, int, int *, int, int *, int, int *) ;
+
+/*
+ * vocabularies:
+ * words encoded once into symbols and designated by their handles (0, 1, 2... in the order of addition)
+ */
+
+typedef struct nlgvocabulary NLGVOCABULARY ;
+
+NLGVOCABULARY *newnlgvocabulary(void) ;
+void  freenlgvocabulary(NLGVOCABULARY *) ;
+int   nlgvocabulary_size(NLGVOCABULARY *) ;
+
+/*
+ * nlgvocabulary_add function:
+ * input:
+ *    a vocabulary and a word of type char * (utf8)
+ * output:
+ *    the handle of the word (a word added twice has two handles)
+ */
+
+int   nlgvocabulary_add(NLGVOCABULARY *, char *) ;
+
+/*
+ * solvenlg_handles, solvenlg_handles_array, verifnlg_handles functions:
+ * same as solvenlg, solvenlg_array, verifnlg with the handles of words in a vocabulary
+ * (the solutions are always allocated, to be freed by the caller)
+ */
+
+char *solvenlg_handles(NLGVOCABULARY *, int, int, int) ;
+void  solvenlg_handles_array(NLGVOCABULARY *, int, int *, char **) ;
+int   verifnlg_handles(NLGVOCABULARY *, int, int, int, int) ;
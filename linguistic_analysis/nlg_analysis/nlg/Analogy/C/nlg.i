@@ -5,7 +5,260 @@
 /* An analogy can be solved or verified */
 extern char *solvenlg(char *, char *, char *) ;
 extern int   verifnlg(char *, char *, char *, char *) ;
+extern void  solvenlg_array(int, char **, char **) ;
+/* An analogy between words of a vocabulary, encoded once */
+extern NLGVOCABULARY *newnlgvocabulary(void) ;
+extern void  freenlgvocabulary(NLGVOCABULARY *) ;
+extern int   nlgvocabulary_size(NLGVOCABULARY *) ;
+extern int   nlgvocabulary_add(NLGVOCABULARY *, char *) ;
+extern char *solvenlg_handles(NLGVOCABULARY *, int, int, int) ;
+extern void  solvenlg_handles_array(NLGVOCABULARY *, int, int *, char **) ;
+extern int   verifnlg_handles(NLGVOCABULARY *, int, int, int, int) ;
+
+/*
+ * The C program keeps its state in global variables:
+ * the calls from different Python threads are serialised by a lock.
+ */
+
+static PyThread_type_lock nlg_lock = NULL ;
+
+static void nlg_acquire(void)
+{
+	if ( ! PyThread_acquire_lock(nlg_lock, NOWAIT_LOCK) )
+	{
+		Py_BEGIN_ALLOW_THREADS
+		PyThread_acquire_lock(nlg_lock, WAIT_LOCK) ;
+		Py_END_ALLOW_THREADS
+	} ;
+}
+
+/*
+ * List of n solutions (None for NULL), decoded from UTF-8.
+ */
+
+static PyObject *nlg_solutions(Py_ssize_t n, char **solutions)
+{
+	PyObject *result = PyList_New(n) ;
+	Py_ssize_t i = 0 ;
+
+	for ( i = 0 ; NULL != result && i < n ; ++i )
+	{
+		PyObject *solution = NULL ;
+
+		if ( NULL == solutions[i] )
+		{
+			Py_INCREF(Py_None) ;
+			solution = Py_None ;
+		}
+		else
+			solution = PyUnicode_DecodeUTF8(solutions[i], strlen(solutions[i]), "replace") ;
+		if ( NULL == solution )
+		{
+			Py_CLEAR(result) ;
+			break ;
+		} ;
+		PyList_SET_ITEM(result, i, solution) ;
+	} ;
+	return result ;
+}
+%}
+
+%init %{
+	nlg_lock = PyThread_allocate_lock() ;
 %}
+
+%exception solvenlg {
+	nlg_acquire() ;
+	$action
+	PyThread_release_lock(nlg_lock) ;
+}
+
+%exception verifnlg {
+	nlg_acquire() ;
+	$action
+	PyThread_release_lock(nlg_lock) ;
+}
+
+%exception nlgvocabulary_add {
+	nlg_acquire() ;
+	$action
+	PyThread_release_lock(nlg_lock) ;
+}
+
+%exception solvenlg_handles {
+	nlg_acquire() ;
+	$action
+	PyThread_release_lock(nlg_lock) ;
+}
+
+%exception verifnlg_handles {
+	nlg_acquire() ;
+	$action
+	PyThread_release_lock(nlg_lock) ;
+}
+
+/* The solution is allocated by the C program: freed once converted. */
+%newobject solvenlg_handles ;
+
 extern char *solvenlg(char *, char *, char *) ;
 extern int   verifnlg(char *, char *, char *, char *) ;
 
+/*
+ * Vocabularies: the words are encoded once and designated by their handles,
+ * so that the equations between them are solved or verified without encoding them again.
+ */
+
+typedef struct nlgvocabulary NLGVOCABULARY ;
+
+extern NLGVOCABULARY *newnlgvocabulary(void) ;
+extern void  freenlgvocabulary(NLGVOCABULARY *) ;
+extern int   nlgvocabulary_size(NLGVOCABULARY *) ;
+extern int   nlgvocabulary_add(NLGVOCABULARY *, char *) ;
+extern char *solvenlg_handles(NLGVOCABULARY *, int, int, int) ;
+extern int   verifnlg_handles(NLGVOCABULARY *, int, int, int, int) ;
+
+/*
+ * Solve a batch of analogies in one call.
+ * 	equations is a sequence of triples of strings (A, B, C) for the equations A : B :: C : x.
+ * 	Returns the list of the solutions, None for an equation without solution.
+ * 	The GIL is released while the equations are solved.
+ */
+
+%inline %{
+PyObject *solvenlg_batch(PyObject *equations)
+{
+	PyObject *sequence = NULL ;
+	PyObject **triples = NULL ;
+	PyObject *result = NULL ;
+	char **words = NULL ;
+	char **solutions = NULL ;
+	Py_ssize_t n = 0, i = 0, k = 0 ;
+
+	sequence = PySequence_Fast(equations, "expected a sequence of triples of strings") ;
+	if ( NULL == sequence )
+		return NULL ;
+	n = PySequence_Fast_GET_SIZE(sequence) ;
+	triples = (PyObject **) calloc(n+1,sizeof(PyObject *)) ;
+	words = (char **) calloc(3*n+1,sizeof(char *)) ;
+	solutions = (char **) calloc(n+1,sizeof(char *)) ;
+	if ( NULL == triples || NULL == words || NULL == solutions )
+	{
+		PyErr_NoMemory() ;
+		goto done ;
+	} ;
+	/* The UTF-8 strings belong to the Python strings, kept alive by the triples. */
+	for ( i = 0 ; i < n ; ++i )
+	{
+		triples[i] = PySequence_Fast(PySequence_Fast_GET_ITEM(sequence, i), "expected a triple of strings") ;
+		if ( NULL == triples[i] )
+			goto done ;
+		if ( 3 != PySequence_Fast_GET_SIZE(triples[i]) )
+		{
+			PyErr_Format(PyExc_ValueError, "equation %zd: expected 3 strings, got %zd", i, PySequence_Fast_GET_SIZE(triples[i])) ;
+			goto done ;
+		} ;
+		for ( k = 0 ; k < 3 ; ++k )
+		{
+			words[3*i+k] = (char *) PyUnicode_AsUTF8(PySequence_Fast_GET_ITEM(triples[i], k)) ;
+			if ( NULL == words[3*i+k] )
+				goto done ;
+		} ;
+	} ;
+
+	nlg_acquire() ;
+	Py_BEGIN_ALLOW_THREADS
+	solvenlg_array((int) n, words, solutions) ;
+	Py_END_ALLOW_THREADS
+	PyThread_release_lock(nlg_lock) ;
+
+	result = nlg_solutions(n, solutions) ;
+
+done:
+	for ( i = 0 ; i < n ; ++i )
+	{
+		if ( NULL != triples && NULL != triples[i] )
+			Py_DECREF(triples[i]) ;
+		if ( NULL != solutions )
+			free(solutions[i]) ;
+	} ;
+	free(triples) ;
+	free(words) ;
+	free(solutions) ;
+	Py_DECREF(sequence) ;
+	return result ;
+}
+%}
+
+/*
+ * Solve a batch of analogies between words of a vocabulary in one call.
+ * 	equations is a sequence of triples of handles (A, B, C) for the equations A : B :: C : x.
+ * 	Returns the list of the solutions, None for an equation without solution.
+ * 	The GIL is released while the equations are solved.
+ */
+
+%inline %{
+PyObject *solvenlg_handles_batch(NLGVOCABULARY *vocabulary, PyObject *equations)
+{
+	PyObject *sequence = NULL ;
+	PyObject *result = NULL ;
+	int *handles = NULL ;
+	char **solutions = NULL ;
+	Py_ssize_t n = 0, i = 0, k = 0 ;
+	int size = nlgvocabulary_size(vocabulary) ;
+
+	sequence = PySequence_Fast(equations, "expected a sequence of triples of handles") ;
+	if ( NULL == sequence )
+		return NULL ;
+	n = PySequence_Fast_GET_SIZE(sequence) ;
+	handles = (int *) calloc(3*n+1,sizeof(int)) ;
+	solutions = (char **) calloc(n+1,sizeof(char *)) ;
+	if ( NULL == handles || NULL == solutions )
+	{
+		PyErr_NoMemory() ;
+		goto done ;
+	} ;
+	for ( i = 0 ; i < n ; ++i )
+	{
+		PyObject *triple = PySequence_Fast(PySequence_Fast_GET_ITEM(sequence, i), "expected a triple of handles") ;
+
+		if ( NULL == triple )
+			goto done ;
+		if ( 3 != PySequence_Fast_GET_SIZE(triple) )
+		{
+			PyErr_Format(PyExc_ValueError, "equation %zd: expected 3 handles, got %zd", i, PySequence_Fast_GET_SIZE(triple)) ;
+			Py_DECREF(triple) ;
+			goto done ;
+		} ;
+		for ( k = 0 ; k < 3 ; ++k )
+		{
+			long handle = PyLong_AsLong(PySequence_Fast_GET_ITEM(triple, k)) ;
+
+			if ( ! PyErr_Occurred() && ( handle < 0 || size <= handle ) )
+				PyErr_Format(PyExc_IndexError, "equation %zd: handle %ld not in vocabulary", i, handle) ;
+			if ( PyErr_Occurred() )
+			{
+				Py_DECREF(triple) ;
+				goto done ;
+			} ;
+			handles[3*i+k] = (int) handle ;
+		} ;
+		Py_DECREF(triple) ;
+	} ;
+
+	nlg_acquire() ;
+	Py_BEGIN_ALLOW_THREADS
+	solvenlg_handles_array(vocabulary, (int) n, handles, solutions) ;
+	Py_END_ALLOW_THREADS
+	PyThread_release_lock(nlg_lock) ;
+
+	result = nlg_solutions(n, solutions) ;
+
+done:
+	for ( i = 0 ; NULL != solutions && i < n ; ++i )
+		free(solutions[i]) ;
+	free(handles) ;
+	free(solutions) ;
+	Py_DECREF(sequence) ;
+	return result ;
+}
+%}
@@ -1,4 +1,5 @@
 /* Copyright (c) 2013, 2014, Yves Lepage */
+/* 18/10/2026: added symbol tables: utf8 characters numbered without limit, kept from one call to the next. */
 #define MODULE "utf8"
 #define TRACE 0
 /* extern int tracet ; */
@@ -379,3 +380,207 @@ trace(("out decode(%s) = %s\n",s,result))
 
 	return result ;
 }
+
+/*
+ * Symbol tables.
+ * A symbol table numbers the utf8 characters 0, 1, 2... in their order of appearance,
+ * without limit on the number of characters, contrary to the dictionary above.
+ * It is kept as long as needed by the caller, so that words can be encoded once
+ * into arrays of symbols (integers).
+ * The bytes of a utf8 character (at most UTFCHARMAXSIZE) are packed into one integer, its key,
+ * and the symbols are found from their keys by an open addressing hash table.
+ */
+
+struct symboltable {
+	int nsymbols ;			/* number of symbols */
+	int capacity ;			/* size of keys */
+	unsigned int *keys ;	/* key of each symbol */
+	int hashsize ;			/* size of hash, a power of 2 */
+	int *hash ;				/* symbol + 1 for each slot, 0 for an empty slot */
+} ;
+
+#define INITIAL_SYMBOLS	256
+
+static unsigned int utf8key(unsigned char *s, int len)
+{
+	unsigned int result = 0 ;
+	int i = 0 ;
+
+	for ( i = 0 ; i < len ; ++i )
+		result |= ((unsigned int) s[i]) << (8*i) ;
+	return result ;
+}
+
+static int hashslot(unsigned int key, int hashsize)
+{
+	return (int) ((key * 2654435761u) & (unsigned int) (hashsize - 1)) ;
+}
+
+static void *xrealloc(void *block, size_t size)
+{
+	void *result = realloc(block,size) ;
+
+	if ( NULL == result )
+		error(MODULE,"xrealloc","out of memory") ;
+	return result ;
+}
+
+SYMBOLTABLE *newsymboltable(void)
+{
+	SYMBOLTABLE *result = (SYMBOLTABLE *) xrealloc(NULL,sizeof(SYMBOLTABLE)) ;
+
+	result->nsymbols = 0 ;
+	result->capacity = INITIAL_SYMBOLS ;
+	result->keys = (unsigned int *) xrealloc(NULL,result->capacity * sizeof(unsigned int)) ;
+	result->hashsize = 2 * INITIAL_SYMBOLS ;
+	result->hash = (int *) calloc(result->hashsize,sizeof(int)) ;
+	if ( NULL == result->hash )
+		error(MODULE,"newsymboltable","out of memory") ;
+	return result ;
+}
+
+void freesymboltable(SYMBOLTABLE *table)
+{
+	if ( NULL != table )
+	{
+		free(table->keys) ;
+		free(table->hash) ;
+		free(table) ;
+	} ;
+}
+
+int symboltablesize(SYMBOLTABLE *table)
+{
+	return table->nsymbols ;
+}
+
+/*
+ * Double the size of the hash table (kept at most half full).
+ */
+
+static void rehash(SYMBOLTABLE *table)
+{
+	int hashsize = 2 * table->hashsize ;
+	int *hash = (int *) calloc(hashsize,sizeof(int)) ;
+	int is = 0 ;
+
+trace(("in  rehash(%d)\n",hashsize))
+
+	if ( NULL == hash )
+		error(MODULE,"rehash","out of memory") ;
+	for ( is = 0 ; is < table->nsymbols ; ++is )
+	{
+		int slot = hashslot(table->keys[is],hashsize) ;
+
+		while ( hash[slot] )
+			slot = (slot + 1) & (hashsize - 1) ;
+		hash[slot] = is + 1 ;
+	} ;
+	free(table->hash) ;
+	table->hash = hash ;
+	table->hashsize = hashsize ;
+
+trace(("out rehash(%d)\n",hashsize))
+}
+
+/*
+ * Symbol of a utf8 character, added to the table if absent.
+ */
+
+static int symbolof(SYMBOLTABLE *table, unsigned char *s, int len)
+{
+	unsigned int key = utf8key(s,len) ;
+	int slot = hashslot(key,table->hashsize) ;
+
+	for ( ; table->hash[slot] ; slot = (slot + 1) & (table->hashsize - 1) )
+		if ( table->keys[table->hash[slot]-1] == key )
+			return table->hash[slot] - 1 ;
+
+	if ( table->nsymbols == table->capacity )
+	{
+		table->capacity *= 2 ;
+		table->keys = (unsigned int *) xrealloc(table->keys,table->capacity * sizeof(unsigned int)) ;
+	} ;
+	table->keys[table->nsymbols] = key ;
+	table->hash[slot] = ++table->nsymbols ;
+	if ( 2 * table->nsymbols > table->hashsize )
+		rehash(table) ;
+	return table->nsymbols - 1 ;
+}
+
+/*
+ * Length of a utf8 string in characters.
+ * The length in bytes of a character is cut at the end of the string if the string is malformed.
+ */
+
+static int utf8charsizein(unsigned char *ss)
+{
+	int result = utf8charsize(ss) ;
+	int i = 0 ;
+
+	for ( i = 1 ; i < result ; ++i )
+		if ( ! ss[i] )
+			return i ;
+	return result ;
+}
+
+int utf8length(unsigned char *s)
+{
+	int result = 0 ;
+	unsigned char *ss = s ;
+
+	for ( ss = s ; *ss ; ss += utf8charsizein(ss) )
+		++result ;
+	return result ;
+}
+
+/*
+ * Encoding of a utf8 string into symbols.
+ * symbols should be of size utf8length(s) at least.
+ * Returns the number of symbols.
+ */
+
+int encodesymbols(SYMBOLTABLE *table, unsigned char *s, int *symbols)
+{
+	int result = 0 ;
+	unsigned char *ss = s ;	/* iterator on string s */
+	int bl = 0 ;			/* for length in bytes */
+
+trace(("in  encodesymbols(%s)\n",s))
+
+	for ( ss = s ; *ss ; ss += bl )
+	{
+		bl = utf8charsizein(ss) ;
+		symbols[result++] = symbolof(table,ss,bl) ;
+	} ;
+
+trace(("out encodesymbols(%s) = %d\n",s,result))
+
+	return result ;
+}
+
+/*
+ * Decoding of n symbols into a newly allocated utf8 string.
+ */
+
+unsigned char *decodesymbols(SYMBOLTABLE *table, int n, int *symbols)
+{
+	unsigned char *result = NULL,
+				  *rr = NULL ;
+	int i = 0 ;
+
+	rr = result = (unsigned char *) xrealloc(NULL,(UTFCHARMAXSIZE * n + 1) * sizeof(unsigned char)) ;
+	for ( i = 0 ; i < n ; ++i )
+	{
+		unsigned int key = table->keys[symbols[i]] ;
+
+		/* The bytes of a character are non-zero: the key ends with the character. */
+		do
+		{
+			*rr++ = (unsigned char) (key & 0xFF) ;
+			key >>= 8 ;
+		} while ( key ) ;
+	} ;
+	*rr = 0 ;
+	return result ;
+}
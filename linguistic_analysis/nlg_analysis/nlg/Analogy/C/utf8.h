@@ -47,3 +47,51 @@ char *encode(unsigned char *s) ;
  */
 
 unsigned char *decode(char *s) ;
+
+/*
+ * symbol tables:
+ * the utf8 characters are numbered 0, 1, 2... in their order of appearance, without limit on their number,
+ * the table is kept by the caller as long as needed (no hidden dictionary)
+ */
+
+typedef struct symboltable SYMBOLTABLE ;
+
+SYMBOLTABLE *newsymboltable(void) ;
+void freesymboltable(SYMBOLTABLE *table) ;
+
+/*
+ * number of symbols in the table
+ */
+
+int symboltablesize(SYMBOLTABLE *table) ;
+
+/*
+ * length of a utf8 string in characters
+ */
+
+int utf8length(unsigned char *s) ;
+
+/*
+ * encoding function
+ * input:
+ *    a symbol table
+ *    a string in unicode of type unsigned char *
+ *    an array of integers of size utf8length(s) at least
+ * output:
+ *    the array filled with the symbols of the characters of the string
+ *    (the symbols of new characters are added to the table)
+ *    the number of symbols is returned
+ */
+
+int encodesymbols(SYMBOLTABLE *table, unsigned char *s, int *symbols) ;
+
+/*
+ * decoding function:
+ * input:
+ *    a symbol table
+ *    an array of n symbols of the table
+ * output:
+ *    a newly allocated string in unicode of type unsigned char *
+ */
+
+unsigned char *decodesymbols(SYMBOLTABLE *table, int n, int *symbols) ;
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from _nlg import newnlgvocabulary, freenlgvocabulary, nlgvocabulary_add, \
+	solvenlg_handles, verifnlg_handles, solvenlg_handles_batch
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'			# Creation.
+__description__ = """Vocabulary of words encoded once by the C program (see nlg.c),
+to solve or verify many analogies between its words
+without encoding the UTF-8 strings again at each call.
+There is no limit on the number of different characters in the vocabulary.
+"""
+
+###############################################################################
+
+class Vocabulary:
+	"""
+	Words encoded once, designated by their handles (0, 1, 2... in their order of addition).
+	The methods take words, added to the vocabulary if necessary,
+	except solve_handles which takes handles.
+
+	>>> vocabulary = Vocabulary(['aslama', 'arsala', 'muslim'])
+	>>> len(vocabulary), vocabulary.handle('muslim'), vocabulary.handle('mursil'), vocabulary.words[3]
+	(3, 2, 3, 'mursil')
+	>>> vocabulary.solve('aslama', 'arsala', 'muslim')
+	'mursil'
+	>>> vocabulary.verify('aslama', 'arsala', 'muslim', 'mursil')
+	True
+	>>> vocabulary.solve_batch([('käsi', 'käsin', 'jalka'), ('aaa', 'aa', 'a'), ('a', 'b', 'c')])
+	['jalkan', '', None]
+	>>> vocabulary.solve_handles([(0, 1, 2), (2, 2, 1)])
+	['mursil', 'arsala']
+	"""
+
+	def __init__(self, words=()):
+		self.vocabulary = newnlgvocabulary()
+		self.words, self.handles = [], dict()
+		for word in words:
+			self.handle(word)
+
+	def __del__(self):
+		if getattr(self, 'vocabulary', None) is not None:
+			freenlgvocabulary(self.vocabulary)
+			self.vocabulary = None
+
+	def __len__(self):
+		return len(self.words)
+
+	def __contains__(self, word):
+		return word in self.handles
+
+	def handle(self, word):
+		"""
+		Handle of a word, added to the vocabulary if absent.
+		"""
+		handle = self.handles.get(word)
+		if handle is None:
+			handle = self.handles[word] = nlgvocabulary_add(self.vocabulary, word)
+			self.words.append(word)
+		return handle
+
+	def solve(self, A, B, C):
+		"""
+		Solution of the analogical equation A : B :: C : x, None if there is none.
+		"""
+		return solvenlg_handles(self.vocabulary, self.handle(A), self.handle(B), self.handle(C))
+
+	def verify(self, A, B, C, D):
+		"""
+		True if A : B :: C : D is an analogy.
+		"""
+		return 1 == verifnlg_handles(self.vocabulary, self.handle(A), self.handle(B), self.handle(C), self.handle(D))
+
+	def solve_batch(self, equations):
+		"""
+		Solutions of a list of analogical equations (triples of words), None for no solution.
+		"""
+		return self.solve_handles([ (self.handle(A), self.handle(B), self.handle(C)) for A, B, C in equations ])
+
+	def solve_handles(self, equations):
+		"""
+		Solutions of a list of analogical equations given by triples of handles, in one call of the C program.
+		"""
+		return solvenlg_handles_batch(self.vocabulary, equations)
+
+###############################################################################
+
+if __name__ == '__main__':
+	import doctest
+	doctest.testmod()
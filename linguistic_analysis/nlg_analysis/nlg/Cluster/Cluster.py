@@ -9,8 +9,10 @@ import random
 import numpy as np
 
 import nlg.NlgSymbols as NlgSymbols
+import nlg.Cluster.ClusterFile as ClusterFile
 from nlg.Cluster.Words2Clusters.Indistinguishables import Indistinguishables
-from _fast_distance import fast_distance, init_memo_fast_distance, memo_fast_distance, memo_fast_similitude
+from _fast_distance import init_memo_fast_distance, memo_fast_similitude
+from nlg.DistanceCache import distance, distances_to_sample
 
 ###############################################################################
 
@@ -24,6 +26,16 @@ __date__, __version__ = '20/02/2016', '1.4'			# Added option clean.
 													# Made sort_by_median_ratio faster by using sampling.
 __date__, __version__ = '13/02/2017', '1.5'			# Corrected mistake in median computation.
 __date__, __version__ = '24/08/2017', '1.6'			# Added Indistinguishables class.
+__date__, __version__ = '18/10/2026', '1.7'			# Use the shared distance cache (nlg.DistanceCache) for distances between words.
+__date__, __version__ = '18/10/2026', '1.8'			# Deterministic sort by median ratio: stride sample (or random sample with a seed),
+													# sums of distances computed by one call to a C program.
+													# In Cluster.sort, the distance between ratios A : B and C : D is d(A, C) + d(B, D),
+													# so that the distances computed by StrCluster can be reused (self.distances).
+__date__, __version__ = '18/10/2026', '1.9'			# Back to the distance between the ratios written as strings A : B by default in Cluster.sort;
+													# d(A, C) + d(B, D) only if distances were kept in self.distances (opt-in, see StrCluster).
+__date__, __version__ = '18/10/2026', '1.10'		# Add ListOfClusters.save and load: binary format (see ClusterFile).
+__date__, __version__ = '18/10/2026', '1.11'		# Add ListOfClusters.compact and option compact of load: clusters kept in a ClusterStore.
+													# The class of the attributes of clusters is created once.
 __description__ = 'Classes for analogical clusters and files of analogical clusters.'
 
 __verbose__ = False
@@ -32,6 +44,11 @@ __trace__ = False
 __visualization__ = False
 __cluster_size__ = None
 
+__sample_size__ = 100			# Number of members compared with all members to find the median one.
+__seed__ = None					# None for a deterministic stride sample, an integer for a reproducible random sample.
+
+Attributes = collections.namedtuple('Attributes', ['distance', 'left_diff', 'right_diff'])
+
 ###############################################################################
 
 def visualize(dist, nlg):
@@ -51,12 +68,37 @@ def visualize(dist, nlg):
 
 ###############################################################################
 
-def sort_by_median_ratio(strings):
+def sample_indices(n, sample_size=__sample_size__, seed=__seed__):
+	"""
+	Indices of a sample of sample_size members out of n, in increasing order.
+	Stride sample if seed is None, otherwise a random sample which is the same for the same seed.
+	>>> sample_indices(10, 4), sample_indices(3, 4)
+	([0, 2, 5, 7], [0, 1, 2])
+	>>> sample_indices(10, 4, seed=1) == sample_indices(10, 4, seed=1)
+	True
+	"""
+	if n <= sample_size:
+		return list(range(n))
+	if seed is None:
+		return [ i * n // sample_size for i in range(sample_size) ]
+	return sorted(random.Random(seed).sample(range(n), sample_size))
+
+def median_order(distances):
+	"""
+	Indices of the members (columns) by increasing sum of distances with the sample (rows).
+	Members with the same sum stay in their original order.
+	>>> median_order(np.array([[0, 1, 3], [2, 0, 2]]))
+	[1, 0, 2]
+	"""
+	return np.argsort(distances.sum(axis=0), kind='stable').tolist()
+
+def sort_by_median_ratio(strings, sample_size=__sample_size__, seed=__seed__):
 	"""
 	Sort the strings in a set of strings, median strings first.
 	The combined edit distance with all strings in the set is used.
+	If the set contains too many strings, the combined edit distance with a sample of sample_size strings is used.
 	>>> sort_by_median_ratio(['a', 'ab', 'abcd', 'abcdef'])
-	['abcd', 'ab', 'a', 'abcdef']
+	['ab', 'abcd', 'a', 'abcdef']
 	>>> sort_by_median_ratio(['a : a', 'aa : aa', 'aaaa : aaaa'])
 	['aa : aa', 'a : a', 'aaaa : aaaa']
 	>>> sort_by_median_ratio(['a : aa', 'aa : aaa', 'aaa : aaaa', 'aaaa : aaaaa', 'aaaaa : aaaaaa'])[0]
@@ -64,26 +106,10 @@ def sort_by_median_ratio(strings):
 	>>> sort_by_median_ratio(['', 'go', 'brew', 'study' , 'overlook', 'understand'])
 	['', 'go', 'brew', 'study', 'overlook', 'understand']
 	"""
-	dist = collections.defaultdict(int)
-	# If strings contains too many strings,
-	# shuffling the string and then considering only the first 100 members
-	# is the same as taking a sample of 100 members.
-	# Caution: this introduces randomness,
-	# and thus the results may not be the same for two subsequent runs of the program.
-	random.shuffle(strings)
-	# If strings contains too many strings,
-	# we compare each member of strings
-	# to only a sample of 100 other members.
-	for	A in strings[:100]:
-		init_memo_fast_distance(A)
-		for B in strings:
-			dist[B] += memo_fast_distance(B)
-	sum_val, length = sum(dist.values()), len(dist)
-	# Equivalent to take the average of all similarities and
-	# sort by closeness to average similarity.
-	avg_dist = dict( (key, dist[key]) for key in dist )
-	result = sorted(avg_dist, key=avg_dist.get)
-	if __visualization__ and __trace__: visualize(dist, NlgSymbols.conformity.join(result[:2]))
+	strings = list(dict.fromkeys(strings))
+	distances = distances_to_sample(strings, sample_indices(len(strings), sample_size, seed))
+	result = [ strings[i] for i in median_order(distances) ]
+	if __visualization__ and __trace__: visualize(dict(zip(strings, distances.sum(axis=0))), NlgSymbols.conformity.join(result[:2]))
 	return result
 
 ###############################################################################
@@ -110,6 +136,7 @@ class Cluster(list):
 		self.is_normalized = False
 		self.is_analogy = False
 		self.attributes_set = False
+		self.distances = None		# Distances between ratios d(A, C) + d(B, D), if kept (see StrCluster).
 		# Check whether the cluster is an analogy, i.e. a cluster of only 2 ratios.
 		if 2 == len(self): self.is_analogy = True
 		
@@ -123,10 +150,9 @@ class Cluster(list):
 	
 	def clean(self):
 		# Sort and normalize.
-		if clean:
-			self.sort()
-			self.normalize()
-			self.set_attributes()
+		self.sort()
+		self.normalize()
+		self.set_attributes()
 
 	def normalize(self):
 		"""
@@ -140,17 +166,33 @@ class Cluster(list):
 			A, B, C = self[0][0], self[0][1], self[1][0]
 			init_memo_fast_distance(A)
 			if memo_fast_similitude(B) < memo_fast_similitude(C):
-				self[0][1], self[1][0] = self[1][0], self[0][1]
+				self[:] = [ [A, C], [B, self[1][1]] ]
 		self.is_normalized = True
 
 	def sort(self):
 		"""
 		Sort the ratios in the cluster according to closeness to median ratio,
-		i.e., the ratio with the least distance to all other ratios.
+		i.e., the ratio with the least distance to all other ratios (or to a sample of them).
+		The distance between two ratios is the distance between the strings 'A : B' and 'C : D'.
+		If distances between ratios were kept in self.distances (opt-in, see StrCluster.__reuse_distances__),
+		they are reused instead: the distance between A : B and C : D is then d(A, C) + d(B, D).
+		>>> cluster = Cluster.fromFile('a : ab :: abc : abcb :: ab : abb')
+		>>> cluster.sort(); cluster
+		ab : abb :: a : ab :: abc : abcb
+		>>> cluster = Cluster.fromFile('a : ab :: abc : abcb :: ab : abb')
+		>>> cluster.distances = np.array([[0, 5, 9], [5, 0, 6], [9, 6, 0]])
+		>>> cluster.sort(); cluster
+		abc : abcb :: a : ab :: ab : abb
 		"""
 		if self.is_sorted: return
-		ABs = [ NlgSymbols.ratio.join(ratio) for ratio in self ]
-		self[:] = [ str.split(NlgSymbols.ratio) for str in sort_by_median_ratio(ABs) ]
+		sample = sample_indices(len(self), __sample_size__, __seed__)
+		if self.distances is not None:
+			distances = self.distances[sample]
+		else:
+			ABs = [ NlgSymbols.ratio.join(ratio) for ratio in self ]
+			distances = distances_to_sample(ABs, sample)
+		self[:] = [ self[i] for i in median_order(distances) ]
+		self.distances = None
 		self.is_sorted = True
 	
 	def set_attributes(self):
@@ -163,12 +205,15 @@ class Cluster(list):
 		"""
 		if self.attributes_set: return
 		self.normalize()
-		Attributes = collections.namedtuple('Attributes', ['distance', 'left_diff', 'right_diff'])
-		A, B = self[0][0], self[0][1]
-		multisetA, multisetB = collections.Counter(A), collections.Counter(B)
-		self.attributes = Attributes(fast_distance(A, B), multisetA - multisetB, multisetB - multisetA)
+		self.attributes = Cluster.attributes_of(self[0][0], self[0][1])
 		self.attributes_set = True
 
+	@staticmethod
+	def attributes_of(A, B):
+		# Attributes of a cluster with first ratio A : B.
+		multisetA, multisetB = collections.Counter(A), collections.Counter(B)
+		return Attributes(distance(A, B), multisetA - multisetB, multisetB - multisetA)
+
 	def __eq__(self, other):
 		"""
 		Testing for equality with ==.
@@ -186,7 +231,7 @@ class Cluster(list):
 		if self.attributes == other.attributes:
 			for pair1 in self:
 				for pair2 in other:
-					if not fast_distance(pair1[0], pair2[0]) == fast_distance(pair1[1], pair2[1]):
+					if not distance(pair1[0], pair2[0]) == distance(pair1[1], pair2[1]):
 						return False
 			return True
 		else:
@@ -198,11 +243,19 @@ class Cluster(list):
 		"""
 		return list(zip(*self))
 
+	def keep(self, indices):
+		"""
+		Keep only the ratios of given indices (and their distances if any).
+		"""
+		self[:] = [ self[i] for i in indices ]
+		if self.distances is not None:
+			self.distances = self.distances[np.ix_(indices, indices)]
+
 	def filter_words(self, words, delete=True):
 		if delete:
-			self[:] = [ pair for pair in self if pair[0] not in words and pair[1] not in words ]
+			self.keep([ i for i, pair in enumerate(self) if pair[0] not in words and pair[1] not in words ])
 		else:
-			self[:] = [ pair for pair in self if pair[0] in words and pair[1] in words ]
+			self.keep([ i for i, pair in enumerate(self) if pair[0] in words and pair[1] in words ])
 
 	def is_empty_intersection(self, other):
 		selfAs, selfBs, otherAs, otherBs = self.AB_list(), other.AB_list()
@@ -216,8 +269,8 @@ class Cluster(list):
 		As, Bs = self.AB_list()
 		for i in range(length):
 			for j in range(i+1,length):
-				if fast_distance(As[i],As[j]) != fast_distance(Bs[i],Bs[j]) or \
-					fast_distance(As[i],Bs[i]) != fast_distance(As[j],Bs[j]):
+				if distance(As[i],As[j]) != distance(Bs[i],Bs[j]) or \
+					distance(As[i],Bs[i]) != distance(As[j],Bs[j]):
 						return False
 		return True
 
@@ -228,7 +281,7 @@ class Cluster(list):
 	def discard_duplicate_words(self):
 		As, Bs = self.AB_list()
 		A_counts, B_counts = collections.Counter(As), collections.Counter(Bs)
-		self[:] = [ [A, B] for [A, B] in self if A_counts[A] == 1 and B_counts[B] == 1 ]
+		self.keep([ i for i, [A, B] in enumerate(self) if A_counts[A] == 1 and B_counts[B] == 1 ])
 	
 	def look_up(self, string):
 		As, Bs = self.AB_list()
@@ -290,6 +343,49 @@ class ListOfClusters(list):
 		clusters = [ Cluster.fromFile(line) for line in file ]
 		return cls(clusters=clusters, indistinguishables=indistinguishables)
 	
+	@classmethod
+	def load(cls, path, mmap=True, compact=False):
+		"""
+		Class method: read clusters from a binary file (see ClusterFile).
+		With compact, the clusters are kept in a ClusterStore.
+		"""
+		if compact:
+			from nlg.Cluster.ClusterStore import ClusterStore
+			store = ClusterStore.load(path, mmap=mmap)
+			return cls(clusters=store, indistinguishables=store.indistinguishables)
+		file = ClusterFile.ClusterFile(path, mmap=mmap)
+		clusters = [ Cluster(ratios) for ratios in file ]
+		return cls(clusters=clusters, indistinguishables=Indistinguishables(file.indistinguishables()))
+
+	def save(self, path):
+		"""
+		Write the clusters into a binary file (see ClusterFile),
+		by decreasing sizes, as in the text format.
+
+		>>> import os, tempfile
+		>>> path = os.path.join(tempfile.mkdtemp(), 'test.nlgclu')
+		>>> clusters = ListOfClusters([ Cluster.fromFile('a : ab :: b : bb'), Cluster.fromFile('a : b :: ab : bb :: c : d') ], Indistinguishables({'c': ['c', 'e']}))
+		>>> clusters.save(path)
+		>>> print(ListOfClusters.load(path))
+		# c == e
+		# 
+		a : b :: ab : bb :: c : d
+		a : ab :: b : bb
+		"""
+		ClusterFile.write(path, sorted(self, key=len, reverse=True), self.indistinguishables)
+
+	def compact(self):
+		"""
+		Same list of clusters, kept in a ClusterStore.
+
+		>>> clusters = ListOfClusters([ Cluster.fromFile('a : ab :: b : bb'), Cluster.fromFile('a : b :: ab : bb :: c : d') ]).compact()
+		>>> clusters.clean(); print(clusters)
+		a : b :: ab : bb :: c : d
+		a : ab :: b : bb
+		"""
+		from nlg.Cluster.ClusterStore import ClusterStore
+		return type(self)(clusters=ClusterStore(self, self.indistinguishables), indistinguishables=self.indistinguishables)
+
 	@classmethod
 	def fromVectors(cls, vectors, **kwargs):
 		"""
@@ -300,7 +396,12 @@ class ListOfClusters(list):
 		clusterfile = NlgClusteringFromVectors(vectors, **kwargs)
 		return cls(clusters=clusterfile, indistinguishables=indistinguishables)
 
-	def clean(self):
+	def clean(self, ratios=False):
+		# Sort clusters by decreasing sizes.
+		# With ratios, also sort and normalize each cluster (see Cluster.clean).
+		if ratios:
+			for clu in self:
+				clu.clean()
 		if self.is_sorted: return
 		self[:] = sorted(self, key=len, reverse=True)
 		self.is_sorted = True
@@ -423,25 +524,25 @@ class ListOfClusters(list):
 
 def read_argv():
 
-	from optparse import OptionParser
+	from argparse import ArgumentParser
 	this_version = 'v%s (c) %s %s' % (__version__, __date__.split('/')[2], __author__)
 	this_description = __description__
-	this_usage = """%prog  <  FILE_OF_CLUSTERS
+	this_usage = """%(prog)s  <  FILE_OF_CLUSTERS
 	
 	Reorder clusters by decreasing sizes and by ratios closest to median ratio.
 	"""
 
-	parser = ArgumentParser(version=this_version, description=this_description, usage=this_usage)
+	parser = ArgumentParser(description=this_description, usage=this_usage)
 	parser.add_argument('--discard_duplicate_words',
                   action='store_true', default=False,
                   help='delete ratios which contain a word repeated in the cluster')
 	parser.add_argument('--delete_words',
-                  action='store', type='str', default=None,
+                  action='store', type=str, default=None,
 				  metavar='FILE',
                   help='delete all pairs in all clusters that contain a word ' \
 				  		'from the list of words given in the file FILE passed as argument')
 	parser.add_argument('--keep_words',
-                  action='store', type='str', default=None,
+                  action='store', type=str, default=None,
 				  metavar='FILE',
                   help='retain only pairs in clusters where both words are ' \
 				  		'from the list of words given in the file FILE passed as argument')
@@ -456,18 +557,29 @@ def read_argv():
 				  metavar='N',
                   help='print only the first N ratios in the cluster, median strings first, ' \
 				  		'print also the number of ratios in the cluster as a first column ' \
-				  		'(default is %default, i.e., all ratios, no number of ratios displayed)')
+				  		'(default is %(default)s, i.e., all ratios, no number of ratios displayed)')
 	parser.add_argument('-C', '--clean',
                   action='store_true', default=False,
                   help='clean the cluster file, i.e., ' \
 				  		'sort clusters by decreasing sizes and ' \
+				  		'sort ratios by closeness to median ratio and ' \
 				  		'normalize them (i.e., As are shorter than Bs).')
+	parser.add_argument('--sample-size',
+                  action='store', type=int, default=__sample_size__,
+				  metavar='N',
+                  help='compare ratios with a sample of N ratios only to find the median ratio (default: %(default)s)')
+	parser.add_argument('--seed',
+                  action='store', type=int, default=__seed__,
+                  help='random sample with this seed instead of a regular sample (default: %(default)s)')
 	parser.add_argument('-u', '--visualization',
                   action='store_true', default=False,
                   help='visualize distribution of strings by combined distances for each cluster')
 	parser.add_argument('-V', '--verbose',
                   action='store_true', default=False,
                   help='runs in verbose mode')
+	parser.add_argument('-T', '--test',
+                  action='store_true', default=False,
+                  help='run all unitary tests')
 	return parser.parse_args()
 
 ###############################################################################
@@ -483,6 +595,8 @@ if __name__ == '__main__':
 	__verbose__ = options.verbose
 	__visualization__ = options.visualization
 	__cluster_size__ = options.cluster_size
+	__sample_size__ = options.sample_size
+	__seed__ = options.seed
 	t1 = time.time()
 	clusterfile = ListOfClusters.fromFile()
 	if options.paradigm:
@@ -499,7 +613,7 @@ if __name__ == '__main__':
 			clusterfile.filter_words(options.delete_words, delete=True)
 		if None != options.keep_words:
 			clusterfile.filter_words(options.keep_words, delete=False)
-		clusterfile.clean()
+		clusterfile.clean(ratios=options.clean)
 		print(clusterfile)
 	if __verbose__: print('# Processing time: ' + ('%.2f' % (time.time() - t1)) + 's', file=sys.stderr)
 	
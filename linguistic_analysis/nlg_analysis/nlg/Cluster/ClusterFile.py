@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import struct
+import numpy as np
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'			# Creation.
+__date__, __version__ = '18/10/2026', '1.1'			# Add write_columns: write clusters already given by columns (see ClusterStore).
+__description__ = """Binary, columnar format for files of analogical clusters,
+read by memory mapping, instead of the text format A : B :: C : D.
+
+A file contains:
+	- a header: magic string, length of the JSON description of the sections, JSON description (padded);
+	- words: the table of words, in UTF-8, separated by new lines;
+	- A, B: the identifiers of the words of each ratio A : B of all clusters (int32);
+	- clusters: the index of the first ratio of each cluster in A and B, plus the total number of ratios (int64);
+	- equivalents, groups: the identifiers of the indistinguishable words, and the index of each group in equivalents.
+"""
+
+__verbose__ = False
+
+magic = b'NLGCLU\x00\x01'
+__alignment__ = 8
+__chunk_size__ = 1 << 16		# Number of clusters converted at once when iterating.
+
+###############################################################################
+
+def is_cluster_file(path):
+	"""
+	True if the file at path is a binary file of clusters.
+	"""
+	try:
+		with open(path, 'rb') as file:
+			return file.read(len(magic)) == magic
+	except OSError:
+		return False
+
+def write(path, clusters, indistinguishables=None):
+	"""
+	Write clusters (lists of ratios, a ratio is a pair of words)
+	and indistinguishables (dictionary of lists of words, see Indistinguishables) into a binary file.
+
+	>>> import os, tempfile
+	>>> path = os.path.join(tempfile.mkdtemp(), 'test.nlgclu')
+	>>> write(path, [ [['a', 'ab'], ['b', 'bb']], [['a', 'b'], ['ab', 'bb'], ['c', 'd']] ], { 'c': ['c', 'e'] })
+	>>> file = ClusterFile(path)
+	>>> len(file), file.sizes().tolist(), file[1], file.indistinguishables()
+	(2, [2, 3], [['a', 'b'], ['ab', 'bb'], ['c', 'd']], {'c': ['c', 'e']})
+	"""
+	ids = dict()
+	def word_id(word):
+		i = ids.get(word)
+		if i is None:
+			if '\n' in word: raise ValueError('new line in word: %r' % word)
+			i = ids[word] = len(ids)
+		return i
+
+	As, Bs, clusters_index = [], [], [ 0 ]
+	for cluster in clusters:
+		for A, B in cluster:
+			As.append(word_id(A))
+			Bs.append(word_id(B))
+		clusters_index.append(len(As))
+	write_columns(path, ids, As, Bs, clusters_index, indistinguishables, word_id)
+
+def write_columns(path, words, A, B, clusters_index, indistinguishables=None, word_id=None):
+	"""
+	Write clusters given by columns: table of words, identifiers of the words of the ratios in A and B,
+	index of the first ratio of each cluster (plus the total number of ratios).
+	word_id gives the identifier of a word of the indistinguishables and may add it to words.
+	"""
+	if word_id is None:
+		ids = { word: i for i, word in enumerate(words) }
+		words = list(words)
+		def word_id(word):
+			i = ids.get(word)
+			if i is None:
+				i = ids[word] = len(words)
+				words.append(word)
+			return i
+	equivalents, groups = [], [ 0 ]
+	for key in sorted(indistinguishables or {}):
+		equivalents.extend( word_id(word) for word in indistinguishables[key] )
+		groups.append(len(equivalents))
+
+	sections = [
+		('words', np.frombuffer('\n'.join(words).encode('utf-8'), dtype=np.uint8)),
+		('A', np.asarray(A, dtype=np.int32)),
+		('B', np.asarray(B, dtype=np.int32)),
+		('clusters', np.asarray(clusters_index, dtype=np.int64)),
+		('equivalents', np.array(equivalents, dtype=np.int32)),
+		('groups', np.array(groups, dtype=np.int64)),
+		]
+	write_sections(path, sections, magic, words=len(words))
+
+def write_sections(path, sections, magic=magic, **description):
+	"""
+	Write the NumPy arrays of sections (list of pairs (name, array)) into a file,
+	after a header describing them (with the other items of description).
+	The offsets of the sections are relative to the start of the data, after the header.
+	"""
+	description = dict(version=1, sections=dict(), **description)
+	start = 0
+	for name, array in sections:
+		description['sections'][name] = { 'offset': start, 'dtype': array.dtype.str, 'length': len(array) }
+		start += -(-array.nbytes // __alignment__) * __alignment__
+	header = json.dumps(description).encode('utf-8')
+	header += b' ' * (-(len(magic) + 8 + len(header)) % __alignment__)
+	with open(path, 'wb') as file:
+		file.write(magic)
+		file.write(struct.pack('<Q', len(header)))
+		file.write(header)
+		for name, array in sections:
+			file.write(array.tobytes())
+			file.write(b'\0' * (-array.nbytes % __alignment__))
+
+def read_sections(path, magic=magic, mmap=True):
+	"""
+	Read the description and the sections of a file written by write_sections.
+	The sections are memory-mapped NumPy arrays if mmap is True.
+	"""
+	with open(path, 'rb') as file:
+		if file.read(len(magic)) != magic:
+			raise ValueError('%s: wrong file type' % path)
+		header_length, = struct.unpack('<Q', file.read(8))
+		description = json.loads(file.read(header_length).decode('utf-8'))
+	data_start = len(magic) + 8 + header_length
+	sections = dict()
+	for name, section in description['sections'].items():
+		dtype, length = np.dtype(section['dtype']), section['length']
+		if 0 == length:
+			sections[name] = np.empty(0, dtype=dtype)
+		elif mmap:
+			sections[name] = np.memmap(path, dtype=dtype, mode='r', offset=data_start + section['offset'], shape=(length,))
+		else:
+			with open(path, 'rb') as file:
+				file.seek(data_start + section['offset'])
+				sections[name] = np.fromfile(file, dtype=dtype, count=length)
+	return description, sections
+
+###############################################################################
+
+class ClusterFile:
+	"""
+	Read access to a binary file of clusters.
+	The columns of the ratios are memory-mapped, only the table of words is read into memory.
+	"""
+
+	def __init__(self, path, mmap=True):
+		self.path = path
+		self.description, self.sections = read_sections(path, magic, mmap)
+		words = self.sections['words'].tobytes().decode('utf-8')
+		self.words = words.split('\n') if 0 < self.description['words'] else []
+		self.A, self.B, self.clusters = self.sections['A'], self.sections['B'], self.sections['clusters']
+
+	def __len__(self):
+		return len(self.clusters) - 1
+
+	def sizes(self):
+		"""
+		Numbers of ratios of all the clusters.
+		"""
+		return np.diff(self.clusters)
+
+	def __getitem__(self, i):
+		"""
+		Ratios of the i-th cluster, as a list of pairs of words.
+		"""
+		if i < 0: i += len(self)
+		if not 0 <= i < len(self): raise IndexError('cluster index out of range')
+		first, last = int(self.clusters[i]), int(self.clusters[i+1])
+		words = self.words
+		return [ [words[a], words[b]] for a, b in zip(self.A[first:last].tolist(), self.B[first:last].tolist()) ]
+
+	def __iter__(self):
+		# The columns are converted by chunks of clusters, not cluster by cluster.
+		words = self.words
+		for start in range(0, len(self), __chunk_size__):
+			index = self.clusters[start:start + __chunk_size__ + 1].tolist()
+			As = self.A[index[0]:index[-1]].tolist()
+			Bs = self.B[index[0]:index[-1]].tolist()
+			for first, last in zip(index, index[1:]):
+				yield [ [words[As[k - index[0]]], words[Bs[k - index[0]]]] for k in range(first, last) ]
+
+	def indistinguishables(self):
+		"""
+		Dictionary of the indistinguishable words (see Indistinguishables).
+		"""
+		words, equivalents, groups = self.words, self.sections['equivalents'].tolist(), self.sections['groups'].tolist()
+		result = dict()
+		for first, last in zip(groups, groups[1:]):
+			group = [ words[i] for i in equivalents[first:last] ]
+			result[group[0]] = group
+		return result
+
+###############################################################################
+
+if __name__ == '__main__':
+	import doctest
+	doctest.testmod()
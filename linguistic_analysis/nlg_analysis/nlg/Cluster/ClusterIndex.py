@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import hashlib
+import collections
+import numpy as np
+
+import nlg.NlgSymbols as NlgSymbols
+import nlg.Cluster.ClusterFile as ClusterFile
+from nlg.Cluster.Cluster import Cluster, ListOfClusters
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'			# Creation.
+__description__ = """Index over a file of clusters (text or binary, see ClusterFile),
+kept alongside the file (FILE.idx) and rebuilt when the file changes (SHA-256 hash of its contents).
+Gives, without reading the whole file:
+	- the clusters which contain a word;
+	- the clusters of a size in a range;
+	- the paradigm lexicon of some words.
+"""
+
+__verbose__ = False
+
+magic = b'NLGIDX\x00\x01'
+__suffix__ = '.idx'
+
+###############################################################################
+
+def file_hash(path):
+	"""
+	SHA-256 hash of the contents of a file.
+	"""
+	sha = hashlib.sha256()
+	with open(path, 'rb') as file:
+		for block in iter(lambda: file.read(1 << 20), b''):
+			sha.update(block)
+	return sha.hexdigest()
+
+def file_stamp(path):
+	stat = os.stat(path)
+	return [ stat.st_size, stat.st_mtime_ns ]
+
+def ratios_of_line(line):
+	return [ [ word.strip() for word in ratio.split(NlgSymbols.ratio) ] for ratio in line.strip().split(NlgSymbols.conformity) ]
+
+###############################################################################
+
+class ClusterIndex:
+	"""
+	Index over a file of clusters.
+	The clusters are numbered in the order of the file.
+	Sections of the index file:
+		words: table of all words, in UTF-8, separated by new lines;
+		postings, word_clusters: numbers of the clusters of each word (postings[word_clusters[w]:word_clusters[w+1]]);
+		locations: position of each cluster in the file (byte offset of its line for a text file, its number for a binary file);
+		sizes: number of ratios of each cluster;
+		by_size: numbers of the clusters by decreasing sizes (stable).
+
+	>>> import tempfile
+	>>> path = os.path.join(tempfile.mkdtemp(), 'test.clu')
+	>>> _ = open(path, 'w').write('# c == e\\n# \\na : b :: ab : bb :: c : d\\na : ab :: b : bb\\n')
+	>>> index = ClusterIndex(path)
+	>>> index.clusters_with('bb').tolist(), index.clusters_with('d').tolist(), index.clusters_with('x').tolist()
+	([0, 1], [0], [])
+	>>> index.clusters_of_size(3).tolist(), index.clusters_of_size(2, 2).tolist()
+	([0], [1])
+	>>> index.cluster(1)
+	a : ab :: b : bb
+	>>> sorted(index.paradigm_lexicon(['a'])['a'])
+	['ab', 'b']
+	>>> ClusterIndex(path).is_rebuilt
+	False
+	"""
+
+	def __init__(self, path, verify=False):
+		"""
+		Open the index of the file of clusters at path, build it if it does not exist or is out of date.
+		The index is out of date if the hash of the file has changed.
+		The hash is computed only if the size or the time of modification of the file changed, or with verify.
+		"""
+		self.path = path
+		self.index_path = path + __suffix__
+		self.binary = ClusterFile.is_cluster_file(path)
+		self.is_rebuilt = not self._open(verify)
+		if self.is_rebuilt:
+			self.build()
+			self._open(verify=False)
+		self.word_ids = { word: i for i, word in enumerate(self.words) }
+		self._file = None
+
+	def _open(self, verify):
+		# Returns False if the index does not exist or is out of date.
+		try:
+			self.description, self.sections = ClusterFile.read_sections(self.index_path, magic)
+		except (OSError, ValueError):
+			return False
+		if verify or self.description['stamp'] != file_stamp(self.path):
+			if self.description['hash'] != file_hash(self.path):
+				return False
+		words = self.sections['words'].tobytes().decode('utf-8')
+		self.words = words.split('\n') if 0 < self.description['words'] else []
+		self.postings, self.word_clusters = self.sections['postings'], self.sections['word_clusters']
+		self.locations, self.sizes, self.by_size = self.sections['locations'], self.sections['sizes'], self.sections['by_size']
+		return True
+
+	def build(self):
+		"""
+		Read the file of clusters once and write the index.
+		"""
+		t1 = time.time()
+		ids = dict()
+		cluster_words, locations, sizes = [], [], []
+		if self.binary:
+			file = ClusterFile.ClusterFile(self.path)
+			ids = { word: i for i, word in enumerate(file.words) }
+			sizes = file.sizes()
+			locations = np.arange(len(file), dtype=np.int64)
+			numbers = np.repeat(np.arange(len(file), dtype=np.int32), sizes)
+			words = np.concatenate((file.A, file.B)).astype(np.int32)
+			numbers = np.concatenate((numbers, numbers))
+		else:
+			numbers = []
+			with open(self.path, 'rb') as file:
+				offset = 0
+				for line in file:
+					if not line.startswith(NlgSymbols.comment.encode('utf-8')) and line.strip():
+						ratios = ratios_of_line(line.decode('utf-8'))
+						for ratio in ratios:
+							for word in ratio:
+								i = ids.get(word)
+								if i is None: i = ids[word] = len(ids)
+								cluster_words.append(i)
+						numbers.extend([ len(locations) ] * (2 * len(ratios)))
+						locations.append(offset)
+						sizes.append(len(ratios))
+					offset += len(line)
+			words = np.array(cluster_words, dtype=np.int32)
+			numbers = np.array(numbers, dtype=np.int32)
+		# Postings: sorted by word, then by cluster number, without repetitions.
+		pairs = np.unique(words.astype(np.int64) * (len(locations) + 1) + numbers)
+		words, numbers = pairs // (len(locations) + 1), (pairs % (len(locations) + 1)).astype(np.int32)
+		word_clusters = np.searchsorted(words, np.arange(len(ids) + 1)).astype(np.int64)
+		sizes = np.asarray(sizes, dtype=np.int32)
+		sections = [
+			('words', np.frombuffer('\n'.join(ids).encode('utf-8'), dtype=np.uint8)),
+			('postings', numbers),
+			('word_clusters', word_clusters),
+			('locations', np.asarray(locations, dtype=np.int64)),
+			('sizes', sizes),
+			('by_size', np.argsort(-sizes, kind='stable').astype(np.int32)),
+			]
+		ClusterFile.write_sections(self.index_path, sections, magic,
+			words=len(ids), stamp=file_stamp(self.path), hash=file_hash(self.path))
+		if __verbose__: print('# Index of %s built: %d clusters, %d words (%.2fs)' % \
+			(self.path, len(sizes), len(ids), time.time() - t1), file=sys.stderr)
+
+	def __len__(self):
+		return len(self.locations)
+
+	def look_up(self, word):
+		"""
+		True if the word appears in a cluster of the file.
+		"""
+		return word in self.word_ids
+
+	def clusters_with(self, word):
+		"""
+		Numbers of the clusters which contain word, in increasing order.
+		"""
+		i = self.word_ids.get(word)
+		if i is None: return np.empty(0, dtype=np.int32)
+		return self.postings[self.word_clusters[i]:self.word_clusters[i+1]]
+
+	def clusters_of_size(self, minsize, maxsize=None):
+		"""
+		Numbers of the clusters with a number of ratios between minsize and maxsize (None for no limit),
+		by decreasing sizes.
+		"""
+		sizes = self.sizes[self.by_size]
+		# sizes are in decreasing order: search in their opposites.
+		first = 0 if maxsize is None else np.searchsorted(-sizes, -maxsize, side='left')
+		last = np.searchsorted(-sizes, -minsize, side='right')
+		return self.by_size[first:last]
+
+	def cluster(self, number):
+		"""
+		Cluster of given number, read from the file.
+		"""
+		if self.binary:
+			if self._file is None: self._file = ClusterFile.ClusterFile(self.path)
+			return Cluster(self._file[number])
+		if self._file is None: self._file = open(self.path, 'rb')
+		self._file.seek(int(self.locations[number]))
+		return Cluster(ratios_of_line(self._file.readline().decode('utf-8')))
+
+	def clusters(self, numbers):
+		"""
+		List of the clusters of given numbers, read from the file.
+		"""
+		return ListOfClusters([ self.cluster(number) for number in numbers ])
+
+	def paradigm_lexicon(self, words):
+		"""
+		Same as ListOfClusters.paradigm_lexicon, restricted to some words,
+		by reading only the clusters which contain them.
+		"""
+		words = set(words)
+		numbers = sorted(set( number for word in words for number in self.clusters_with(word).tolist() ))
+		lexicon = collections.defaultdict(set)
+		for number in numbers:
+			for A, B in self.cluster(number):
+				if A in words: lexicon[A].add(B)
+				if B in words: lexicon[B].add(A)
+		return lexicon
+
+###############################################################################
+
+def read_argv():
+	import argparse
+	this_version = 'v%s (c) %s %s' % (__version__, __date__.split('/')[2], __author__)
+	this_description = __description__
+	this_usage = """
+	%(prog)s  [-w WORD]  [-m MIN_SIZE]  [-M MAX_SIZE]  FILE_OF_CLUSTERS
+	"""
+
+	parser = argparse.ArgumentParser(description=this_description, usage=this_usage)
+	parser.add_argument('file',
+					action='store', type=str,
+					help='file of clusters (text or binary)')
+	parser.add_argument('-w', '--word',
+					action='store', type=str, default=None,
+					help='print only the clusters which contain WORD')
+	parser.add_argument('-m', '--minimal_cluster_size',
+					action='store', type=int, default=2,
+					help='print only the clusters of size at least this (default: %(default)s)')
+	parser.add_argument('-M', '--maximal_cluster_size',
+					action='store', type=int, default=None,
+					help='print only the clusters of size at most this (default: no limit)')
+	parser.add_argument('-p', '--paradigm',
+					action='store', type=str, nargs='+', default=None,
+					metavar='WORD',
+					help='print the paradigm lexicon of the words')
+	parser.add_argument('--verify',
+					action='store_true', default=False,
+					help='always check the hash of the file, not only if its size or time of modification changed')
+	parser.add_argument('-V', '--verbose',
+					action='store_true', default=False,
+					help='runs in verbose mode')
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	options = read_argv()
+	__verbose__ = options.verbose
+	t1 = time.time()
+	index = ClusterIndex(options.file, verify=options.verify)
+	if options.paradigm is not None:
+		lexicon = index.paradigm_lexicon(options.paradigm)
+		for key in sorted(lexicon, key=lambda x: (len(lexicon[x]), x), reverse=True):
+			print('%s: { %s }' % (key, ', '.join(sorted(lexicon[key]))))
+	else:
+		numbers = index.clusters_of_size(options.minimal_cluster_size, options.maximal_cluster_size)
+		if options.word is not None:
+			numbers = np.intersect1d(numbers, index.clusters_with(options.word))
+			numbers = numbers[np.argsort(-index.sizes[numbers], kind='stable')]
+		for number in numbers.tolist():
+			print(index.cluster(number))
+	if __verbose__: print('# Processing time: %.3fs' % (time.time() - t1), file=sys.stderr)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import nlg.Cluster.ClusterFile as ClusterFile
+from nlg.Cluster.Cluster import Cluster
+from nlg.Cluster.Words2Clusters.Indistinguishables import Indistinguishables
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'			# Creation.
+__description__ = """Compact store for large numbers of analogical clusters.
+The words are interned in a table and the ratios of all clusters are kept in two columns of int32,
+instead of one Python list of two strings for each ratio.
+The clusters are accessed through light views with the same interface as Cluster.
+"""
+
+__verbose__ = False
+__trace__ = False
+
+__initial_capacity__ = 1024
+
+SORTED, NORMALIZED = 1, 2			# Flags of a cluster.
+
+###############################################################################
+
+class ClusterStore:
+	"""
+	Store of clusters:
+		words: table of the words, ids: identifier of each word in the table;
+		A, B: identifiers of the words of the ratios, the ratios of a cluster being contiguous;
+		starts, lengths: first ratio and number of ratios of each cluster;
+		flags: sorted, normalized;
+		attributes: attributes of the clusters for which they were asked (see Cluster.set_attributes).
+	The capacity of the arrays is doubled when they are full.
+
+	>>> store = ClusterStore([ Cluster.fromFile('a : ab :: b : bb'), Cluster.fromFile('a : b :: ab : bb :: c : d') ])
+	>>> len(store), len(store.words), len(store[1])
+	(2, 6, 3)
+	>>> store[1]
+	a : b :: ab : bb :: c : d
+	>>> store[1].AB_list()
+	[('a', 'ab', 'c'), ('b', 'bb', 'd')]
+	>>> store[1].look_up('bb'), store[1].look_up('x')
+	(True, False)
+	>>> store[1].keep([2, 0]); store[1]
+	c : d :: a : b
+	>>> cluster = store.append([['ab', 'a'], ['bb', 'b']]); store[2].normalize(); store[2]
+	a : ab :: b : bb
+	"""
+
+	def __init__(self, clusters=(), indistinguishables=None):
+		self.words, self.ids = [], dict()
+		self.A = np.empty(__initial_capacity__, dtype=np.int32)
+		self.B = np.empty(__initial_capacity__, dtype=np.int32)
+		self.starts = np.empty(__initial_capacity__, dtype=np.int64)
+		self.lengths = np.empty(__initial_capacity__, dtype=np.int32)
+		self.flags = np.empty(__initial_capacity__, dtype=np.uint8)
+		self.nratios, self.nclusters = 0, 0
+		self.attributes = dict()
+		if indistinguishables is None and hasattr(clusters, 'indistinguishables'):
+			indistinguishables = clusters.indistinguishables
+		self.indistinguishables = indistinguishables
+		self.extend(clusters)
+
+	@classmethod
+	def load(cls, path, mmap=True):
+		"""
+		Read a binary file of clusters (see ClusterFile) without converting the ratios into strings.
+		"""
+		file = ClusterFile.ClusterFile(path, mmap=mmap)
+		self = cls(indistinguishables=Indistinguishables(file.indistinguishables()))
+		self.words = list(file.words)
+		self.ids = { word: i for i, word in enumerate(self.words) }
+		self.A, self.B = np.array(file.A, dtype=np.int32), np.array(file.B, dtype=np.int32)
+		self.starts = np.array(file.clusters[:-1], dtype=np.int64)
+		self.lengths = np.diff(file.clusters).astype(np.int32)
+		self.flags = np.zeros(len(file), dtype=np.uint8)
+		self.nratios, self.nclusters = len(self.A), len(file)
+		return self
+
+	def save(self, path, numbers=None):
+		"""
+		Write the clusters (or only those of given numbers, in this order) into a binary file (see ClusterFile).
+		"""
+		if numbers is None: numbers = np.arange(self.nclusters)
+		numbers = np.asarray(numbers, dtype=np.int64)
+		lengths = self.lengths[numbers].astype(np.int64)
+		index = np.concatenate(([ 0 ], np.cumsum(lengths)))
+		# Position of each ratio in the columns: start of its cluster plus its rank in the cluster.
+		positions = np.repeat(self.starts[numbers] - index[:-1], lengths) + np.arange(index[-1])
+		ClusterFile.write_columns(path, self.words, self.A[positions], self.B[positions], index, self.indistinguishables)
+
+	def word_id(self, word):
+		i = self.ids.get(word)
+		if i is None:
+			i = self.ids[word] = len(self.words)
+			self.words.append(word)
+		return i
+
+	def _reserve(self, nratios, nclusters):
+		# Double the capacity of the arrays until the new ratios and clusters fit.
+		if len(self.A) < self.nratios + nratios:
+			capacity = len(self.A)
+			while capacity < self.nratios + nratios: capacity *= 2
+			self.A, self.B = np.resize(self.A, capacity), np.resize(self.B, capacity)
+		if len(self.starts) < self.nclusters + nclusters:
+			capacity = len(self.starts)
+			while capacity < self.nclusters + nclusters: capacity *= 2
+			self.starts, self.lengths, self.flags = np.resize(self.starts, capacity), np.resize(self.lengths, capacity), np.resize(self.flags, capacity)
+
+	def append(self, ratios):
+		"""
+		Add a cluster given by its ratios. Returns its number.
+		"""
+		ratios = list(ratios)
+		self._reserve(len(ratios), 1)
+		first, number = self.nratios, self.nclusters
+		for k, (A, B) in enumerate(ratios, first):
+			self.A[k], self.B[k] = self.word_id(A), self.word_id(B)
+		self.starts[number], self.lengths[number], self.flags[number] = first, len(ratios), 0
+		self.nratios, self.nclusters = first + len(ratios), number + 1
+		return number
+
+	def extend(self, clusters):
+		for cluster in clusters:
+			self.append(cluster)
+
+	def __len__(self):
+		return self.nclusters
+
+	def __getitem__(self, number):
+		if number < 0: number += self.nclusters
+		if not 0 <= number < self.nclusters: raise IndexError('cluster index out of range')
+		return ClusterView(self, number)
+
+	def __iter__(self):
+		for number in range(self.nclusters):
+			yield ClusterView(self, number)
+
+	def nbytes(self):
+		"""
+		Memory used by the arrays (not counting the table of words).
+		"""
+		return self.A.nbytes + self.B.nbytes + self.starts.nbytes + self.lengths.nbytes + self.flags.nbytes
+
+###############################################################################
+
+class ClusterView:
+	"""
+	A cluster in a ClusterStore, with the same interface as Cluster.
+	Only the store and the number of the cluster are kept.
+	The methods which reorder or modify the ratios write them back into the store.
+	"""
+
+	__slots__ = ('store', 'number')
+
+	def __init__(self, store, number):
+		self.store = store
+		self.number = number
+
+	def _range(self):
+		first = int(self.store.starts[self.number])
+		return first, first + int(self.store.lengths[self.number])
+
+	def __len__(self):
+		return int(self.store.lengths[self.number])
+
+	def __getitem__(self, i):
+		ratios = list(self)
+		return ratios[i]
+
+	def __iter__(self):
+		first, last = self._range()
+		words = self.store.words
+		for a, b in zip(self.store.A[first:last].tolist(), self.store.B[first:last].tolist()):
+			yield [ words[a], words[b] ]
+
+	def _write(self, ratios):
+		# Write ratios in place of the ratios of the cluster (at most as many).
+		first, last = self._range()
+		assert len(ratios) <= last - first, 'a cluster in a store cannot grow'
+		store = self.store
+		for k, (A, B) in enumerate(ratios, first):
+			store.A[k], store.B[k] = store.word_id(A), store.word_id(B)
+		store.lengths[self.number] = len(ratios)
+		store.attributes.pop(self.number, None)
+
+	def _flag(self, flag):
+		return bool(self.store.flags[self.number] & flag)
+
+	def _set_flag(self, flag):
+		self.store.flags[self.number] |= flag
+
+	@property
+	def is_sorted(self):
+		return self._flag(SORTED)
+
+	@property
+	def is_normalized(self):
+		return self._flag(NORMALIZED)
+
+	@property
+	def is_analogy(self):
+		return 2 == len(self)
+
+	@property
+	def distances(self):
+		# Distances between ratios are not kept in a store.
+		return None
+
+	@property
+	def indistinguishables(self):
+		return self.store.indistinguishables
+
+	@indistinguishables.setter
+	def indistinguishables(self, indistinguishables):
+		self.store.indistinguishables = indistinguishables
+
+	def to_cluster(self):
+		"""
+		Cluster with the same ratios, out of the store.
+		"""
+		return Cluster(list(self))
+
+	def AB_list(self):
+		"""
+		Returns two lists: the list of As and the list of Bs.
+		"""
+		first, last = self._range()
+		words = self.store.words
+		return [ tuple( words[a] for a in self.store.A[first:last].tolist() ),
+				tuple( words[b] for b in self.store.B[first:last].tolist() ) ]
+
+	def look_up(self, string):
+		i = self.store.ids.get(string)
+		if i is None: return False
+		first, last = self._range()
+		return bool((self.store.A[first:last] == i).any() or (self.store.B[first:last] == i).any())
+
+	def keep(self, indices):
+		"""
+		Keep only the ratios of given indices.
+		"""
+		first, last = self._range()
+		indices = first + np.asarray(indices, dtype=np.int64)
+		A, B = self.store.A[indices], self.store.B[indices]
+		self.store.A[first:first + len(indices)], self.store.B[first:first + len(indices)] = A, B
+		self.store.lengths[self.number] = len(indices)
+		self.store.attributes.pop(self.number, None)
+
+	def normalize(self):
+		"""
+		Exchange As and Bs so that As are smaller than Bs (see Cluster.normalize).
+		"""
+		if self.is_normalized: return
+		cluster = self.to_cluster()
+		cluster.normalize()
+		self._write(cluster)
+		self._set_flag(NORMALIZED)
+
+	def sort(self):
+		"""
+		Sort the ratios according to closeness to median ratio (see Cluster.sort).
+		"""
+		if self.is_sorted: return
+		cluster = self.to_cluster()
+		cluster.sort()
+		self._write(cluster)
+		self._set_flag(SORTED)
+
+	def clean(self):
+		self.sort()
+		self.normalize()
+
+	def set_attributes(self):
+		self.normalize()
+
+	@property
+	def attributes(self):
+		# Computed on demand and kept in the store until the ratios change.
+		attributes = self.store.attributes.get(self.number)
+		if attributes is None:
+			attributes = self.store.attributes[self.number] = Cluster.attributes_of(*next(iter(self)))
+		return attributes
+
+	filter_words = Cluster.filter_words
+	all_distances_correct = Cluster.all_distances_correct
+	no_duplicate_words = Cluster.no_duplicate_words
+	discard_duplicate_words = Cluster.discard_duplicate_words
+	__eq__ = Cluster.__eq__
+	__hash__ = None
+	__repr__ = Cluster.__repr__
+
+###############################################################################
+
+if __name__ == '__main__':
+	import doctest
+	doctest.testmod()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import numpy as np
+
+import nlg.Cluster.ClusterFile as ClusterFile
+import nlg.Cluster.Words2Clusters.Words2Vectors as Words2Vectors
+
+from nlg.Cluster.Words2Clusters.Indistinguishables import Indistinguishables
+from nlg.Cluster.Words2Clusters.nlgclu import CFeatureTree, nlgclu_in_memory
+from nlg.Cluster.Words2Clusters.StrCluster import StrCluster, ListOfStrClusters, iter_verified_clusters
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'			# Creation.
+__description__ = """Incremental analogical clustering of a growing vocabulary.
+The clusters of the vocabulary are kept in a directory.
+When new words are added, the C program explores only the pairs of nodes of the feature tree
+which contain a new word, and the clusters obtained are merged with the clusters kept:
+	- the clusters kept which are extended by new words are replaced by their extensions;
+	- only the new clusters and the clusters kept whose indistinguishable words changed
+	  are verified against the distance constraint.
+The result is the same set of clusters as the clustering of the whole vocabulary from scratch.
+"""
+
+__verbose__ = False
+__trace__ = False
+
+###############################################################################
+
+def escaped(word):
+	# The words are escaped in the same way in the clusters output by nlgclu (see CFeatureTree.Clines).
+	return word.replace(':', '\\:')
+
+###############################################################################
+
+class IncrementalClustering:
+	"""
+	State of the clustering of a vocabulary, kept in a directory (path):
+		parameters.json: the parameters of the clustering;
+		words.txt: the vocabulary, one word per line;
+		clusters.nlgclu: the clusters output by nlgclu (binary format, see ClusterFile),
+			with the indistinguishable words;
+		strclusters.nlgclu: the clusters which meet the distance constraint,
+			in the order of the clusters they come from;
+		origins.npy: for each strcluster, the number of the cluster it comes from.
+
+	>>> import tempfile
+	>>> path = tempfile.mkdtemp()
+	>>> clustering = IncrementalClustering(path)
+	>>> clustering.add(['a', 'b', 'ab'])
+	3
+	>>> clustering.save()
+	>>> clustering = IncrementalClustering(path)
+	>>> clustering.add(['a', 'bb', 'abb', 'ba'])
+	3
+	>>> print(clustering.strclusters())
+	# ab == ba
+	# 
+	b : bb :: a : ab :: ab : abb
+	b : ab :: bb : abb
+	b : a :: bb : ab
+	b : a :: bb : ba
+	b : bb :: a : ba
+	>>> from_scratch = IncrementalClustering(tempfile.mkdtemp())
+	>>> from_scratch.add(['a', 'b', 'ab', 'bb', 'abb', 'ba'])
+	6
+	>>> sorted(clustering.strclusters()) == sorted(from_scratch.strclusters())
+	True
+	"""
+
+	def __init__(self, path, minimal_size=2, maximal_size=None, clean=False, workers=1, verbose=False):
+		"""
+		Open the state of the clustering kept in the directory path, or create an empty one.
+		The parameters should be the same as those of the state kept.
+		"""
+		self.path = path
+		self.workers = workers
+		self.verbose = verbose or __verbose__
+		self.parameters = { 'minimal_size': minimal_size, 'maximal_size': maximal_size, 'clean': clean }
+		if os.path.exists(self._file('parameters.json')):
+			with open(self._file('parameters.json')) as file:
+				parameters = json.load(file)
+			if parameters != self.parameters:
+				raise ValueError('%s: clustering kept with other parameters (%s)' % (path, parameters))
+			with open(self._file('words.txt')) as file:
+				self.words = [ line.rstrip('\n') for line in file ]
+			file = ClusterFile.ClusterFile(self._file('clusters.nlgclu'))
+			self.clusters = list(file)
+			self.indistinguishables = file.indistinguishables()
+			self.verified = [ [] for _ in self.clusters ]
+			for number, strcluster in zip(np.load(self._file('origins.npy')).tolist(), ClusterFile.ClusterFile(self._file('strclusters.nlgclu'))):
+				self.verified[number].append(strcluster)
+		else:
+			os.makedirs(path, exist_ok=True)
+			self.words, self.clusters, self.indistinguishables, self.verified = [], [], dict(), []
+
+	def _file(self, name):
+		return os.path.join(self.path, name)
+
+	def add(self, words):
+		"""
+		Add words to the vocabulary and update the clusters.
+		Returns the number of new words.
+		"""
+		t1 = time.time()
+		known = set(self.words)
+		new_words = sorted(set( word.strip() for word in words ) - known - { '' })
+		if 0 == len(new_words): return 0
+		self.words += new_words
+
+		vectors = Words2Vectors.FeatureVectors(Words2Vectors.Words(self.words), char_features=True)
+		indistinguishables = vectors.indistinguishables
+		# The feature tree is built again: the new words change the numbering of the objects and the nodes.
+		featuretree = CFeatureTree.fromVectors(vectors.get_distinguishables())
+		objects = set(featuretree.Clines)
+		# Only the clusters which contain a new object are explored.
+		# A new word which becomes the representative of old indistinguishable words is a new object.
+		# All clusters are output, whatever their sizes: a cluster kept may be extended beyond the maximal size.
+		marks = None
+		if 0 < len(known):
+			new_objects = set( escaped(word) for word in new_words )
+			marks = [ line in new_objects for line in featuretree.Clines ]
+		clusters = nlgclu_in_memory(featuretree, featuretree,
+			minimal_size=self.parameters['minimal_size'],
+			maximal_size=None,
+			verbose=self.verbose,
+			marks=marks)
+		if self.verbose: print('# %d new words, %d clusters containing them (%.2fs)' % \
+			(len(new_words), len(clusters), time.time() - t1), file=sys.stderr)
+
+		# The clusters kept which are extended by new words are discarded,
+		# as well as those with an object which is no longer the representative of its indistinguishable words.
+		extended = set()
+		for cluster in clusters:
+			for A, B in cluster:
+				extended.update([ (A, B), (B, A) ])
+		kept = [ number for number, cluster in enumerate(self.clusters)
+					if all( A in objects and B in objects and (A, B) not in extended for A, B in cluster ) ]
+		# The clusters kept with new indistinguishable words have to be verified again.
+		changed = set( escaped(word) for word, group in indistinguishables.items()
+					if self.indistinguishables.get(word, [ word ]) != group )
+		dirty = [ any( A in changed or B in changed for A, B in self.clusters[number] ) for number in kept ]
+
+		maximal_size = self.parameters['maximal_size']
+		clusters = [ [ list(ratio) for ratio in cluster ] for cluster in clusters if maximal_size is None or len(cluster) <= maximal_size ]
+		to_verify = [ self.clusters[number] for number, is_dirty in zip(kept, dirty) if is_dirty ] + clusters
+		verified = iter_verified_clusters(to_verify, indistinguishables, workers=self.workers, clean=self.parameters['clean'])
+		result = []
+		for number, is_dirty in zip(kept, dirty):
+			result.append(self._in_range(next(verified)) if is_dirty else self.verified[number])
+		result += [ self._in_range(strclusters) for strclusters in verified ]
+		if self.verbose: print('# %d clusters kept, %d verified again, %d new (%.2fs)' % \
+			(len(kept), sum(dirty), len(clusters), time.time() - t1), file=sys.stderr)
+
+		self.clusters = [ self.clusters[number] for number in kept ] + clusters
+		self.verified = result
+		self.indistinguishables = dict(indistinguishables)
+		return len(new_words)
+
+	def _in_range(self, strclusters):
+		return [ list(strcluster) for strcluster in strclusters
+				if strcluster.is_of_length_in_range(self.parameters['minimal_size'], self.parameters['maximal_size']) ]
+
+	def strclusters(self):
+		"""
+		The clusters of the vocabulary which meet the distance constraint.
+		"""
+		indistinguishables = Indistinguishables(self.indistinguishables)
+		return ListOfStrClusters([ StrCluster(ratios) for strclusters in self.verified for ratios in strclusters ], indistinguishables)
+
+	def save(self):
+		"""
+		Write the state of the clustering into its directory.
+		The files are written under temporary names first, then renamed, so that an interrupted save leaves the previous state.
+		"""
+		names = [ 'words.txt', 'clusters.nlgclu', 'strclusters.nlgclu', 'origins.npy', 'parameters.json' ]
+		with open(self._file('words.txt.tmp'), 'w') as file:
+			file.write(''.join( '%s\n' % word for word in self.words ))
+		ClusterFile.write(self._file('clusters.nlgclu.tmp'), self.clusters, self.indistinguishables)
+		ClusterFile.write(self._file('strclusters.nlgclu.tmp'), [ ratios for strclusters in self.verified for ratios in strclusters ])
+		origins = np.array([ number for number, strclusters in enumerate(self.verified) for _ in strclusters ], dtype=np.int32)
+		with open(self._file('origins.npy.tmp'), 'wb') as file:
+			np.save(file, origins)
+		with open(self._file('parameters.json.tmp'), 'w') as file:
+			json.dump(self.parameters, file)
+		for name in names:
+			os.replace(self._file(name + '.tmp'), self._file(name))
+
+###############################################################################
+
+if __name__ == '__main__':
+	import doctest
+	doctest.testmod()
@@ -13,6 +13,7 @@ import time
 import operator
 import collections
 import random
+import numpy as np
 import matplotlib
 matplotlib.use('TKAgg') # Comment this line if there is a 'headless backend' error
 import matplotlib.pyplot as plt
@@ -31,6 +32,16 @@ __date__, __version__ = '29/02/2016', '1.3'		# Solved (??) bug on production of
 												# Made some functions private.
 												# Subcompactify from start to mid for column content.
 __date__, __version__ = '15/04/2016', '1.4'		# New algorithm: cliques attempt to cover all indices in the matrix.
+__date__, __version__ = '18/10/2026', '1.5'		# The links are kept as a NumPy boolean array and as bitsets (Python integers):
+												# extending a clique is a bitwise and with the links of the new index.
+												# Same cliques as before (kept in _covering_cliques_by_scanning for reference).
+												# Add option -b for a benchmark on random matrices of dimensions 10 to 5000.
+__date__, __version__ = '18/10/2026', '1.6'		# Replaced the broken _Bron_Kerbosch1 by maximal_cliques:
+												# Bron-Kerbosch with pivoting (Tomita), degeneracy ordering and bitsets,
+												# pruning on minimal size and a budget in time and number of cliques.
+												# Add option -x to output all maximal cliques instead of covering cliques.
+__date__, __version__ = '18/10/2026', '1.7'		# No more a list of lists: the matrix is only kept as links (NumPy boolean array) and bitsets;
+												# rows (__getitem__) and neighbors are computed from them.
 __description__ = 'Heuristic to find maximal (large?) cliques in a graph represented by a square matrix.'
 
 __verbose__			= False
@@ -39,7 +50,32 @@ __visualization__	= False
 
 ##############################################################################
 
-class SquareMatrix(list):
+if hasattr(int, 'bit_count'):
+	popcount = int.bit_count
+else:
+	popcount = lambda bits: bin(bits).count('1')
+
+def bits_of(bits):
+	"""
+	Indices of the bits set in bits, in increasing order.
+	>>> list(bits_of(0b10110))
+	[1, 2, 4]
+	"""
+	while bits:
+		low = bits & -bits
+		yield low.bit_length() - 1
+		bits ^= low
+
+def bitsets_of(links):
+	"""
+	Column j of the boolean array links as a bitset (Python integer): bit i is set if links[i, j].
+	"""
+	packed = np.packbits(links.T, axis=1, bitorder='little')
+	return [ int.from_bytes(row.tobytes(), 'little') for row in packed ]
+
+##############################################################################
+
+class SquareMatrix:
 	"""
 	Class for matrices that are adjacency matrices of graphs.
 	CAUTION: arcs are represented with 0s, and absence of arc with 1s.
@@ -47,18 +83,30 @@ class SquareMatrix(list):
 		1. It is a square matrix (same number of rows and columns).
 		2. The first diagonal is filled with 0s.
 		3. It is symmetrical (relatively to the first diagonal).
+	The matrix is only kept as a boolean array of links (0s) and as bitsets, not as a list of lists:
+	its rows are computed when read.
 	
 	The main purpose of this class is to compute cliques
 	which are maximal in some sense.
+
+	>>> M = SquareMatrix([[0, 1, 0], [1, 0, 0], [0, 0, 0]])
+	>>> len(M), M[0], M.neighbors(2), M.neighbors(2, indices=[1, 2])
+	(3, [0, 1, 0], {0, 1}, {1})
 	"""
 
 	def __init__(self, matrix, labels=None, visualization=False):
 		global __visualization__
 		__visualization__ = visualization or __visualization__
-		dimension = len(matrix)
-		assert all( dimension == len(matrix[i]) for i in range(dimension) ), 'Not a square matrix.'
-		list.__init__(self, matrix)
+		if isinstance(matrix, np.ndarray):
+			assert matrix.ndim == 2 and matrix.shape[0] == matrix.shape[1], 'Not a square matrix.'
+			dimension = matrix.shape[0]
+		else:
+			dimension = len(matrix)
+			assert all( dimension == len(matrix[i]) for i in range(dimension) ), 'Not a square matrix.'
 		self.dimension = dimension
+		# Links (0s in the matrix) as a boolean array.
+		self.links = ( np.asarray(matrix, dtype=int).reshape(dimension, dimension) == 0 )
+		self._bitsets = None
 		self.order = list(range(self.dimension))
 		self.labels = labels
 #		if labels != None:
@@ -74,46 +122,120 @@ class SquareMatrix(list):
 				containing random values of 0 or 1
 				with the diagonal filled with 0s.
 		"""
-		A = [ [ random.randint(0,1) for _ in range(options.dimension) ] for _ in range(options.dimension) ]
-		# Symmetrize the matrix and fill the main diagonal with 0s.
-		for i in range(options.dimension):
-			A[i][i] = 0
-			for j in range(i+1,options.dimension):
-				A[j][i] = A[i][j]
-		return SquareMatrix(A)
+		A = np.triu(np.random.randint(0, 2, size=(dimension, dimension)), 1)
+		# Symmetrize the matrix; the main diagonal is filled with 0s.
+		return SquareMatrix(A + A.T)
+
+	def bitsets(self):
+		"""
+		The links of each index as a bitset: bit i of bitsets()[j] is set if self[i][j] == 0.
+
+		>>> SquareMatrix([[0, 1, 0], [1, 0, 0], [0, 0, 0]]).bitsets()
+		[5, 6, 7]
+		"""
+		if self._bitsets is None:
+			self._bitsets = bitsets_of(self.links)
+		return self._bitsets
+
+	def __len__(self):
+		return self.dimension
+
+	def __getitem__(self, i):
+		# Row i, as a list of 0s (links) and 1s.
+		return (~self.links[i]).astype(int).tolist()
+
+	def __iter__(self):
+		for i in range(self.dimension):
+			yield self[i]
 
 	def neighbors(self, v, indices=None):
-		if indices == None: indices = range(self.dimension)
-		return set([ i for i in indices if v != i and self[i][v] == 0 ])
+		result = set(bits_of(self.bitsets()[v]))
+		result.discard(v)
+		if indices is not None: result.intersection_update(indices)
+		return result
 	
-	def _Bron_Kerbosch1(self, R, P, X, minsize=2, indices=None):
+	def degeneracy_ordering(self, neighbors):
 		"""
-		First call:
-			Bron_Kerbosch({}, V, {})
-		where V is the set of vertices in the graph.
+		Order the indices by repeatedly removing an index of minimal degree in the remaining graph.
 		"""
-		if __trace__: print('R = %s, P = %s, X = %s' % (R, P, X), file=sys.stderr)
-		if 0 == len(P) and 0 == len(X):
+		degrees = [ popcount(bits) for bits in neighbors ]
+		remaining = set(range(self.dimension))
+		order = []
+		while remaining:
+			v = min(remaining, key=degrees.__getitem__)
+			remaining.remove(v)
+			order.append(v)
+			for w in bits_of(neighbors[v]):
+				degrees[w] -= 1
+		return order
+
+	def _Bron_Kerbosch(self, R, P, X, neighbors, minsize):
+		# R: list of indices in the clique; P, X: bitsets of candidates and of excluded indices.
+		if self._budget_exceeded():
+			return
+		if 0 == P and 0 == X:
 			if minsize <= len(R):
-				yield list(R)
-		else:
-			# Choose a pivot from P u X.
-			u = list(P | X)[0]
-			P0 = P.copy()
-			# repeat for the vertices in P minus the eighbors of u.
-			for v in P0.difference_update(self.neighbors(u, indices=indices)):
-				N = self.neighbors(v, indices=indices)
-				for clique in self._Bron_Kerbosch1(R | set([v]), P & N, X & N, minsize=minsize, indices=indices):
-					yield clique
-				P.remove(v)
-				X.add(v)
+				self.clique_number += 1
+				yield sorted(R)
+			return
+		# Prune: the clique cannot become big enough.
+		if len(R) + popcount(P) < minsize:
+			return
+		# Pivot (Tomita): the index in P u X with the most neighbors in P.
+		u = max(bits_of(P | X), key=lambda w: popcount(P & neighbors[w]))
+		for v in bits_of(P & ~neighbors[u]):
+			R.append(v)
+			yield from self._Bron_Kerbosch(R, P & neighbors[v], X & neighbors[v], neighbors, minsize)
+			R.pop()
+			P &= ~(1 << v)
+			X |= 1 << v
+
+	def _budget_exceeded(self):
+		if ( self.max_cliques is not None and self.max_cliques <= self.clique_number ) \
+		   or ( self.deadline is not None and self.deadline < time.time() ):
+			self.budget_exceeded = True
+		return self.budget_exceeded
+
+	def maximal_cliques(self, minsize=2, max_cliques=None, time_limit=None):
+		"""
+		Output all maximal cliques of at least minsize indices (exact enumeration),
+		as sorted lists of indices.
+		Bron-Kerbosch algorithm with pivoting (Tomita) on the indices in degeneracy ordering,
+		with bitsets for the sets of indices.
+		The enumeration stops after max_cliques cliques or time_limit seconds;
+		then self.budget_exceeded is True.
+
+		>>> M = SquareMatrix([[0, 0, 1, 0], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 0]])
+		>>> list(M.maximal_cliques())
+		[[0, 1, 3], [1, 2, 3]]
+		>>> list(M.maximal_cliques(minsize=4)), M.budget_exceeded
+		([], False)
+		>>> list(M.maximal_cliques(max_cliques=1)), M.budget_exceeded
+		([[0, 1, 3]], True)
+		"""
+		self.max_cliques = max_cliques
+		self.deadline = None if time_limit is None else time.time() + time_limit
+		self.clique_number = 0
+		self.budget_exceeded = False
+		# Neighbors of each index as bitsets, without the index itself.
+		neighbors = [ bits & ~(1 << v) for v, bits in enumerate(self.bitsets()) ]
+		order = self.degeneracy_ordering(neighbors)
+		# Each clique is enumerated from its first index in the ordering:
+		# the indices before are excluded, the indices after are candidates.
+		later = sum( 1 << v for v in order )
+		for v in order:
+			later &= ~(1 << v)
+			P, X = neighbors[v] & later, neighbors[v] & ~later
+			if 1 + popcount(P) < minsize: continue
+			yield from self._Bron_Kerbosch([ v ], P, X, neighbors, minsize)
+			if self.budget_exceeded: return
 
 	def all_cliques(self, minsize=2):
-		for clique in self._Bron_Kerbosch1(set([]), set(range(self.dimension)), set([])):
+		for clique in self.maximal_cliques(minsize=minsize):
 			yield clique
 
 	def _is_fully_connected(self, i, clique):
-		return all( self[i][j] == 0 for j in clique )
+		return all( self.links[i, j] for j in clique )
 
 	def _expand_clique(self, clique, covered):
 		for i in self._indices:
@@ -122,22 +244,52 @@ class SquareMatrix(list):
 				covered.add(i)
 		return clique, covered
 
+	def _covering_cliques_by_scanning(self, minsize=2):
+		"""
+		Previous version of covering_cliques, in O(n^3). Kept for reference and for the benchmark.
+		"""
+		connections = dict(enumerate((self.dimension - self.links.sum(axis=1)).tolist()))
+		self._indices = sorted(connections, key=connections.get)
+		covered = set([])
+		for i in self._indices:
+			if i not in covered:
+				clique, covered = self._expand_clique(set([i]), covered)
+				if minsize <= len(clique):
+					yield clique
+
 	def covering_cliques(self, minsize=2):
 		"""
 		Output cliques which try to cover all the indices in the matrix given.
+		Each index not yet covered, by decreasing number of connections, is the seed of a clique.
+		The clique is extended with the indices connected to all its members, in the same order.
+
+		>>> list(SquareMatrix([[0, 0, 1, 0], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 0]]).covering_cliques())
+		[{0, 1, 3}, {1, 2, 3}]
 		"""
 		if __trace__: print('# Covering cliques...', file=sys.stderr)
 		if __visualization__: self.visualize()
 		# Remember that links are noted by 0, not by 1.
 		# So connections gives indirectly the number of links (minus len(self)) of an index.
-		connections = { i: sum(self[i]) for i in range(len(self)) }
-		# Self.indices will contain the indices in self
-		# ranked by decreasing number of connections.
-		self._indices = sorted(connections, key=connections.get)
+		connections = self.dimension - self.links.sum(axis=1)
+		# Indices ranked by decreasing number of connections (stable sort: ties in index order).
+		indices = np.argsort(connections, kind='stable').tolist()
+		# The bitsets are renumbered by rank, so that the candidates
+		# are visited in the order of the ranks by looking for the next bit set.
+		ranked_bitsets = bitsets_of(self.links[np.ix_(indices, indices)])
 		covered = set([])
-		for i in self._indices:
+		for r0, i in enumerate(indices):
 			if i not in covered:
-				clique, covered = self._expand_clique(set([i]), covered)
+				clique = set([i])
+				# Candidates: the indices connected to all the members of the clique.
+				candidates = ranked_bitsets[r0]
+				r = -1
+				while True:
+					rest = candidates >> (r + 1)
+					if 0 == rest: break
+					r += (rest & -rest).bit_length()
+					clique.add(indices[r])
+					covered.add(indices[r])
+					candidates &= ranked_bitsets[r]
 				if minsize <= len(clique):
 					yield clique
 
@@ -146,7 +298,7 @@ class SquareMatrix(list):
 		Visualize the matrix by showing white cells for 0s and black cells for 1s.
 		For analogical clustering, the indices and ratios (given in labels) are shown.
 		"""
-		plt.matshow(self, cmap='binary') # cmap= 'Greys', 'hot_r'
+		plt.matshow(~self.links, cmap='binary') # cmap= 'Greys', 'hot_r'
 		# To show the color bar.
 		#plt.colorbar(orientation='horizontal')
 		if self.labels != None:
@@ -177,6 +329,12 @@ def read_argv():
 	parser.add_option('-d','--dimension',
 						action='store',dest='dimension', type=int, default=10,
 						help = 'dimension of a random matrix (default: %default).')
+	parser.add_option('-x', '--exact',
+						action='store_true', dest='exact', default=False,
+						help = 'output all maximal cliques (exact enumeration) instead of covering cliques.')
+	parser.add_option('-b', '--benchmark',
+						action='store_true', dest='benchmark', default=False,
+						help = 'time covering cliques on random matrices of dimensions 10 to 5000.')
 	parser.add_option('-v', '--verbose',
                   action='store_true', dest='verbose', default=False,
                   help='run in verbose mode')
@@ -189,16 +347,46 @@ def read_argv():
 
 ##############################################################################
 
+def benchmark(minsize=2, dimensions=[10, 20, 50, 100, 200, 500, 1000, 2000, 5000], max_scanning_dimension=500):
+	"""
+	Time covering_cliques on random matrices.
+	Up to max_scanning_dimension, compare with the previous version (same cliques, time).
+	"""
+	print('# dimension\tcliques\tbitsets (s)\tscanning (s)')
+	for dimension in dimensions:
+		A = SquareMatrix.random_matrix(dimension)
+		t1 = time.time()
+		cliques = list(A.covering_cliques(minsize=minsize))
+		t2 = time.time()
+		if dimension <= max_scanning_dimension:
+			t3 = time.time()
+			same = cliques == list(A._covering_cliques_by_scanning(minsize=minsize))
+			t4 = time.time()
+			assert same, 'Different cliques for dimension %d.' % dimension
+			scanning = '%.4f' % (t4 - t3)
+		else:
+			scanning = '-'
+		print('%d\t%d\t%.4f\t%s' % (dimension, len(cliques), t2 - t1, scanning))
+
+##############################################################################
+
 if __name__ == '__main__':
 	options, args = read_argv()
 	__verbose__ = options.verbose
 	__visualization__ = options.visualization
+	if options.benchmark:
+		benchmark(minsize=options.minsize)
+		sys.exit(0)
 	if __verbose__: print('# Creating data...', file=sys.stderr)
 	A = SquareMatrix.random_matrix(options.dimension)
 	print(A)
 	t1 = time.time()
 	if __verbose__: print('# Clustering data...', file=sys.stderr)
-	for indices in A.covering_cliques(minsize=options.minsize):
+	if options.exact:
+		cliques = A.maximal_cliques(minsize=options.minsize)
+	else:
+		cliques = A.covering_cliques(minsize=options.minsize)
+	for indices in cliques:
 		print(list(indices))
 	if __verbose__: print('# Total time: %.2fs' % (time.time() - t1), file=sys.stderr)
 
@@ -5,12 +5,16 @@ import sys
 import time
 import collections
 import itertools
+import multiprocessing
+import numpy as np
 
 import nlg.NlgSymbols as NlgSymbols
 
 from nlg.Cluster.Cluster import Cluster, ListOfClusters
 from nlg.Cluster.Words2Clusters.SquareMatrix import SquareMatrix
-from _fast_distance import fast_distance, init_memo_fast_distance, memo_fast_distance
+from nlg.Cluster.Words2Clusters.Indistinguishables import Indistinguishables
+from _fast_distance import init_memo_fast_distance, memo_fast_distance
+from nlg.DistanceCache import distance, distance_matrix
 
 ###############################################################################
 
@@ -20,6 +24,24 @@ __date__, __version__ = '01/09/2014', '2.0'
 __date__, __version__ = '15/05/2015', '2.1'		# Import NlgCluster. Inherit from NlgClu.
 __date__, __version__ = '06/06/2015', '2.2'		# Import SquareMatrix and use it in cluster_to_matrix.
 __date__, __version__ = '26/02/2016', '2.3'		# Improved speed in horizontal splitting.
+__date__, __version__ = '18/10/2026', '2.4'		# Add iter_strclusters to verify the distance constraint on clusters as they come
+												# (e.g., from nlgclu.iter_clusters).
+__date__, __version__ = '18/10/2026', '2.5'		# Pipelined mode (ListOfStrClusters.fromVectors): the distance constraint is verified
+												# by a pool of processes on the clusters as soon as they are output by the C program.
+__date__, __version__ = '18/10/2026', '2.6'		# Add option workers to ListOfStrClusters.fromListOfClusters: verification by a pool of processes.
+__date__, __version__ = '18/10/2026', '2.7'		# Use the shared distance cache (nlg.DistanceCache) for distances between words.
+__date__, __version__ = '18/10/2026', '2.8'		# cluster_to_matrix: distances between As and between Bs computed in one call each (DA != DB).
+__date__, __version__ = '18/10/2026', '2.9'		# Add option --exact-vertical-splitting: all maximal cliques instead of the covering cliques,
+												# within a budget, after which the covering cliques are used.
+__date__, __version__ = '18/10/2026', '2.10'	# Add option clean: clusters sorted by median ratio and normalized after verification,
+												# reusing the distances computed for the vertical splitting.
+__date__, __version__ = '18/10/2026', '2.11'	# Add iter_verified_clusters: the strclusters of each cluster, to keep track of their origin
+												# (see IncrementalClustering.py).
+__date__, __version__ = '18/10/2026', '2.12'	# Add option compact to ListOfStrClusters.fromListOfClusters: strclusters kept in a ClusterStore.
+__date__, __version__ = '18/10/2026', '2.13'	# The distances of the vertical splitting are reused to clean the clusters only with __reuse_distances__
+												# (option --reuse-distances): by default, the ratios are sorted as before (see Cluster.sort).
+__date__, __version__ = '18/10/2026', '2.14'	# The module settings (__reuse_distances__, __exact_vertical_splitting__, etc.) are sent to the processes
+												# verifying the distance constraint: with the spawn or forkserver start methods, they restart from the defaults.
 __description__ = 'The clusters output by nlgclu.py do not necessarily meet the distance constraint for analogies between strings of symbols. ' \
 					'This program verifies the distance constraint on analogical clusters output by nlgclu.py. ' \
 					'As a result, some clusters will be further split into smaller clusters to meet the distance constraint.' \
@@ -31,6 +53,8 @@ __visualization__ 	= False			# Visualization of matrices before and after vertic
 
 __minimal_size__	= 2				# Minimal size of clusters output. Two is the minimal to get one analogy.
 __maximal_size__	= None			# Maximal size of clusters output. None for no limit.
+__workers__			= 1				# Number of processes to verify the distance constraint.
+__chunk_size__		= 16			# Number of clusters sent at once to a process.
 
 ###############################################################################
 
@@ -38,6 +62,16 @@ __no_horizontal_splitting__	= False
 __no_vertical_splitting__	= False
 __no_discard_duplicates__	= False
 
+__exact_vertical_splitting__	= False		# Vertical splitting by all maximal cliques instead of covering cliques.
+__reuse_distances__				= False		# With clean, sort the ratios with the distances of the vertical splitting (see Cluster.sort).
+__clique_time_limit__			= 1.0		# Budget for the exact vertical splitting of one cluster (seconds).
+__max_cliques__					= 10000		# Budget for the exact vertical splitting of one cluster (number of cliques).
+
+# Settings which the scripts may change and which the processes verifying the distance constraint should share.
+_worker_settings = ('__verbose__', '__trace__', '__visualization__', '__minimal_size__', '__maximal_size__',
+					'__no_horizontal_splitting__', '__no_vertical_splitting__', '__no_discard_duplicates__',
+					'__exact_vertical_splitting__', '__reuse_distances__', '__clique_time_limit__', '__max_cliques__')
+
 ###############################################################################
 
 def common_substring(A, B):
@@ -89,9 +123,9 @@ class StrCluster(Cluster):
 		result = collections.defaultdict(int)
 		for i, [A, B] in enumerate(self):
 			for C, D in self[i+1:]:
-				if fast_distance(A,C) != fast_distance(B,D):
+				if distance(A,C) != distance(B,D):
 					if __trace__: print('# d(%s, %s) = %d != %d = d(%s, %s)...' % \
-						(A,C,fast_distance(A,C),fast_distance(B,D),B,D), file=sys.stderr)
+						(A,C,distance(A,C),distance(B,D),B,D), file=sys.stderr)
 					result[A,B] += 1
 					result[C,D] += 1
 		return result
@@ -103,23 +137,17 @@ class StrCluster(Cluster):
 			then we fill the cell (i, j) in the matrix with a 0,
 			else with a 1.
 		"""
-		length = len(self)
 		labels = [ (NlgSymbols.ratio).join(ratio) for ratio in self ]
-		matrix = [ [ 1 for j in range(length) ] for i in range(length) ]
-		for i, [A, B] in enumerate(self):
-			dA = dict()
-			init_memo_fast_distance(A)
-			matrix[i][i] = 0
-			for C, _ in self[i+1:]:
-				dA[C] = memo_fast_distance(C)
-			init_memo_fast_distance(B)
-			for xj, [C, D] in enumerate(self[i+1:]):
-				j = i + 1 + xj
-				dBD = memo_fast_distance(D)
-				if __trace__: print('# %s : %s :: %s : %s, d(%s, %s) = %d %s %d = d(%s, %s)' % \
-						(A, B, C, D, A, C, dA[C], '==' if dA[C]==dBD else '=/=', dBD, B, D), file=sys.stderr)
-				if (dA[C] == dBD):	 # For x == False, this will be: dAC != dBD
-					matrix[i][j] = matrix[j][i] = 0
+		As, Bs = self.AB_list()
+		DA, DB = distance_matrix(As), distance_matrix(Bs)
+		if __trace__:
+			for i, [A, B] in enumerate(self):
+				for j, [C, D] in enumerate(self[i+1:], i+1):
+					print('# %s : %s :: %s : %s, d(%s, %s) = %d %s %d = d(%s, %s)' % \
+						(A, B, C, D, A, C, DA[i,j], '==' if DA[i,j]==DB[i,j] else '=/=', DB[i,j], B, D), file=sys.stderr)
+		matrix = (DA != DB).astype(int)
+		# Distances between ratios, for the sort by median ratio.
+		self.distances = DA + DB
 		return SquareMatrix(matrix, labels=labels, visualization=__visualization__)
 
 
@@ -128,7 +156,7 @@ class StrCluster(Cluster):
 		if __no_horizontal_splitting__:
 			if __trace__: print('# No horizontal splitting...', file=sys.stderr)
 			yield self
-			raise StopIteration
+			return
 		if __trace__: print('# hcluster = %s' % self, file=sys.stderr)
 		subclusters = collections.defaultdict(list)
 		for Aprime, Bprime in self:
@@ -138,7 +166,7 @@ class StrCluster(Cluster):
 			if __trace__: print('equivA = %s, equivB = %s' % (equivA, equivB), file=sys.stderr)
 			for A, B in itertools.product(equivA, equivB):
 #				if common_substring(A,B):		# This was a heuristic! May be theoretically not valid.
-				dAB = fast_distance(A,B)
+				dAB = distance(A,B)
 				if __trace__: print('d(%s, %s) = %d' % (equivA, equivB, dAB), file=sys.stderr)
 				subclusters[dAB].append((A,B))
 		if __trace__: print('# subclusters = %s' % subclusters, file=sys.stderr)
@@ -155,33 +183,49 @@ class StrCluster(Cluster):
 		if __no_discard_duplicates__:
 			if __trace__: print('# No discarding of duplicate words...', file=sys.stderr)
 			yield self
-			raise StopIteration
+			return
 		self.discard_duplicate_words()
 		if __minimal_size__ <= len(self):	# The cluster should contain at least 2 ratios to make a valid cluster or be bigger than min size.
 			yield self
 
-	def split_by_vertical_distance(self):
+	def split_by_vertical_distance(self, keep_distances=False):
+		# With keep_distances, the subclusters keep the distances between their ratios (see Cluster.sort).
 		if __no_vertical_splitting__:
 			if __trace__: print('# No vertical splitting...', file=sys.stderr)
 			yield self
-			raise StopIteration
+			return
 		if __trace__: print('# Entering split_by_vertical distance (size=%d)...' % len(self), file=sys.stderr)
 		if __trace__: print('# vcluster = %s' % self, file=sys.stderr)
-		for indices in self.cluster_to_matrix().covering_cliques(minsize=__minimal_size__):
+		matrix = self.cluster_to_matrix()
+		cliques = None
+		if __exact_vertical_splitting__:
+			cliques = list(matrix.maximal_cliques(minsize=__minimal_size__, max_cliques=__max_cliques__, time_limit=__clique_time_limit__))
+			if matrix.budget_exceeded:
+				if __verbose__: print('# Budget exceeded for exact vertical splitting (size=%d): using covering cliques.' % len(self), file=sys.stderr)
+				cliques = None
+		if cliques is None:
+			cliques = matrix.covering_cliques(minsize=__minimal_size__)
+		for indices in cliques:
 			if __trace__: print('cluster = %s' % \
 				( (NlgSymbols.conformity).join( '%d: %s%s%s' % \
 					(i, ratio[0], NlgSymbols.ratio, ratio[1]) for (i, ratio) in enumerate(self) ) ), file=sys.stderr)
 			if __trace__: print('# indices = %s' % indices, file=sys.stderr)
 			if __minimal_size__ <= len(indices):	# The subcluster should contain at least 2 ratios to make a valid cluster or be bigger than min size.
+				indices = list(indices)
 				result = StrCluster( [self[i] for i in indices] )
+				if keep_distances: result.distances = self.distances[np.ix_(indices, indices)]
 #				if not result.all_distances_correct():
 #					print 'VERTICAL %s' % result
 				yield result
+		self.distances = None
 
-	def distance_constraint(self, indistinguishables):
+	def distance_constraint(self, indistinguishables, clean=False):
+		# With clean, the clusters output are sorted by median ratio and normalized (see Cluster.clean),
+		# with the distances of the vertical splitting if __reuse_distances__.
 		for hcluster in self.split_by_horizontal_distance(indistinguishables):
-			for vcluster in hcluster.split_by_vertical_distance():
+			for vcluster in hcluster.split_by_vertical_distance(keep_distances=clean and __reuse_distances__):
 				for cluster in vcluster.apply_discard_duplicate_words():
+					if clean: vcluster.clean()
 					yield vcluster
 
 	def gamma_hypothesis(self):
@@ -216,24 +260,101 @@ class ListOfStrClusters(ListOfClusters):
 		return cls.fromListOfClusters(ListOfClusters.fromFile(file))
 
 	@classmethod
-	def fromCluster(cls, cluster, indistinguishables=[]):
-		return cls(clusters=[ strcluster for strcluster in StrCluster(cluster).distance_constraint(indistinguishables) ], indistinguishables=indistinguishables)
+	def fromCluster(cls, cluster, indistinguishables=[], clean=False):
+		return cls(clusters=[ strcluster for strcluster in StrCluster(cluster).distance_constraint(indistinguishables, clean=clean) ], indistinguishables=indistinguishables)
 
 	@classmethod
 	def fromListOfClusters(cls, clusters, **kwargs):
 		# Generate a list of lists of strclusters
 		# from a list of cluster (each cluster generates a possibly empty list of strcluters,
 		# i.e. a strclusterfile).
-		list_of_lists_of_strclusters = [ ListOfStrClusters.fromCluster(cluster, clusters.indistinguishables) for cluster in clusters ]
 		# Flatten the list of list of strclusters
-#		strclusters  = [ strcluster for list_of_strclusters in list_of_lists_of_strclusters for strcluster in list_of_strclusters ]
-		strclusters  = itertools.chain.from_iterable(list_of_lists_of_strclusters)
-		# Filter the strclusters by size.
+		# and filter the strclusters by size.
+		# With 1 < workers, the clusters are verified in parallel, the order of the output is kept.
+		# With compact, the strclusters are kept in a ClusterStore as they come.
 		minimal_size = kwargs['minimal_size']
 		maximal_size = kwargs['maximal_size']
-		list_of_strclusters  = [ strcluster for strcluster in strclusters if strcluster.is_of_length_in_range(minimal_size, maximal_size) ]
+		workers = kwargs.get('workers', __workers__)
+		clean = kwargs.get('clean', False)
+		strclusters = iter_strclusters(clusters, clusters.indistinguishables, minimal_size, maximal_size, workers=workers, clean=clean)
+		if kwargs.get('compact', False):
+			from nlg.Cluster.ClusterStore import ClusterStore
+			return cls(ClusterStore(strclusters, clusters.indistinguishables), clusters.indistinguishables)
+		list_of_strclusters  = list(strclusters)
 		return cls(list_of_strclusters)
 
+	@classmethod
+	def fromVectors(cls, vectors, indistinguishables=None, workers=__workers__, **kwargs):
+		"""
+		Pipelined version of ListOfClusters.fromVectors followed by fromListOfClusters:
+		the C program runs in a thread and the distance constraint is verified
+		by workers processes on the clusters as they come, instead of waiting for the end of the clustering.
+		Same output, in the same order.
+		"""
+		from .nlgclu import iter_clusters
+		minimal_size = kwargs.get('minimal_size', __minimal_size__)
+		maximal_size = kwargs.get('maximal_size', __maximal_size__)
+		clusters = iter_clusters(vectors,
+			minimal_size=minimal_size,
+			maximal_size=maximal_size,
+			verbose=kwargs.get('verbose', False),
+			focus=kwargs.get('focus', None))
+		if indistinguishables == None: indistinguishables = Indistinguishables([])
+		return cls(list(iter_strclusters(clusters, indistinguishables, minimal_size, maximal_size, workers=workers, clean=kwargs.get('clean', False))), indistinguishables)
+
+###############################################################################
+
+def _init_worker(indistinguishables, clean=False, settings=None):
+	# The indistinguishables and the settings of the module are sent only once to each process.
+	# The settings are needed when the processes are not forked (spawn or forkserver start methods):
+	# the module is then imported again, with its default settings.
+	global _worker_indistinguishables, _worker_clean
+	_worker_indistinguishables = indistinguishables
+	_worker_clean = clean
+	if settings is not None: globals().update(settings)
+
+def _distance_constraint_worker(ratios):
+	# Only lists of ratios are exchanged with the processes, not the attributes of the clusters:
+	# the clusters are cleaned in the process, where the distances between ratios are known.
+	return [ list(strcluster) for strcluster in StrCluster(ratios).distance_constraint(_worker_indistinguishables, clean=_worker_clean) ]
+
+def iter_verified_clusters(clusters, indistinguishables=None, workers=__workers__, chunk_size=__chunk_size__, clean=False):
+	"""
+	Generator of the list of strclusters which meet the distance constraint for each cluster
+	of an iterable of clusters, in the same order, whatever their sizes.
+	With 1 < workers, the clusters are verified by a pool of processes, by chunks of chunk_size clusters.
+	With clean, the strclusters are sorted by median ratio and normalized (see Cluster.clean).
+	"""
+	if indistinguishables == None: indistinguishables = Indistinguishables([])
+	if workers <= 1:
+		for cluster in clusters:
+			yield ListOfStrClusters.fromCluster(cluster, indistinguishables, clean=clean)
+		return
+	with multiprocessing.Pool(workers, initializer=_init_worker,
+			initargs=(indistinguishables, clean, { name: globals()[name] for name in _worker_settings })) as pool:
+		# imap reads the clusters in a thread as they come and keeps the order of the results.
+		for list_of_ratios in pool.imap(_distance_constraint_worker, ( list(cluster) for cluster in clusters ), chunk_size):
+			strclusters = []
+			for ratios in list_of_ratios:
+				strcluster = StrCluster(ratios)
+				strcluster.indistinguishables = indistinguishables
+				strclusters.append(strcluster)
+			yield strclusters
+
+def iter_strclusters(clusters, indistinguishables=None, minimal_size=__minimal_size__, maximal_size=__maximal_size__, workers=__workers__, chunk_size=__chunk_size__, clean=False):
+	"""
+	Generator of the strclusters which meet the distance constraint and are of a size in range,
+	from an iterable of clusters (e.g., the generator nlgclu.iter_clusters),
+	so that the clusters can be verified as soon as they are output by the clustering.
+	With 1 < workers, the clusters are verified by a pool of processes, by chunks of chunk_size clusters.
+	The strclusters are output in the same order in all cases.
+	With clean, the strclusters are sorted by median ratio and normalized (see Cluster.clean).
+	"""
+	for strclusters in iter_verified_clusters(clusters, indistinguishables, workers=workers, chunk_size=chunk_size, clean=clean):
+		for strcluster in strclusters:
+			if strcluster.is_of_length_in_range(minimal_size, maximal_size):
+				yield strcluster
+
 ###############################################################################
 
 def read_argv():
@@ -266,6 +387,9 @@ def read_argv():
 	parser.add_argument('--no-discard-duplicates',
                   action='store_true', dest='no_discard_duplicates', default=False,
                   help='(for developper only) do not apply discarding of duplicate words')
+	parser.add_argument('--exact-vertical-splitting',
+                  action='store_true', dest='exact_vertical_splitting', default=False,
+                  help='split vertically by all maximal cliques instead of covering cliques')
 	parser.add_argument('--no-vertical-splitting',
                   action='store_true', dest='no_vertical_splitting', default=False,
                   help='(for developper only) do not apply vertical splitting')
@@ -294,6 +418,7 @@ if __name__ == '__main__':
 	__no_horizontal_splitting__ = options.no_horizontal_splitting
 	__no_discard_duplicates__ = options.no_discard_duplicates
 	__no_vertical_splitting__ = options.no_vertical_splitting
+	__exact_vertical_splitting__ = options.exact_vertical_splitting
 	if options.minsize < 2:
 		print('Minimal size of cluster should be bigger than 2.', file=sys.stderr)
 		sys.exit(-1)
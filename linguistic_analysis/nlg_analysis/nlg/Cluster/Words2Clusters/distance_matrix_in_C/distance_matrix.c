@@ -0,0 +1,69 @@
+/* File : distance_matrix.c */
+/* Copyright (c) 2026, Yves Lepage */
+/* 18/10/2026: creation: all LCS distances between the words of a list in one call. */
+/* 18/10/2026: use the bit-parallel computation of fast_distance.c, word i being memoized for row i. */
+/* 18/10/2026: added distance_rows: blocks of rows of the upper triangle, for nlg/distances.py. */
+
+#define MODULE "distance_matrix.c"
+#define TRACE 0
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#include "distance_matrix.h"
+#include "fast_distance.h"
+
+#define ytrace(x) { printf x ; fflush(stderr) ; fflush(stdout) ; }
+
+#if TRACE
+#define trace(x) { ytrace(x) ; }
+#else
+#define trace(x)
+#endif
+
+/*
+ * Distances between all pairs of words.
+ * The matrix is symmetric with 0s on the diagonal: only the upper half is computed.
+ */
+
+void distance_matrix(int n, const int *symbols, const int *offsets, int *matrix)
+{
+	int i = 0, j = 0 ;
+	MEMO memo ;
+
+trace(("in  distance_matrix(%d)\n", n))
+
+	for ( i = 0 ; i < n ; i++ )
+	{
+		matrix[i * n + i] = 0 ;
+		init_memo(&memo, symbols + offsets[i], offsets[i+1] - offsets[i]) ;
+		for ( j = i + 1 ; j < n ; j++ )
+			matrix[i * n + j] = matrix[j * n + i] =
+				memo_distance(&memo, symbols + offsets[j], offsets[j+1] - offsets[j]) ;
+		free_memo(&memo) ;
+	} ;
+
+trace(("out distance_matrix(%d)\n", n))
+}
+
+/*
+ * Rows first to last - 1 of the upper triangle of the matrix, without the diagonal.
+ */
+
+void distance_rows(int n, const int *symbols, const int *offsets, int first, int last, int *distances)
+{
+	int i = 0, j = 0 ;
+	MEMO memo ;
+
+trace(("in  distance_rows(%d, %d, %d)\n", n, first, last))
+
+	for ( i = first ; i < last ; i++ )
+	{
+		init_memo(&memo, symbols + offsets[i], offsets[i+1] - offsets[i]) ;
+		for ( j = i + 1 ; j < n ; j++ )
+			*distances++ = memo_distance(&memo, symbols + offsets[j], offsets[j+1] - offsets[j]) ;
+		free_memo(&memo) ;
+	} ;
+
+trace(("out distance_rows(%d, %d, %d)\n", n, first, last))
+}
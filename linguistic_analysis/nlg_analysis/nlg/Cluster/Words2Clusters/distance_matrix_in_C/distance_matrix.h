@@ -0,0 +1,26 @@
+/* File : distance_matrix.h */
+/* Copyright (c) 2026, Yves Lepage */
+
+/*
+ * Batched computation of LCS distances.
+ * The words are given as one array of symbols (e.g., Unicode code points)
+ * with the offsets of the words in this array (offsets[i] to offsets[i+1] for word i).
+ */
+
+/*
+ * The LCS distance between two words (number of insertions and deletions to transform one into the other)
+ * is computed by nlg/Distance/C/fast_distance.c.
+ */
+
+/*
+ * Fills matrix (n x n integers) with the distances between all pairs of words.
+ */
+
+extern void distance_matrix(int n, const int *symbols, const int *offsets, int *matrix) ;
+
+/*
+ * Fills distances with the distances between each word first to last - 1 and all the words after it,
+ * row by row (upper triangle of the matrix in condensed form).
+ */
+
+extern void distance_rows(int n, const int *symbols, const int *offsets, int first, int last, int *distances) ;
@@ -0,0 +1,126 @@
+/* File: distance_matrix.i */
+%module distance_matrix
+
+%{
+#include "distance_matrix.h"
+
+/*
+ * Copy the code points of a sequence of strings in one array, with the offsets of each string.
+ * Returns the number of strings, -1 on error (with a Python exception set).
+ */
+
+static Py_ssize_t get_words(PyObject *words, int **psymbols, int **poffsets)
+{
+	PyObject *sequence = NULL ;
+	Py_ssize_t n = 0, i = 0, k = 0, total = 0 ;
+	int *symbols = NULL, *offsets = NULL ;
+
+	sequence = PySequence_Fast(words, "expected a sequence of strings") ;
+	if ( NULL == sequence )
+		return -1 ;
+	n = PySequence_Fast_GET_SIZE(sequence) ;
+	for ( i = 0 ; i < n ; i++ )
+	{
+		PyObject *word = PySequence_Fast_GET_ITEM(sequence, i) ;
+		if ( ! PyUnicode_Check(word) )
+		{
+			PyErr_SetString(PyExc_TypeError, "expected a sequence of strings") ;
+			Py_DECREF(sequence) ;
+			return -1 ;
+		} ;
+		total += PyUnicode_GET_LENGTH(word) ;
+	} ;
+	symbols = (int *) malloc((total + 1) * sizeof(int)) ;
+	offsets = (int *) malloc((n + 1) * sizeof(int)) ;
+	if ( NULL == symbols || NULL == offsets )
+	{
+		free(symbols) ;
+		free(offsets) ;
+		Py_DECREF(sequence) ;
+		PyErr_NoMemory() ;
+		return -1 ;
+	} ;
+	for ( i = 0, total = 0 ; i < n ; i++ )
+	{
+		PyObject *word = PySequence_Fast_GET_ITEM(sequence, i) ;
+		int kind = PyUnicode_KIND(word) ;
+		const void *data = PyUnicode_DATA(word) ;
+		offsets[i] = (int) total ;
+		for ( k = 0 ; k < PyUnicode_GET_LENGTH(word) ; k++ )
+			symbols[total++] = (int) PyUnicode_READ(kind, data, k) ;
+	} ;
+	offsets[n] = (int) total ;
+	Py_DECREF(sequence) ;
+	*psymbols = symbols ;
+	*poffsets = offsets ;
+	return n ;
+}
+%}
+
+/*
+ * Distances between all pairs of words in a list of strings.
+ * 	Returns the bytes of an n x n array of C integers (row-major).
+ * 	The GIL is released during the computation.
+ */
+
+%inline %{
+PyObject *distance_matrix_in_buffer(PyObject *words)
+{
+	PyObject *result = NULL ;
+	Py_ssize_t n = 0 ;
+	int *symbols = NULL, *offsets = NULL ;
+
+	n = get_words(words, &symbols, &offsets) ;
+	if ( -1 == n )
+		return NULL ;
+	result = PyBytes_FromStringAndSize(NULL, n * n * sizeof(int)) ;
+	if ( NULL != result )
+	{
+		Py_BEGIN_ALLOW_THREADS
+		distance_matrix((int) n, symbols, offsets, (int *) PyBytes_AS_STRING(result)) ;
+		Py_END_ALLOW_THREADS
+	} ;
+	free(symbols) ;
+	free(offsets) ;
+	return result ;
+}
+%}
+
+/*
+ * Distances between each word first to last - 1 and all the words after it
+ * (rows of the upper triangle of the distance matrix, without the diagonal).
+ * 	Returns the bytes of an array of C integers.
+ * 	The GIL is released during the computation, so that blocks of rows can be computed in parallel in threads.
+ */
+
+%inline %{
+PyObject *distance_rows_in_buffer(PyObject *words, int first, int last)
+{
+	PyObject *result = NULL ;
+	Py_ssize_t n = 0, length = 0 ;
+	int *symbols = NULL, *offsets = NULL ;
+
+	n = get_words(words, &symbols, &offsets) ;
+	if ( -1 == n )
+		return NULL ;
+	if ( first < 0 || last < first || n < last )
+	{
+		free(symbols) ;
+		free(offsets) ;
+		PyErr_SetString(PyExc_IndexError, "rows out of range") ;
+		return NULL ;
+	} ;
+	/* Sum of n - 1 - i for i in [first, last). */
+	length = (Py_ssize_t) (last - first) * (2 * n - first - last - 1) / 2 ;
+	result = PyBytes_FromStringAndSize(NULL, length * sizeof(int)) ;
+	if ( NULL != result )
+	{
+		Py_BEGIN_ALLOW_THREADS
+		distance_rows((int) n, symbols, offsets, first, last, (int *) PyBytes_AS_STRING(result)) ;
+		Py_END_ALLOW_THREADS
+	} ;
+	free(symbols) ;
+	free(offsets) ;
+	return result ;
+}
+%}
@@ -6,13 +6,17 @@
 import sys
 import time
 import tempfile
+import threading
+import queue
+from multiprocessing.pool import ThreadPool
 import numpy as np # RH added on 30/8/2021
 
 import nlg.NlgSymbols as NlgSymbols
 
 from nlg.Cluster.Cluster import Cluster, ListOfClusters
-from nlg.Cluster.Words2Clusters.ConvertedCluster import ListOfConvertedClusters
-from _nlgclu import nlgclu_in_C
+from nlg.Cluster.Words2Clusters.ConvertedCluster import ConvertedCluster, ListOfConvertedClusters
+from nlg.Cluster.Words2Clusters.Indistinguishables import Indistinguishables
+from _nlgclu import nlgclu_in_C, nlgclu_in_buffer, nlgclu_in_buffer_marked, nlgclu_iter_buffer
 
 from nlg.Vector.Vectors import Vectors # RH added on 4/8/2021
 ###############################################################################
@@ -65,10 +69,29 @@ __date__, __version__ = '16/09/2021', '2.3'	# Modifications to FeatureMatrix for
 											# +----+-------+--------+———————+
 											# 
 											# The data are lists of words extracted for the Europarl v3 in the German, Finnish and Swedish languages. Three sizes are used: 5k, 10k and 20k.								
+__date__, __version__ = '18/10/2026', '2.4'	# Pass the feature trees to the C program as arrays of integers and get the clusters back as arrays of integers
+											# (nlgclu_in_buffer): no temporary files anymore, except with option -L (lineout) for debugging.
+__date__, __version__ = '18/10/2026', '2.5'	# Vectorized construction of the feature tree with NumPy (FeatureTree.Vectors2Array):
+											# block boundaries by np.diff/np.flatnonzero, links between levels by np.searchsorted.
+											# The C node table is taken directly from the array of nodes.
+__date__, __version__ = '18/10/2026', '2.6'	# Sort the feature vectors lexicographically on all features (np.lexsort), not only on the first one,
+											# so that equal prefixes are contiguous: one node per prefix, i.e., smaller trees.
+											# Report of the number of nodes and the time to build the feature trees in verbose mode.
+__date__, __version__ = '18/10/2026', '2.7'	# Add option -j: parallel clustering with several processes (workers).
+											# The units of work are the lists of pairs of nodes with the same difference value on level 2 (see nlgclu.c).
+											# The clusters are merged back in the same order as in sequential mode.
+__date__, __version__ = '18/10/2026', '2.8'	# The C program is reentrant and releases the GIL: the workers are threads instead of processes,
+											# and several clusterings can run at the same time in different threads.
+__date__, __version__ = '18/10/2026', '2.9'	# Add iter_clusters: generator of the clusters as they are output by the C program (streaming mode).
+											# Memory is bounded by __chunk_size__ * (__queue_size__ + 1) integers instead of the whole output.
+__date__, __version__ = '18/10/2026', '2.10'	# Add option marks to nlgclu_in_memory (incremental mode, see IncrementalClustering.py):
+											# only the clusters which contain a marked object are explored and output.
+__date__, __version__ = '18/10/2026', '2.11'	# Bug fixed in the C program: the rows of the matrices were not freed (leak at each call of nlgclu_in_memory).
 
 __description__ = 'Module for analogical clustering.'
 
-__NODESIZE__ = 6
+__NODESIZE__ = 7						# Size of a node in the C program (see nlgclu_in_C/nlgclu.c).
+__CNODE_COLUMNS__ = [1, 2, 3, 5, 6, 7, 8]	# Columns of a node kept for the C program (STOP_OBJECT, column 4, is dropped: it is implied by START_OBJECT + SIZE).
 
 __verbose__ = False						# Gives information about timing, etc. to the user.
 __lineout__ = False						# If true, pass text to the C program. This is normally not required.
@@ -82,6 +105,9 @@ __maximal_size__ = None					# Maximal size of clusters output.
 __anchors__ = False						# If true, use anchor words to compute features (default number: __anchor_default_number__).
 __anchor_default_number__ = 100			# Default number of anchor words.
 __focus__ = None						# Focus word to output only those clusters which contain the focus.
+__workers__ = 1							# Number of threads for clustering.
+__chunk_size__ = 1 << 16				# Streaming mode: number of integers output by the C program before passing them to Python.
+__queue_size__ = 4						# Streaming mode: number of chunks waiting to be consumed before the C program waits.
 
 ###############################################################################
 # This example is for the following features and strings:
@@ -270,7 +296,9 @@ class FeatureMatrix(list):
 		# Sort the vectors as this is required to build the feature tree.
 		# fv = sorted(vectors.values()) # RH commented on 02/09/2021
 		fv = np.array([vectors[word] for word in vectors]) # RH added on 13/09/2021
-		fv = fv[fv[:, 0].argsort()] # RH added on 13/09/2021
+#		fv = fv[fv[:, 0].argsort()] # RH added on 13/09/2021
+		# Lexicographic order on all features (the first feature is the primary key), then on the object indices.
+		fv = fv[np.lexsort(fv.T[::-1])]
 
 		# Transpose the list of feature vectors.
 		# matrix = list(zip(*fv)) # RH commented on 09/09/2021
@@ -311,13 +339,21 @@ class FeatureMatrix(list):
 class FeatureTree(list):
 
 	def __init__(self, fm=[]):
+		t0 = time.time()
 		if __verbose__: print('# Computing feature tree...', file=sys.stderr)
-		ll = self.Vectors2Tree(fm)
+		self.array = self.Vectors2Array(fm)
+		ll = self.array.tolist()
 		if __trace__: print('# Feature tree:\n%s' % ll, file=sys.stderr)
 		list.__init__(self,ll)
 		self.objects = fm.objects
 		self.lines = fm.lines
+		self.time = time.time() - t0
 		if __verbose__: print('# Computation done.', file=sys.stderr)
+
+	def statistics(self):
+		# Size of the tree and time needed to build it.
+		return '# Feature tree: %d nodes on %d levels for %d objects (%.2fs).' \
+			% (len(self.array), self.array[-1, 1] + 1, len(self.objects), self.time)
 	
 	@classmethod
 	def fromFile(cls, file=sys.stdin, alphabet=sys.stdin): # RH modified on 26/8/2021
@@ -328,7 +364,77 @@ class FeatureTree(list):
 		fm = FeatureMatrix(vectors)
 		return cls(fm)
 	
+	def Vectors2Array(self, matrix):
+		"""
+		Vectorized version of Vectors2Tree.
+		Returns the nodes as an array of integers of shape (number of nodes, 9),
+		with the same columns as the nodes output by Vectors2Tree.
+		>>> fm = [[0, 0, 0, 0, 0], [0, 0, 0, 2, 2], [0, 2, 2, 0, 2], [0, 0, 2, 0, 0], [2, 0, 0, 2, 0], [2, 2, 0, 0, 0]]
+		>>> ft = FeatureTree.__new__(FeatureTree)
+		>>> ft.Vectors2Array(fm).tolist() == ft.Vectors2Tree(fm)
+		True
+		>>> ft.Vectors2Array(fm)[:3].tolist()
+		[[0, 0, 5, 0, 5, 0, 0, 1, 2], [1, 1, 3, 0, 3, 0, 0, 3, 4], [2, 1, 2, 3, 5, 2, 0, 5, 6]]
+		"""
+		matrix = np.asarray(matrix)
+		matlen, objnbr = matrix.shape
+		# Boundaries of the blocks of same values on each level.
+		# A block on a level is always included in a block of the previous level,
+		# so that the boundaries accumulate from one level to the next one.
+		boundaries = np.zeros(objnbr - 1, dtype=bool)
+		levels = []
+		for level in range(matlen):
+			if __verbose__: print('\r %2d %% ' % int((level/float(matlen))*100), end=' ', file=sys.stderr)
+			boundaries |= np.diff(matrix[level]) != 0
+			starts = np.concatenate(([0], np.flatnonzero(boundaries) + 1))
+			stops = np.append(starts[1:], objnbr)
+			levels.append((starts, stops))
+		if __verbose__: print('\r100 %% ', file=sys.stderr)
+		# Name the indices.
+		NUMBER, 				\
+		LEVEL, 					\
+		SIZE,					\
+		START_OBJECT, 			\
+		STOP_OBJECT, 			\
+		VALUE,					\
+		IS_EMPTY_REST,			\
+		NEXT_LEVEL_BEGIN_NODE,	\
+		NEXT_LEVEL_END_NODE		= 0, 1, 2, 3, 4, 5, 6, 7, 8
+		# Number of the first node on each level.
+		level_start = np.concatenate(([0], np.cumsum([ len(starts) for starts, stops in levels ])))
+		nodes = np.empty((level_start[-1], 9), dtype=np.intc)
+		nodes[:, NUMBER] = np.arange(level_start[-1])
+		is_empty_rest = None
+		# Fill in the levels from the last one so as to compute the is_empty_rest values on the way.
+		for level in range(matlen-1, -1, -1):
+			starts, stops = levels[level]
+			block = nodes[level_start[level]:level_start[level+1]]
+			block[:, LEVEL] = level
+			block[:, SIZE] = stops - starts
+			block[:, START_OBJECT] = starts
+			block[:, STOP_OBJECT] = stops
+			block[:, VALUE] = matrix[level][starts]
+			result = ( 1 == block[:, SIZE] ) & ( 0 == block[:, VALUE] )
+			if level == matlen - 1:
+				block[:, NEXT_LEVEL_BEGIN_NODE] = block[:, NEXT_LEVEL_END_NODE] = -1
+			else:
+				# The nodes on the next level covered by a node are found by binary search on their start objects.
+				next_starts = levels[level+1][0]
+				begin = np.searchsorted(next_starts, starts)
+				end = np.searchsorted(next_starts, stops) - 1
+				block[:, NEXT_LEVEL_BEGIN_NODE] = level_start[level+1] + begin
+				block[:, NEXT_LEVEL_END_NODE] = level_start[level+1] + end
+				result &= is_empty_rest[begin]
+			block[:, IS_EMPTY_REST] = result
+			is_empty_rest = result
+		if __verbose__: print('# Number of nodes: %d.' % len(nodes), file=sys.stderr)
+		assert (nodes[:-1, LEVEL] <= nodes[1:, LEVEL]).all(), 'nodes not sorted by level'
+		assert ((nodes[:, NEXT_LEVEL_BEGIN_NODE] != -1) | (nodes[:, SIZE] == 1)).all(), 'node of size > 1 on last level'
+		return nodes
+
 	def Vectors2Tree(self, matrix):
+		# Pure Python version of Vectors2Array (slow: quadratic in the number of nodes on a level).
+		# Kept for reference.
 		# Initialize the list of nodes to an empty list and
 		# the first block to a block of the length of a row, i.e., to the number of objects.
 		nodes, sub_blocks  = [], [ slice(0,len(matrix[0])) ]
@@ -411,15 +517,15 @@ class CFeatureTree:
 	def __init__(self, featuretree):
 		t0 = time.time()
 		# Builds the three data structures that will be passed to the C program:
-		# Clength, integerlist, Clines (this last one is passed only if __lineout__ is on)
+		# Clength, integerarray, Clines (this last one is passed only if __lineout__ is on)
 		if __trace__: print('# Feature tree:\n%s' % featuretree, file=sys.stderr)
 		# Keeping the necessary elements and flattening to a list of integers.
 		if __verbose__: print('# Converting to list of integers...', file=sys.stderr)
-		ft = [ node[1:4] + node[5:] for node in featuretree ]
-		self.integerlist = [i for node in ft for i in node]
-		self.Clength = len(self.integerlist)
+		self.integerarray = np.ascontiguousarray(featuretree.array[:, __CNODE_COLUMNS__], dtype=np.intc).ravel()
+		self.Clength = len(self.integerarray)
+		self.statistics = featuretree.statistics()
 		if __trace__: print('# self.Clength = %d' % self.Clength, file=sys.stderr)
-		if __trace__: print('# self.integerlist = %s' % self.integerlist, file=sys.stderr)
+		if __trace__: print('# self.integerarray = %s' % self.integerarray.tolist(), file=sys.stderr)
 		if __verbose__: print('# Copying lines...', file=sys.stderr)
 #		encode is no more neede in Python3.
 #		self.Clines = [ line.replace(':','\\:').encode('utf-8') for line in featuretree.lines ]
@@ -441,13 +547,18 @@ class CFeatureTree:
 		print('%d' % self.Clength, file=cfile)
 #		for i in self.integerlist:
 #			print >> cfile, '%d' % i
-		print('\n'.join( '%d' % i for i in self.integerlist ), file=cfile)
+		print('\n'.join( '%d' % i for i in self.integerarray.tolist() ), file=cfile)
 		if __lineout__:
 			print('\n'.join(self.Clines), file=cfile)
 		cfile.seek(0)
 		if __verbose__: print('## [Python] Writing input data: ' + ('%.2f' % (time.time() - t1)) + 's', file=sys.stderr)
 		return cfile
 
+	def array(self):
+		# The list of integers as a contiguous array of C integers (int32),
+		# to be passed to the C program without going through a file.
+		return self.integerarray
+
 	def get_index(self, the_line):
 		result = None
 		the_line_alphagram = alphagram(the_line)
@@ -513,7 +624,205 @@ def nlgclu(cfileA, cfileB, featuretreeA, featuretreeB, minimal_size=2, maximal_s
 	if __verbose__: print('## ListOfClusters: %s' % line_cluster_file, file=sys.stderr)
 	return line_cluster_file
 
-def NlgClustering(fileA=sys.stdin, fileB=None, minimal_size=2, maximal_size=None, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None):
+def clusters_from_array(integers):
+	"""
+	Split the flat array of integers returned by the C program
+	into clusters of pairs of object numbers.
+	Each cluster is given by its number of ratios followed by the pairs of objects.
+	>>> clusters_from_array(np.array([2, 0, 1, 2, 3, 3, 4, 5, 6, 7, 8, 9], dtype=np.intc))
+	[[[0, 1], [2, 3]], [[4, 5], [6, 7], [8, 9]]]
+	"""
+	result, i = [], 0
+	while i < len(integers):
+		n = int(integers[i])
+		result.append(integers[i+1:i+1+2*n].reshape(n, 2).tolist())
+		i += 1 + 2*n
+	return result
+
+__UNIT_MARK__ = -1						# Mark of a unit of work in the clusters output in parallel mode (see nlgclu.c).
+
+def merge_units(list_of_integers):
+	"""
+	Merge the clusters output by the workers in parallel mode
+	into the order of the sequential mode, by using the marks of the units of work.
+	>>> merge_units([np.array([-1, 1, 2, 0, 1, 2, 3, -1, 5, 2, 4, 5, 6, 7]), np.array([-1, 3, 2, 8, 9, 10, 11])]).tolist()
+	[2, 0, 1, 2, 3, 2, 8, 9, 10, 11, 2, 4, 5, 6, 7]
+	"""
+	units = []
+	for integers in list_of_integers:
+		i = 0
+		while i < len(integers):
+			assert integers[i] == __UNIT_MARK__, 'clusters output outside of a unit of work'
+			mark, j = integers[i+1], i+2
+			while j < len(integers) and integers[j] != __UNIT_MARK__:
+				j += 1 + 2*integers[j]
+			units.append((mark, integers[i+2:j]))
+			i = j
+	# Stable sort: the clusters with the same mark come from one worker, in the right order.
+	units.sort(key=lambda unit: unit[0])
+	return np.concatenate([ unit for mark, unit in units ] + [ np.array([], dtype=np.intc) ])
+
+def _nlgclu_worker(arguments):
+	# Call the C program for one of the workers in parallel mode.
+	return nlgclu_in_buffer_marked(*arguments)
+
+def nlgclu_in_memory(featuretreeA, featuretreeB, minimal_size=2, maximal_size=None, verbose=False, focus=None, workers=1, marks=None):
+	"""
+	Clusters of the objects of the feature trees.
+	The memory used by the C program is freed after each call: repeated calls do not make the process grow.
+
+	>>> import resource
+	>>> import nlg.Cluster.Words2Clusters.Words2Vectors as Words2Vectors
+	>>> words = [ stem + suffix for stem in ['talo', 'kissa', 'koira', 'auto', 'kirja', 'puu', 'käsi', 'sana', 'maa', 'vesi']
+	...				for suffix in ['', 'n', 'ssa', 'sta', 'lla', 'lta', 'lle', 'ksi', 'na', 't', 'en', 'ni'] ]
+	>>> tree = CFeatureTree.fromVectors(Words2Vectors.FeatureVectors(Words2Vectors.Words(words), char_features=True).get_distinguishables())
+	>>> n = len(nlgclu_in_memory(tree, tree))
+	>>> before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	>>> all( n == len(nlgclu_in_memory(tree, tree)) for _ in range(40) )
+	True
+	>>> resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before < 1024		# in kilobytes
+	True
+	"""
+	# Same as nlgclu, but the feature trees are passed to the C program
+	# and the clusters are read back as arrays of integers, without any temporary file.
+	# With several workers, the clustering is done in parallel by as many threads.
+	# Incremental mode: marks gives a boolean for each object of the feature tree (in the order of Clines),
+	# only the clusters which contain a marked object are output (symmetric clustering only).
+
+	# Parameter adaptation for the C program (no None in C).
+	if maximal_size == None: maximal_size = -1
+	if focus == None:
+		ifocus = -1
+	else:
+		ifocus = featuretreeA.get_index(focus)
+	if ifocus == None:
+		print('### WARNING: focus word "{}" not found in fileA; no cluster output.'.format(focus), file=sys.stderr)
+		return ListOfClusters('')
+
+	# Call the C program for actual clustering.
+	# Passing the same array twice tells the C program that the clustering is symmetric.
+	t1 = time.time()
+	arrayA = featuretreeA.array()
+	arrayB = arrayA if featuretreeB is featuretreeA else featuretreeB.array()
+	if marks is not None: marks = np.ascontiguousarray(marks, dtype=np.intc)
+	if workers <= 1:
+		integers = np.frombuffer(nlgclu_in_buffer_marked(arrayA, arrayB, minimal_size, maximal_size,
+						1 if __verbose__ or verbose else 0,
+						ifocus, marks, 0, 1), dtype=np.intc)
+	else:
+		# Only the first worker gives information to the user.
+		arguments = [ (arrayA, arrayB, minimal_size, maximal_size,
+						1 if (__verbose__ or verbose) and worker == 0 else 0,
+						ifocus, marks, worker, workers) for worker in range(workers) ]
+		with ThreadPool(workers) as pool:
+			outputs = pool.map(_nlgclu_worker, arguments)
+		integers = merge_units([ np.frombuffer(output, dtype=np.intc) for output in outputs ])
+	if __verbose__: print('## [Python] Clustering time: ' + ('%.2f' % (time.time() - t1)) + 's', file=sys.stderr)
+
+	# Converting the clusters of integers into clusters with lines (the lines correspond to the integers).
+	t1 = time.time()
+	integer_clusters = ListOfClusters([ Cluster(ratios) for ratios in clusters_from_array(integers) ], Indistinguishables([]))
+	line_cluster_file = ListOfConvertedClusters(integer_clusters, featuretreeA.Clines, featuretreeB.Clines)
+	if __verbose__: print('# Number of clusters transcribed: %d' % len(line_cluster_file), file=sys.stderr)
+	if __verbose__: print('## Transcription time: ' + ('%.2f' % (time.time() - t1)) + 's', file=sys.stderr)
+	return line_cluster_file
+
+def iter_clusters_featuretrees(featuretreeA, featuretreeB, minimal_size=2, maximal_size=None, verbose=False, focus=None, chunk_size=__chunk_size__, queue_size=__queue_size__):
+	# Same as nlgclu_in_memory, but generates the clusters (converted into lines) as they are output by the C program.
+	# The C program runs in a thread and passes its output by chunks of at least chunk_size integers
+	# through a queue of at most queue_size chunks: it waits when the consumer is late.
+	# Closing the generator stops the C program.
+
+	# Parameter adaptation for the C program (no None in C).
+	if maximal_size == None: maximal_size = -1
+	if focus == None:
+		ifocus = -1
+	else:
+		ifocus = featuretreeA.get_index(focus)
+	if ifocus == None:
+		print('### WARNING: focus word "{}" not found in fileA; no cluster output.'.format(focus), file=sys.stderr)
+		return
+
+	arrayA = featuretreeA.array()
+	arrayB = arrayA if featuretreeB is featuretreeA else featuretreeB.array()
+	chunks = queue.Queue(maxsize=queue_size)
+	stopped = threading.Event()
+
+	def put(item):
+		# Wait for room in the queue unless the consumer stopped.
+		# Returning True stops the C program.
+		while not stopped.is_set():
+			try:
+				chunks.put(item, timeout=0.1)
+				return False
+			except queue.Full:
+				pass
+		return True
+
+	def produce():
+		try:
+			nlgclu_iter_buffer(arrayA, arrayB, minimal_size, maximal_size,
+						1 if __verbose__ or verbose else 0,
+						ifocus, chunk_size, put)
+			put(None)
+		except BaseException as exception:
+			put(exception)
+
+	producer = threading.Thread(target=produce, daemon=True)
+	producer.start()
+	try:
+		while True:
+			chunk = chunks.get()
+			if chunk is None: break
+			if isinstance(chunk, BaseException): raise chunk
+			for ratios in clusters_from_array(np.frombuffer(chunk, dtype=np.intc)):
+				yield ConvertedCluster(ratios, featuretreeA.Clines, featuretreeB.Clines)
+	finally:
+		stopped.set()
+		producer.join()
+
+def iter_clusters(vectors, minimal_size=2, maximal_size=None, verbose=False, focus=None, chunk_size=__chunk_size__, queue_size=__queue_size__):
+	"""
+	Generator of the analogical clusters of vectors, in the same order as NlgClusteringFromVectors,
+	without keeping the whole output of the C program in memory.
+	The clusters can be consumed (e.g., verified against the distance constraint)
+	while the C program computes the next ones.
+	"""
+	featuretree = CFeatureTree.fromVectors(vectors)
+	if __verbose__ or verbose: print(featuretree.statistics, file=sys.stderr)
+	return iter_clusters_featuretrees(featuretree, featuretree,
+		minimal_size=minimal_size,
+		maximal_size=maximal_size,
+		verbose=verbose,
+		focus=focus,
+		chunk_size=chunk_size,
+		queue_size=queue_size)
+
+def nlgclu_featuretrees(featuretreeA, featuretreeB, minimal_size=2, maximal_size=None, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None, workers=1):
+	if __verbose__ or verbose:
+		print(featuretreeA.statistics, file=sys.stderr)
+		if featuretreeB is not featuretreeA: print(featuretreeB.statistics, file=sys.stderr)
+	# Call analogical clustering in memory,
+	# except when the C program has to output the lines (debugging), which requires the temporary files.
+	if __lineout__ or lineout:
+		cfileA = featuretreeA.store("nlgclu_fileA")
+		cfileB = cfileA if featuretreeB is featuretreeA else featuretreeB.store("nlgclu_fileB")
+		return nlgclu(cfileA, cfileB, featuretreeA, featuretreeB,
+			minimal_size=minimal_size,
+			maximal_size=maximal_size,
+			verbose=verbose,
+			lineout=lineout,
+			feature_number=feature_number,
+			anchors=anchors,
+			focus=focus)
+	return nlgclu_in_memory(featuretreeA, featuretreeB,
+		minimal_size=minimal_size,
+		maximal_size=maximal_size,
+		verbose=verbose,
+		focus=focus,
+		workers=workers)
+
+def NlgClustering(fileA=sys.stdin, fileB=None, minimal_size=2, maximal_size=None, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None, workers=1):
 	"""
 	This function is the entry point of this module.
 	"""
@@ -543,8 +852,6 @@ def NlgClustering(fileA=sys.stdin, fileB=None, minimal_size=2, maximal_size=None
 #		vectorsA = [vectorsA[i] for i in range(len(vectorsA)) if vectorsA[i] != '# '] # RH added on 19/8/2021; RH commented on 26/8/2021		
 		featuretreeA = featuretreeB = CFeatureTree.fromFile(fileA,alphabet=None) # RH modified on 26/8/2021
 #		featuretreeA = featuretreeB = CFeatureTree.fromFile(vectorsA)
-		# Creating the temporary files associated with the data set.
-		cfileA = cfileB = featuretreeA.store("nlgclu_fileA")
 	else:
 #		vectorsA = "" # RH added on 4/8/2021; RH commented on 17/8/2021
 #		vectorsA+=str(Vectors.fromFile(lines=fileA))[3:] # RH added on 4/8/2021; RH commented on 17/8/2021
@@ -586,50 +893,45 @@ def NlgClustering(fileA=sys.stdin, fileB=None, minimal_size=2, maximal_size=None
 		featuretreeB = CFeatureTree.fromFile(linesB, alphabet) # RH commented on 19/8/2021; RH uncommented and modified on 26/8/2021
 #		featuretreeB = CFeatureTree.fromFile(vectorsB) # RH commented on 26/8/2021
 #		featuretreeB = CFeatureTree.fromFile(vectorsAB) # RH added on 4/8/2021; RH commented on 17/8/2021; RH commented on 18/8/2021
-		# Create the temporary files associated with each data set.
-#		cfileA = cfileB = featuretreeA.store("nlgclu_fileA") # RH modified on 17/8/2021; RH commented on 18/8/2021
-		cfileA = featuretreeA.store("nlgclu_fileA")
-		cfileB = featuretreeB.store("nlgclu_fileB") 
 
 	# Call analogical clustering.
-	return nlgclu(cfileA, cfileB, featuretreeA, featuretreeB,
+	return nlgclu_featuretrees(featuretreeA, featuretreeB,
 		minimal_size=minimal_size,
 		maximal_size=maximal_size,
 		verbose=verbose,
 		lineout=lineout,
 		feature_number=feature_number,
 		anchors=anchors,
-		focus=focus)
+		focus=focus,
+		workers=workers)
 
-def NlgClusteringFromVectors(vectors, minimal_size=2, maximal_size=None, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None):
+def NlgClusteringFromVectors(vectors, minimal_size=2, maximal_size=None, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None, workers=1):
 	featuretreeA = featuretreeB = CFeatureTree.fromVectors(vectors)
-	# Creating the temporary files associated with the data set.
-	cfileA = cfileB = featuretreeA.store("nlgclu_fileA")
 
 	# Call analogical clustering.
-	return nlgclu(cfileA, cfileB, featuretreeA, featuretreeB,
+	return nlgclu_featuretrees(featuretreeA, featuretreeB,
 		minimal_size=minimal_size,
 		maximal_size=maximal_size,
 		verbose=verbose,
 		lineout=lineout,
 		feature_number=feature_number,
 		anchors=anchors,
-		focus=focus)
+		focus=focus,
+		workers=workers)
 
-def VectorNlgClustering(fileA=sys.stdin, fileB=None, minimal_size=2, maximal_size=-1, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None):
+def VectorNlgClustering(fileA=sys.stdin, fileB=None, minimal_size=2, maximal_size=-1, verbose=False, lineout=False, feature_number=None, anchors=False, focus=None, workers=1):
 	featuretreeA = CFeatureTree.fromFile(fileA)
-	# Creating the temporary files associated with the data set.
-	cfileA = featuretreeA.store("nlgclu_fileA")
 	
 	# Call analogical clustering.
-	return nlgclu(cfileA, cfileA, featuretreeA, featuretreeA,
+	return nlgclu_featuretrees(featuretreeA, featuretreeA,
 		minimal_size=minimal_size,
 		maximal_size=maximal_size,
 		verbose=verbose,
 		lineout=lineout,
 		feature_number=feature_number,
 		anchors=anchors,
-		focus=focus)
+		focus=focus,
+		workers=workers)
 
 ###############################################################################
 
@@ -689,6 +991,9 @@ def read_argv():
 	parser.add_argument('-F','--focus',
 						action='store',dest='focus', type=str, default=None,
 						help = 'only output those clusters which contain FOCUS')
+	parser.add_argument('-j','--workers',
+						action='store',dest='workers', type=int, default=1,
+						help = 'number of threads for clustering (default: %(default)s)')
 	parser.add_argument('--vectors',
 						action='store_true', dest='vectors', default=False,
                   		help='input file contains vectors')
@@ -720,6 +1025,7 @@ if __name__ == '__main__':
 	__minimal_size__ = options.minsize
 	__focus__ = options.focus
 	__anchors__ = options.anchors
+	__workers__ = options.workers
 	if __verbose__: print('# Focus: %s' % options.focus, file=sys.stderr)
 	if __verbose__: print('# Minimal size of clusters: %d' % __minimal_size__, file=sys.stderr)
 	__maximal_size__ = -1 if options.maxsize == None else options.maxsize
@@ -770,5 +1076,6 @@ if __name__ == '__main__':
 		lineout=options.lineout,
 		feature_number=options.fn,
 		anchors=options.anchors,
-		focus=options.focus))
+		focus=options.focus,
+		workers=options.workers))
 	if __verbose__: print('# Processing time: %.2fs' % (time.time() - t1), file=sys.stderr)
\ No newline at end of file
@@ -1,5 +1,11 @@
 /* File : nlgclu.c */
 /* Copyright (c) 2014, 2015, Yves Lepage */
+/* 18/10/2026: added nlgclu_in_memory: tree passed and clusters returned in memory, without temporary files. */
+/* 18/10/2026: parallel mode: the work is split between several workers on PARTITION_LEVEL. */
+/* 18/10/2026: reentrant: no more global variables, the state of a clustering is passed in a CONTEXT. */
+/* 18/10/2026: streaming mode (nlgclu_to_sink): the clusters are passed to a sink by chunks as soon as they are output. */
+/* 18/10/2026: incremental mode (nlgclu_in_memory_marked): only the clusters which contain a marked (new) object are explored. */
+/* 18/10/2026: freematrix frees all the rows allocated (no more leak at each clustering). */
 
 #define MODULE "nlgclu.c"
 #define TRACE 0
@@ -32,7 +38,6 @@
 
 const int SHIFT = 4;
 const char *BLANKS = "                                       ";
-int length = 0;
 
 /*
  * Exit on error
@@ -140,32 +145,15 @@ char *li2s(int length, int *list)
 #define FALSE	0
 
 /*
- * The two feature trees are global variables.
- * A feature tree is just a list of integers,
- * more precisely of list of sequences of NODESIZE integers.
- * Each position divided by NODESIZE in a feature tree is the index of a node.
+ * Parallel mode.
+ * The lists of pairs of nodes with the same difference value on PARTITION_LEVEL are units of work.
+ * They are numbered in the order of the recursion and distributed in turn to WORKERS workers.
+ * Each worker runs the whole recursion above PARTITION_LEVEL, but only goes down into its own units.
+ * The clusters of each unit are preceded by a mark with the number of the unit,
+ * so that the clusters of all workers can be merged back in the order of the sequential recursion.
  */
 
-int VERBOSE = 0;
-int LINEOUT = 0;
-int FOCUS_WORD = -1; /* focus word when only clusters containing this word are wanted. */
-int symmetry = FALSE;
-int *treeA = NULL; /* The first  feature tree structure */
-int *treeB = NULL; /* The second feature tree structure */
-int last_level = 0;
-char **linetableA = NULL; /* The starting point of each line in the first list of lines */
-char **linetableB = NULL; /* The starting point of each line in the second list of lines */
-int **indexvector = NULL ; /* For each level, contains a vector of all possible values, which contains the number of pairs for that value. */
-int **maxindexvector = NULL ; /* For each level, contains the allocated memory for the number of possible values. */
-int ***nextnodeAmatrix = NULL ; /* Matrix of indices for nodeA on the next level. */
-int	***nextnodeBmatrix = NULL ; /* Matrix of indices for nodeB on the next level. */
-
-/*
- * A well-formed cluster is considered degenerated if its length is less than the following threshold.
- */
-
-int CLUSTER_MINIMAL_LENGTH = 2;			/* 2 for all theoretically possible clusters */
-int CLUSTER_MAXIMAL_LENGTH = INT_MAX;	/* INT_MAX for all theoretically possible clusters */
+#define PARTITION_LEVEL	2
 
 /*
  * Structure of a node in a feature tree.
@@ -181,13 +169,6 @@ int CLUSTER_MAXIMAL_LENGTH = INT_MAX;	/* INT_MAX for all theoretically possible
 #define next_level_begin_node(tree,i)	tree[NODESIZE*i+5]	/* beginning of the next level */
 #define next_level_end_node(tree,i)		tree[NODESIZE*i+6]	/* end of the next level */
 
-/*
- * Values for the number of values and the number of pairs.
- */
-
-int _VALMIN = 32;
-int _VALNBR = 32;
-
 /*
  * For trace only
  */
@@ -218,27 +199,146 @@ typedef struct FEATURES_T
 FEATURES ;
 
 /*
- * Temporary file for the clusters.
+ * Buffer for the clusters when no temporary file is used (see nlgclu_in_memory).
+ * Each cluster is stored as its number of ratios,
+ * followed by the pairs of objects (object in A, object in B) of each ratio.
  */
 
-FILE *cluout = NULL ;
+typedef struct CLUSTERS_T
+{
+  int length;
+  int maxlength;
+  int *data;
+}
+CLUSTERS ;
+
+#define UNIT_MARK	-1		/* Length of a cluster standing for the mark of a unit of work in parallel mode. */
 
 /*
- * Compute the minimal possible value
+ * The state of a clustering.
+ * There are no global variables, so that several clusterings can run at the same time in different threads.
+ * The two feature trees are in the context.
+ * A feature tree is just a list of integers,
+ * more precisely of list of sequences of NODESIZE integers.
+ * Each position divided by NODESIZE in a feature tree is the index of a node.
  */
 
-int minvalueA = 0;
-int maxvalueA = 0;
-int maxsizeA = 0;
+typedef struct CONTEXT_T
+{
+	int verbose ;
+	int lineout ;
+	int focus_word ;				/* focus word when only clusters containing this word are wanted. */
+	int *marked ;					/* Incremental mode: number of marked objects before each object (length: number of objects + 1), or NULL. */
+	int symmetry ;
+	int *treeA ;					/* The first  feature tree structure */
+	int *treeB ;					/* The second feature tree structure */
+	int last_level ;
+	char **linetableA ;				/* The starting point of each line in the first list of lines */
+	char **linetableB ;				/* The starting point of each line in the second list of lines */
+	int **indexvector ;				/* For each level, contains a vector of all possible values, which contains the number of pairs for that value. */
+	int **maxindexvector ;			/* For each level, contains the allocated memory for the number of possible values. */
+	int ***nextnodeAmatrix ;		/* Matrix of indices for nodeA on the next level. */
+	int ***nextnodeBmatrix ;		/* Matrix of indices for nodeB on the next level. */
+	/* A well-formed cluster is considered degenerated if its length is less than the following threshold. */
+	int cluster_minimal_length ;	/* 2 for all theoretically possible clusters */
+	int cluster_maximal_length ;	/* INT_MAX for all theoretically possible clusters */
+	/* Values for the number of values and the number of pairs. */
+	int valmin ;
+	int valnbr ;
+	FILE *cluout ;					/* Temporary file for the clusters. */
+	CLUSTERS *cluin ;				/* Buffer for the clusters when no temporary file is used. */
+	/* Streaming mode. */
+	CLUSTER_SINK sink ;				/* Function called with the buffer of clusters when it is full enough. */
+	void *sinkdata ;				/* Data passed to the sink. */
+	int chunksize ;					/* Size of the buffer of clusters (number of integers) before calling the sink. */
+	int stop ;						/* Set when the sink asks for the clustering to stop. */
+	/* Parallel mode. */
+	int worker ;					/* Number of this worker. */
+	int workers ;					/* Number of workers, 1 for no parallelism. */
+	int unit_number ;				/* Number of the next unit of work on PARTITION_LEVEL. */
+	/* For developper trace purposes. */
+	int clu_nbr ;
+	int rest_n ;
+	int maxpairnbr ;
+}
+CONTEXT ;
+
+/*
+ * Initialize a context with the default values.
+ */
+
+void init_context(CONTEXT *context)
+{
+	memset(context, 0, sizeof(CONTEXT)) ;
+	context->focus_word = -1 ;
+	context->symmetry = FALSE ;
+	context->cluster_minimal_length = 2 ;
+	context->cluster_maximal_length = INT_MAX ;
+	context->valmin = 32 ;
+	context->valnbr = 32 ;
+	context->workers = 1 ;
+	context->marked = NULL ;
+}
+
+CLUSTERS *newclusters(void)
+{
+	CLUSTERS *result = (CLUSTERS *) calloc(1, sizeof(CLUSTERS)) ;
 
-int minvalueB = 0;
-int maxvalueB = 0;
-int maxsizeB = 0;
+	result->maxlength = 1024 ;
+	result->data = (int *) calloc(result->maxlength, sizeof(int)) ;
+	return result ;
+}
 
-void gettreeparams(int lengthA, int *treeA)
+void append_to_clusters(CLUSTERS *clusters, int n)
+{
+	if ( clusters->maxlength <= clusters->length )
+	{
+		clusters->maxlength = 2 * clusters->maxlength ;
+		clusters->data = (int *) realloc(clusters->data, clusters->maxlength * sizeof(int)) ;
+		if ( NULL == clusters->data )
+			error(MODULE, "append_to_clusters", "not enough memory for the clusters") ;
+	} ;
+	clusters->data[clusters->length] = n ;
+	clusters->length += 1 ;
+}
+
+/*
+ * Mark the beginning of the clusters output in a unit of work in parallel mode.
+ * The clusters output above PARTITION_LEVEL before unit n get the mark 2n,
+ * the clusters of unit n get the mark 2n+1.
+ */
+
+void mark_unit(CONTEXT *context, int mark)
+{
+	if ( context->cluin && 1 < context->workers )
+	{
+		append_to_clusters(context->cluin, UNIT_MARK) ;
+		append_to_clusters(context->cluin, mark) ;
+	} ;
+}
+
+/*
+ * Streaming mode: pass the clusters in the buffer to the sink and empty the buffer.
+ */
+
+void flush_clusters(CONTEXT *context)
+{
+	if ( context->sink( context->sinkdata, context->cluin->length, context->cluin->data ) )
+		context->stop = TRUE ;
+	context->cluin->length = 0 ;
+}
+
+/*
+ * Compute the minimal possible value
+ */
+
+void gettreeparams(int lengthA, int *treeA, int *pminvalueA, int *pmaxvalueA, int *pmaxsizeA)
 {
     int i = 0;
     int sizeA = 1;
+	int minvalueA = 0,
+		maxvalueA = 0,
+		maxsizeA = 0 ;
 
 trace(("in  gettreeparams(lengthA = %d)\n", lengthA))
 
@@ -263,22 +363,26 @@ trace(("in  gettreeparams(lengthA = %d)\n", lengthA))
     };
 
 trace(("out gettreeparams(lengthA = %d) minvalueA = %d, maxvalueA = %d, maxziseA = %d\n", lengthA, minvalueA, maxvalueA, maxsizeA))
+
+	*pminvalueA = minvalueA ;
+	*pmaxvalueA = maxvalueA ;
+	*pmaxsizeA = maxsizeA ;
 }
 
-void getmatrixparams(int lengthA, int lengthB, int *treeA, int *treeB)
+void getmatrixparams(CONTEXT *context, int lengthA, int lengthB)
 {
+	int minvalueA = 0, maxvalueA = 0, maxsizeA = 0 ;
+	int minvalueB = 0, maxvalueB = 0, maxsizeB = 0 ;
+
 trace(("in  getmatrixparams(lengthA = %d, lengthB = %d)\n", lengthA, lengthB))
 
-    gettreeparams(lengthB, treeB);
-    minvalueB = minvalueA;
-    maxvalueB = maxvalueA;
-    maxsizeB = maxsizeA;
-    gettreeparams(lengthA, treeA);
+    gettreeparams(lengthB, context->treeB, &minvalueB, &maxvalueB, &maxsizeB);
+    gettreeparams(lengthA, context->treeA, &minvalueA, &maxvalueA, &maxsizeA);
 
-    _VALMIN = minvalueA - maxvalueB;
-    _VALNBR = maxvalueA - minvalueB - _VALMIN + 1;
+    context->valmin = minvalueA - maxvalueB;
+    context->valnbr = maxvalueA - minvalueB - context->valmin + 1;
 
-trace(("out getmatrixparams(lengthA = %d, lengthB = %d) _VALMIN = %d, _VALNBR = %d\n", lengthA, lengthB, _VALMIN, _VALNBR))
+trace(("out getmatrixparams(lengthA = %d, lengthB = %d) valmin = %d, valnbr = %d\n", lengthA, lengthB, context->valmin, context->valnbr))
 }
 
 /*
@@ -301,7 +405,7 @@ ntrace(("out newmatrix(%d) done\n", length))
 }
 
 /*
- * Free matrix of integers.
+ * Free matrix of integers (the length + 1 rows allocated by newmatrix).
  */
 
 void freematrix(int **matrix, int length)
@@ -310,8 +414,8 @@ void freematrix(int **matrix, int length)
 
 ntrace(("in  freematrix(%d)\n", length))
 
-    for (i = 0; i < length; ++i)
-		if (! matrix[i])
+    for (i = 0; i <= length; ++i)
+		if (matrix[i])
         	free(matrix[i]);
     free(matrix);
 
@@ -322,11 +426,12 @@ ntrace(("out freematrix(%d) done\n", length))
  * Creating table of pointers to line.
  */
 
-void newlinetable(char *s)
+char **newlinetable(char *s)
 {
     char *ss = NULL;
     int size = 0;
     int i = 0;
+	char **linetableA = NULL ;
 
 ntrace(("in  newlinetable(%s)\n", s))
 
@@ -353,6 +458,8 @@ ntrace(("out newlinetable() size = %d\n", size))
 	linetableA[i] = ss;
 	
 ntrace(("out newlinetable(%s)\n", s))
+
+	return linetableA ;
 }
 
 /*
@@ -372,51 +479,63 @@ ntrace(("out freelinetable()\n"))
  * Print a cluster.
  */
 
-void print_cluster(int length, int *nodesA, int *nodesB)
+void print_cluster(CONTEXT *context, int length, int *nodesA, int *nodesB)
 {
-    static int clu_nbr = 0;
     int i = 0;
     char cA = ' ',
 		 cB = ' ';
 
 ntrace(("in  print_cluster(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(length, nodesB)))
 
-	if (VERBOSE) fprintf(stderr, "\r# %d clusters... ", ++clu_nbr);
+	if (context->verbose) fprintf(stderr, "\r# %d clusters... ", ++context->clu_nbr);
+	if ( context->cluin )
+	{
+		/* In memory: no text output. */
+		append_to_clusters(context->cluin, length) ;
+		for (i = 0; i < length; ++i)
+		{
+			append_to_clusters(context->cluin, object(context->treeA, nodesA[i])) ;
+			append_to_clusters(context->cluin, object(context->treeB, nodesB[i])) ;
+		} ;
+		if ( context->sink && context->chunksize <= context->cluin->length )
+			flush_clusters(context) ;
+		return ;
+	} ;
 	for (i = 0; i < length; ++i)
 	{
 		int iA = 0,
 			iB = 0;
 
-ntrace(("mid print_cluster(%d, %d)\n", object(treeA, nodesA[i]), object(treeB, nodesB[i])))
+ntrace(("mid print_cluster(%d, %d)\n", object(context->treeA, nodesA[i]), object(context->treeB, nodesB[i])))
 
 		if (0 != i)
 		{
-			fprintf(cluout, " :: ");
-			if ( LINEOUT )
+			fprintf(context->cluout, " :: ");
+			if ( context->lineout )
 				fprintf(stderr, " :: ");
 		} ;
 		
-		iA = object(treeA, nodesA[i]);
-		iB = object(treeB, nodesB[i]);
-		fprintf(cluout, "%d : %d", iA, iB);
+		iA = object(context->treeA, nodesA[i]);
+		iB = object(context->treeB, nodesB[i]);
+		fprintf(context->cluout, "%d : %d", iA, iB);
 		
 ntrace(("mid print_cluster() 1 iA = %d, iB = %d\n", iA, iB))
 
-		if ( LINEOUT )
+		if ( context->lineout )
 		{
-			cA = *(linetableA[iA + 1] - 1); /* Should be '\n' */
-			cB = *(linetableB[iB + 1] - 1); /* Should be '\n' */
-			*(linetableA[iA + 1] - 1) = '\0';
-			*(linetableB[iB + 1] - 1) = '\0';
-			fprintf(stderr, "%s : %s", linetableA[iA], linetableB[iB]);
-			*(linetableA[iA + 1] - 1) = cA;
-			*(linetableB[iB + 1] - 1) = cB;
+			cA = *(context->linetableA[iA + 1] - 1); /* Should be '\n' */
+			cB = *(context->linetableB[iB + 1] - 1); /* Should be '\n' */
+			*(context->linetableA[iA + 1] - 1) = '\0';
+			*(context->linetableB[iB + 1] - 1) = '\0';
+			fprintf(stderr, "%s : %s", context->linetableA[iA], context->linetableB[iB]);
+			*(context->linetableA[iA + 1] - 1) = cA;
+			*(context->linetableB[iB + 1] - 1) = cB;
 		} ;
 	};
 
-	fprintf(cluout, "\n");
-	fflush(cluout);
-	if ( LINEOUT )
+	fprintf(context->cluout, "\n");
+	fflush(context->cluout);
+	if ( context->lineout )
 	{
 		fprintf(stderr, "\n");
 		fflush(stderr);
@@ -429,7 +548,7 @@ ntrace(("out print_cluster(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(le
  * Test whether a word is contained in the list of pairs of intervals.
  */
 
-int word_not_in_pair(int length, int nodeAi, int nodeBi, int focus)
+int word_not_in_pair(CONTEXT *context, int length, int nodeAi, int nodeBi, int focus)
 {
     int result = FALSE;
 	int iA = 0,
@@ -439,10 +558,10 @@ int word_not_in_pair(int length, int nodeAi, int nodeBi, int focus)
 	
 ntrace(("in  word_not_in_pair(%d, %d, %d,  focus=%d)\n", length, nodeAi, nodeBi, focus))
 
-	iA = object(treeA, nodeAi) ;
-	iB = object(treeB, nodeBi) ;
-	jA = iA + width(treeA, nodeAi) ;
-	jB = iB + width(treeB, nodeBi) ;
+	iA = object(context->treeA, nodeAi) ;
+	iB = object(context->treeB, nodeBi) ;
+	jA = iA + width(context->treeA, nodeAi) ;
+	jB = iB + width(context->treeB, nodeBi) ;
     result = ( ! ( iA <= focus && focus < jA ) )
 	      && ( ! ( iB <= focus && focus < jB ) ) ;
 
@@ -451,17 +570,17 @@ ntrace(("out word_not_in_pair(%d, %d, %d, focus=%d) = %s\n", length, nodeAi, nod
     return result;
 }
 
-int word_not_in_cluster(int length, int *nodesA, int *nodesB, int focus)
+int word_not_in_cluster(CONTEXT *context, int length, int *nodesA, int *nodesB, int focus)
 {
     int result = FALSE;
 
 trace(("in  word_not_in_cluster(%d, %s, %s, focus=%d)\n", length, li2s(length, nodesA), li2s(length, nodesB), focus))
 
-	if ( symmetry )
+	if ( context->symmetry )
 	{
         int i = 0;
 		
-        for ( i = 0 ; i < length && word_not_in_pair(length, nodesA[i], nodesB[i], focus) ; ++i ) ;
+        for ( i = 0 ; i < length && word_not_in_pair(context, length, nodesA[i], nodesB[i], focus) ; ++i ) ;
 		result = (i == length) ;
 	} ;
 
@@ -470,6 +589,39 @@ trace(("out word_not_in_cluster(%d, %s, %s, focus=%d) = %s\n", length, li2s(leng
     return result;
 }
 
+/*
+ * Incremental mode: test whether a list of pairs of intervals contains no marked object.
+ * The objects of a node are the interval [object, object + width),
+ * the number of marked objects in it is given by the difference of the prefix sums.
+ */
+
+int marked_in_node(CONTEXT *context, int *tree, int node)
+{
+	int first = object(tree, node) ;
+
+	return context->marked[first + width(tree, node)] - context->marked[first] ;
+}
+
+int no_marked_in_cluster(CONTEXT *context, int length, int *nodesA, int *nodesB)
+{
+    int result = FALSE;
+
+trace(("in  no_marked_in_cluster(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(length, nodesB)))
+
+	if ( context->symmetry )
+	{
+        int i = 0;
+
+		for ( i = 0 ; i < length && 0 == marked_in_node(context, context->treeA, nodesA[i]) && 0 == marked_in_node(context, context->treeB, nodesB[i]) ; ++i )
+			;
+		result = (i == length) ;
+	} ;
+
+trace(("out no_marked_in_cluster(%d, %s, %s) = %s\n", length, li2s(length, nodesA), li2s(length, nodesB), result ? "TRUE" : "FALSE"))
+
+    return result;
+}
+
 /*
  * Test for degenerated clusters.
  * A degenerated list is a list of pairs of intervals that contains only one pair of intervals,
@@ -480,13 +632,13 @@ trace(("out word_not_in_cluster(%d, %s, %s, focus=%d) = %s\n", length, li2s(leng
  * so as to speed up the computation.
  */
 
-int is_degenerated(int length, int *nodesA, int *nodesB)
+int is_degenerated(CONTEXT *context, int length, int *nodesA, int *nodesB)
 {
     int result = FALSE;
 
 ntrace(("in  is_degenerated(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(length, nodesB)))
 
-    result = (1 == length) && ((1 == width(treeA, nodesA[0])) || (1 == width(treeB, nodesB[0]))) ;
+    result = (1 == length) && ((1 == width(context->treeA, nodesA[0])) || (1 == width(context->treeB, nodesB[0]))) ;
 
 ntrace(("out is_degenerated(%d, %s, %s) = %s\n", length, li2s(length, nodesA), li2s(length, nodesB), result ? "TRUE" : "FALSE"))
 
@@ -497,31 +649,31 @@ ntrace(("out is_degenerated(%d, %s, %s) = %s\n", length, li2s(length, nodesA), l
  * Recognize the trivial cluster A : A :: B : B :: C : C :: ...
  */
 
-int is_singleton_pair(int length, int nodeAi, int nodeBi)
+int is_singleton_pair(CONTEXT *context, int length, int nodeAi, int nodeBi)
 {
 	int result = FALSE ;
 	
 trace(("in  is_singleton_pair(%d, %d, %d)\n", length, nodeAi, nodeBi))
 
-	result = (1 == width(treeA, nodeAi)) && (1 == width(treeB, nodeBi))
-				&& object(treeA, nodeAi) == object(treeB, nodeBi) ;
+	result = (1 == width(context->treeA, nodeAi)) && (1 == width(context->treeB, nodeBi))
+				&& object(context->treeA, nodeAi) == object(context->treeB, nodeBi) ;
 
 trace(("out is_singleton_pair(%d, %d, %d) = %s\n", length, nodeAi, nodeBi, result ? "TRUE" : "FALSE"))
 
 	return result ;
 }
 
-int is_trivial(int length, int *nodesA, int *nodesB)
+int is_trivial(CONTEXT *context, int length, int *nodesA, int *nodesB)
 {
     int result = FALSE;
 
 trace(("in  is_trivial(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(length, nodesB)))
 
-	if ( symmetry )
+	if ( context->symmetry )
 	{
         int i = 0;
 		
-        for ( i = 0 ; i < length && is_singleton_pair(length, nodesA[i], nodesB[i]) ; ++i ) ;
+        for ( i = 0 ; i < length && is_singleton_pair(context, length, nodesA[i], nodesB[i]) ; ++i ) ;
 		result = (i == length) ;
 	} ;
 
@@ -537,40 +689,38 @@ trace(("out is_trivial(%d, %s, %s) = %s\n", length, li2s(length, nodesA), li2s(l
  * In that case, this is a cluster and we can output it.
  */
 
-int is_finished_singleton_pair(int length, int nodeAi, int nodeBi)
+int is_finished_singleton_pair(CONTEXT *context, int length, int nodeAi, int nodeBi)
 {
 	int result = FALSE ;
 	
 trace(("in  is_finished_singleton_pair(%d, %d, %d)\n", length, nodeAi, nodeBi))
 
-	result = (1 == width(treeA, nodeAi)) && (1 == width(treeB, nodeBi))
-				&& is_empty_rest(treeA, nodeAi)  && is_empty_rest(treeB, nodeBi) ;
+	result = (1 == width(context->treeA, nodeAi)) && (1 == width(context->treeB, nodeBi))
+				&& is_empty_rest(context->treeA, nodeAi)  && is_empty_rest(context->treeB, nodeBi) ;
 
 trace(("out is_finished_singleton_pair(%d, %d, %d) = %s\n", length, nodeAi, nodeBi, result ? "TRUE" : "FALSE"))
 
 	return result ;
 }
 
-static int rest_n = 0 ;
-
-int is_empty_rest_cluster(int length, int *nodesA, int *nodesB)
+int is_empty_rest_cluster(CONTEXT *context, int length, int *nodesA, int *nodesB)
 {
     int result = FALSE;
 
 trace(("in  is_empty_rest_cluster(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(length, nodesB)))
 
-	if ( symmetry )
+	if ( context->symmetry )
 	{
         int i = 0;
 		
-        for ( i = 0 ; i < length && is_finished_singleton_pair(length, nodesA[i], nodesB[i]) ; ++i ) ;
+        for ( i = 0 ; i < length && is_finished_singleton_pair(context, length, nodesA[i], nodesB[i]) ; ++i ) ;
 		result = (i == length) ;
 	} ;
 
 trace(("out is_empty_rest_cluster(%d, %s, %s) = %s\n", length, li2s(length, nodesA), li2s(length, nodesB), result ? "TRUE" : "FALSE"))
 
 	if (result)
-		rest_n += 1 ;
+		context->rest_n += 1 ;
     return result;
 }
 
@@ -580,7 +730,7 @@ trace(("out is_empty_rest_cluster(%d, %s, %s) = %s\n", length, li2s(length, node
  * of widths along A and B.
  */
 
-int surface(int length, int *nodesA, int *nodesB)
+int surface(CONTEXT *context, int length, int *nodesA, int *nodesB)
 {
 	int result = 0 ;
 	int i = 0;
@@ -588,7 +738,7 @@ int surface(int length, int *nodesA, int *nodesB)
 trace(("in  surface(%d, %s, %s)\n", length, li2s(length, nodesA), li2s(length, nodesB)))
 	
 	for ( i = 0 ; i < length ; ++i )
-		result += width(treeA, nodesA[i]) * width(treeB, nodesB[i]) ;
+		result += width(context->treeA, nodesA[i]) * width(context->treeB, nodesB[i]) ;
 
 trace(("out surface(%d, %s, %s) = %d\n", length, li2s(length, nodesA), li2s(length, nodesB), result))
 
@@ -607,15 +757,12 @@ trace(("out surface(%d, %s, %s) = %d\n", length, li2s(length, nodesA), li2s(leng
  *    The matrix contains the feature difference value for each subnode in A corresponding to each subnode in B.
  */
 
-/* For developper trace purposes. */
-static int MAXPAIRNBR = 0 ;
-
-void xrefine_down(int length, int *nodesA, int *nodesB, int diffvalue, int level)
+void xrefine_down(CONTEXT *context, int length, int *nodesA, int *nodesB, int diffvalue, int level)
 {
     int i = 0; /* indices in nodesA and nodesB on the current level */
     int v = 0 ;
 
-    void refine_down(int length, int *nodesA, int *nodesB, int diffvalue, int level) ;
+    void refine_down(CONTEXT *context, int length, int *nodesA, int *nodesB, int diffvalue, int level) ;
 
 trace(("%.*sin  xrefine_down(level=%d, diffvalue=%d, length=%d, %s, %s)\n", SHIFT*level, BLANKS, level, diffvalue, length, li2s(length, nodesA), li2s(length, nodesB)))
 
@@ -625,38 +772,38 @@ trace(("mid xrefine_down() Filling matrices...\n"))
 	{
         int nodeA = nodesA[i],
 			nodeB = nodesB[i] ;
-        int nextbeginA = next_level_begin_node(treeA, nodeA),
-			nextendA = next_level_end_node(treeA, nodeA) ;
-        int nextbeginB = next_level_begin_node(treeB, nodeB),
-			nextendB = next_level_end_node(treeB, nodeB) ;
+        int nextbeginA = next_level_begin_node(context->treeA, nodeA),
+			nextendA = next_level_end_node(context->treeA, nodeA) ;
+        int nextbeginB = next_level_begin_node(context->treeB, nodeB),
+			nextendB = next_level_end_node(context->treeB, nodeB) ;
         int nextnodeA = 0, /* nodes on the next level */
 			nextnodeB = 0 ;
 
         for ( nextnodeA = nextbeginA ; nextnodeA <= nextendA ; ++nextnodeA )
             for ( nextnodeB = nextbeginB ; nextnodeB <= nextendB ; ++nextnodeB )
-                if ( ! ( symmetry && object(treeA, nextnodeA) > object(treeB, nextnodeB) ) )
+                if ( ! ( context->symmetry && object(context->treeA, nextnodeA) > object(context->treeB, nextnodeB) ) )
 				{
-                    int v = value(treeA, nextnodeA) - value(treeB, nextnodeB) - _VALMIN ;
+                    int v = value(context->treeA, nextnodeA) - value(context->treeB, nextnodeB) - context->valmin ;
 
-					if ( _VALNBR <= v )
+					if ( context->valnbr <= v )
 					{
                         fprintf(stderr, "*** Too big value: %d...\n", v) ;
                         fflush(stderr) ;
                     };
-					if ( maxindexvector[level][v] <= indexvector[level][v] )
+					if ( context->maxindexvector[level][v] <= context->indexvector[level][v] )
 					{
-						maxindexvector[level][v] = 2 * indexvector[level][v] ;
-trace(("mid xrefine_down() nextnodeAmatrix[%d][%d] extended to size %d.\n",level,v,maxindexvector[level][v]))
-						nextnodeAmatrix[level][v] = (int *) realloc(nextnodeAmatrix[level][v], maxindexvector[level][v] * sizeof (int));
-						nextnodeBmatrix[level][v] = (int *) realloc(nextnodeBmatrix[level][v], maxindexvector[level][v] * sizeof (int));
+						context->maxindexvector[level][v] = 2 * context->indexvector[level][v] ;
+trace(("mid xrefine_down() nextnodeAmatrix[%d][%d] extended to size %d.\n",level,v,context->maxindexvector[level][v]))
+						context->nextnodeAmatrix[level][v] = (int *) realloc(context->nextnodeAmatrix[level][v], context->maxindexvector[level][v] * sizeof (int));
+						context->nextnodeBmatrix[level][v] = (int *) realloc(context->nextnodeBmatrix[level][v], context->maxindexvector[level][v] * sizeof (int));
 					} ;
-                    nextnodeAmatrix[level][v][indexvector[level][v]] = nextnodeA ;
-                    nextnodeBmatrix[level][v][indexvector[level][v]] = nextnodeB ;
-                    indexvector[level][v] += 1 ;
+                    context->nextnodeAmatrix[level][v][context->indexvector[level][v]] = nextnodeA ;
+                    context->nextnodeBmatrix[level][v][context->indexvector[level][v]] = nextnodeB ;
+                    context->indexvector[level][v] += 1 ;
 					
 					/* For developper trace purposes. */
-					if ( MAXPAIRNBR < indexvector[level][v] )
-						MAXPAIRNBR = indexvector[level][v] ;
+					if ( context->maxpairnbr < context->indexvector[level][v] )
+						context->maxpairnbr = context->indexvector[level][v] ;
 
                 } ;
     } ;
@@ -664,14 +811,25 @@ trace(("mid xrefine_down() nextnodeAmatrix[%d][%d] extended to size %d.\n",level
 trace(("mid xrefine_down() Matrices and index vector filled.\n"))
 trace(("mid xrefine_down() Processing by feature difference value...\n"))
 
-    for (v = 0; v < _VALNBR; ++v)
+    for (v = 0; v < context->valnbr; ++v)
 	{
-trace(("mid xrefine_down() %d pairs with value = %d\n", indexvector[level][v], v))
+trace(("mid xrefine_down() %d pairs with value = %d\n", context->indexvector[level][v], v))
 
-        if (0 < indexvector[level][v])
+        if (0 < context->indexvector[level][v])
 		{
-            refine_down(indexvector[level][v], nextnodeAmatrix[level][v], nextnodeBmatrix[level][v], v, level + 1);
-			indexvector[level][v] = 0 ;
+			if ( 1 < context->workers && PARTITION_LEVEL == level + 1 )
+			{
+				/* Parallel mode: only go down into the units of work of this worker. */
+				if ( context->worker == context->unit_number % context->workers )
+				{
+					mark_unit(context, 2 * context->unit_number + 1) ;
+					refine_down(context, context->indexvector[level][v], context->nextnodeAmatrix[level][v], context->nextnodeBmatrix[level][v], v, level + 1);
+				} ;
+				context->unit_number += 1 ;
+			}
+			else
+				refine_down(context, context->indexvector[level][v], context->nextnodeAmatrix[level][v], context->nextnodeBmatrix[level][v], v, level + 1);
+			context->indexvector[level][v] = 0 ;
 		};
     };
 
@@ -686,42 +844,56 @@ trace(("%.*sout xrefine_down(level=%d, diffvalue=%d, length=%d, %s, %s)\n", SHIF
  * or too small well-formed clusters.
  */
 
-void refine_down(int length, int *nodesA, int *nodesB, int diffvalue, int level)
+void refine_down(CONTEXT *context, int length, int *nodesA, int *nodesB, int diffvalue, int level)
 {
 trace(("%.*sin  refine_down(length=%d, diffvalue=%d, level=%d, %s, %s)\n", SHIFT*level, BLANKS, length, diffvalue, level, li2s(length, nodesA), li2s(length, nodesB)))
 
-	if ( (-1 != FOCUS_WORD) && word_not_in_cluster(length, nodesA, nodesB, FOCUS_WORD) )
+	if ( context->stop )
+	{
+trace(("%.*smid refine_down(level=%d) STOP REQUESTED BY THE SINK: DO NOT CONTINUE\n", SHIFT*level, BLANKS, level))
+	}
+	else if ( (-1 != context->focus_word) && word_not_in_cluster(context, length, nodesA, nodesB, context->focus_word) )
+	{
+trace(("%.*smid refine_down(level=%d) FOCUS WORD %d NOT IN CLUSTER: DO NOT CONTINUE\n", SHIFT*level, BLANKS, level, context->focus_word))
+	}
+	else if ( context->marked && no_marked_in_cluster(context, length, nodesA, nodesB) )
 	{
-trace(("%.*smid refine_down(level=%d) FOCUS WORD %d NOT IN CLUSTER: DO NOT CONTINUE\n", SHIFT*level, BLANKS, level, focus_word))
+trace(("%.*smid refine_down(level=%d) NO MARKED OBJECT IN CLUSTER: DO NOT CONTINUE\n", SHIFT*level, BLANKS, level))
 	}
-	else if ((3*last_level < 4*level) && (surface(length, nodesA, nodesB) < CLUSTER_MINIMAL_LENGTH))
+	else if ((3*context->last_level < 4*level) && (surface(context, length, nodesA, nodesB) < context->cluster_minimal_length))
 	{
 trace(("%.*smid refine_down(level=%d) CLUSTER TOO SMALL: DO NOT CONTINUE\n", SHIFT*level, BLANKS, level))
 	}
-    else if (is_degenerated(length, nodesA, nodesB))
+    else if (is_degenerated(context, length, nodesA, nodesB))
 	{
 trace(("%.*smid refine_down(level=%d) DEGENERATED CLUSTER: DO NOT CONTINUE\n", SHIFT*level, BLANKS, level))
     }
-	else if (is_empty_rest_cluster(length, nodesA, nodesB) || last_level == level)
-/*	else if (last_level == level) */
+	else if (is_empty_rest_cluster(context, length, nodesA, nodesB) || context->last_level == level)
+/*	else if (context->last_level == level) */
 	{
-		if ( surface(length, nodesA, nodesB) > CLUSTER_MAXIMAL_LENGTH )
+		if ( surface(context, length, nodesA, nodesB) > context->cluster_maximal_length )
 		{
 trace(("%.*smid refine_down(level=%d) CLUSTER TOO BIG: DO NOT PRINT\n", SHIFT*level, BLANKS, level))
 		}
-		else if (is_trivial(length, nodesA, nodesB))
+		else if (is_trivial(context, length, nodesA, nodesB))
 		{
 trace(("%.*smid refine_down(level=%d) TRIVIAL CLUSTER: DO NOT PRINT\n", SHIFT*level, BLANKS, level))
+		}
+		else if ( 1 < context->workers && level < PARTITION_LEVEL && 0 != context->worker )
+		{
+trace(("%.*smid refine_down(level=%d) CLUSTER ABOVE PARTITION LEVEL: OUTPUT BY WORKER 0 ONLY\n", SHIFT*level, BLANKS, level))
 		}
 		else
 		{
-trace(("%.*smid refine_down(level=%d, last_level=%d) OUTPUT CLUSTER\n", SHIFT*level, BLANKS, level, last_level))
-			print_cluster(length, nodesA, nodesB);
+trace(("%.*smid refine_down(level=%d, last_level=%d) OUTPUT CLUSTER\n", SHIFT*level, BLANKS, level, context->last_level))
+			if ( level < PARTITION_LEVEL )
+				mark_unit(context, 2 * context->unit_number) ;
+			print_cluster(context, length, nodesA, nodesB);
 		} ;
     }
 	else
 	{
-        xrefine_down(length, nodesA, nodesB, diffvalue, level);
+        xrefine_down(context, length, nodesA, nodesB, diffvalue, level);
     };
 
 trace(("%.*sout refine_down(level=%d, diffvalue=%d, %d, %s, %s)\n", SHIFT*level, BLANKS, level, diffvalue, length, li2s(length, nodesA), li2s(length, nodesB)))
@@ -733,7 +905,7 @@ trace(("%.*sout refine_down(level=%d, diffvalue=%d, %d, %s, %s)\n", SHIFT*level,
  * 		n is the number of integers in the list of integers representing the tree.
  */
 
-void analogical_clustering(int verbose, int lengthA, int lengthB, int *thetreeA, int *thetreeB, char *thelinesA, char *thelinesB)
+void analogical_clustering(CONTEXT *context, int lengthA, int lengthB, int *thetreeA, int *thetreeB, char *thelinesA, char *thelinesB)
 {
     int nodesA = 0,
 		nodesB = 0 ;
@@ -742,101 +914,97 @@ void analogical_clustering(int verbose, int lengthA, int lengthB, int *thetreeA,
 
 trace(("in  analogical_clustering(%d, %d, %s, %s)\n", lengthA, lengthB, li2s(lengthA, thetreeA), li2s(lengthB, thetreeB)))
 
-    /* Initialize the global variables VERBOSE and symmetry. */
-    VERBOSE = verbose;
 /*
     if (thetreeA == thetreeB)
-        symmetry = TRUE;
+        context->symmetry = TRUE;
 */
-    /* Initialize the global variables treeA and treeB. */
-	treeA = thetreeA ;
-	treeB = thetreeB ;
+    /* Initialize the feature trees in the context. */
+	context->treeA = thetreeA ;
+	context->treeB = thetreeB ;
 
-	if ( LINEOUT )
+	if ( context->lineout )
 	{
 		/* Creating the table of lines. */
-		/* CAUTION: lines and linetable are global variables */
-		newlinetable(thelinesB);
-		linetableB = linetableA;
-		if (!symmetry)
-			newlinetable(thelinesA);
+		context->linetableB = newlinetable(thelinesB);
+		context->linetableA = context->linetableB;
+		if (!context->symmetry)
+			context->linetableA = newlinetable(thelinesA);
 	} ;
 
-trace(("mid analogical_clustering() symmetry = %s\n", symmetry ? "true" : "false"))
+trace(("mid analogical_clustering() symmetry = %s\n", context->symmetry ? "true" : "false"))
 
     /* n = NODESIZE * number of nodes and we start with 0, thus last node has the number (n/NODESIZE)-1 */
     last_node = (lengthA / NODESIZE) - 1;
-    /* CAUTION: last_level is a global variable */
-    last_level = level(treeA, last_node);
+    context->last_level = level(context->treeA, last_node);
 
 	/* Compute the possible minimal value. */
-    getmatrixparams(lengthA, lengthB, treeA, treeB);
+    getmatrixparams(context, lengthA, lengthB);
 
     /* Create the indexvectors. */
-	indexvector = newmatrix(last_level) ;
-	maxindexvector = newmatrix(last_level) ;
-	for ( i = 0 ; i < last_level + 1 ; ++i )
+	context->indexvector = newmatrix(context->last_level) ;
+	context->maxindexvector = newmatrix(context->last_level) ;
+	for ( i = 0 ; i < context->last_level + 1 ; ++i )
 	{
 		int j = 0 ;
 		
-		indexvector[i] = (int *) calloc(_VALNBR + 1, sizeof(int)) ;
-		maxindexvector[i] = (int *) calloc(_VALNBR + 1, sizeof(int)) ;
-		for ( j = 0 ; j < _VALNBR + 1 ; ++j )
-			maxindexvector[i][j] = 256 ;
+		context->indexvector[i] = (int *) calloc(context->valnbr + 1, sizeof(int)) ;
+		context->maxindexvector[i] = (int *) calloc(context->valnbr + 1, sizeof(int)) ;
+		for ( j = 0 ; j < context->valnbr + 1 ; ++j )
+			context->maxindexvector[i][j] = 256 ;
 	} ;
 	/* Initialize the nextnodeAmatrix and nextnodeBmatrix. */
-	nextnodeAmatrix = (int ***) calloc(last_level + 1, sizeof(int **)) ;
-	nextnodeBmatrix = (int ***) calloc(last_level + 1, sizeof(int **)) ;
-	for ( i = 0 ; i < last_level + 1 ; ++i )
+	context->nextnodeAmatrix = (int ***) calloc(context->last_level + 1, sizeof(int **)) ;
+	context->nextnodeBmatrix = (int ***) calloc(context->last_level + 1, sizeof(int **)) ;
+	for ( i = 0 ; i < context->last_level + 1 ; ++i )
 	{
 		int j = 0 ;
 		
-		nextnodeAmatrix[i] = newmatrix(_VALNBR) ;
-		nextnodeBmatrix[i] = newmatrix(_VALNBR) ;
-		for ( j = 0 ; j < _VALNBR + 1 ; ++j )
+		context->nextnodeAmatrix[i] = newmatrix(context->valnbr) ;
+		context->nextnodeBmatrix[i] = newmatrix(context->valnbr) ;
+		for ( j = 0 ; j < context->valnbr + 1 ; ++j )
 		{
-			nextnodeAmatrix[i][j] = (int *) calloc(maxindexvector[i][j], sizeof (int)); ;
-			nextnodeBmatrix[i][j] = (int *) calloc(maxindexvector[i][j], sizeof (int)); ;
+			context->nextnodeAmatrix[i][j] = (int *) calloc(context->maxindexvector[i][j], sizeof (int)); ;
+			context->nextnodeBmatrix[i][j] = (int *) calloc(context->maxindexvector[i][j], sizeof (int)); ;
 		} ;
 	} ;
 
-trace(("mid analogical_clustering() last_level = %d\n", last_level))
+trace(("mid analogical_clustering() last_level = %d\n", context->last_level))
 
     /* Call the analogical clustering function. */
-    refine_down(1, &nodesA, &nodesB, 0, 0);
+    refine_down(context, 1, &nodesA, &nodesB, 0, 0);
 
-    if (VERBOSE)
+    if (context->verbose)
         fprintf(stderr, "\n");
 	
 	/* Free the indexvectors. */
-	freematrix(indexvector, last_level) ;
-	freematrix(maxindexvector, last_level) ;
+	freematrix(context->indexvector, context->last_level) ;
+	freematrix(context->maxindexvector, context->last_level) ;
 	/* Free the nextnodeAmatrix and nextnodeBmatrix. */
-	for ( i = 0 ; i < last_level + 1 ; ++i )
+	for ( i = 0 ; i < context->last_level + 1 ; ++i )
 	{
-		freematrix(nextnodeAmatrix[i], _VALNBR) ;
-		freematrix(nextnodeBmatrix[i], _VALNBR) ;
+		freematrix(context->nextnodeAmatrix[i], context->valnbr) ;
+		freematrix(context->nextnodeBmatrix[i], context->valnbr) ;
 	} ;
-	free(nextnodeAmatrix) ;
-	free(nextnodeBmatrix) ;
+	free(context->nextnodeAmatrix) ;
+	free(context->nextnodeBmatrix) ;
 
     /* Freeing the lines. */
     /*
-		if ( LINEOUT )
+		if ( context->lineout )
 		{
-            freelinetable(linetableB) ;
-            if ( ! symmetry )
-                    freelinetable(linetableA) ;
+            freelinetable(context->linetableB) ;
+            if ( ! context->symmetry )
+                    freelinetable(context->linetableA) ;
 		} ;
      */
-trace(("out analogical_clustering(%d, %d, %s, %s)\n", lengthA, lengthB, li2s(lengthA, treeA), li2s(lengthB, treeB)))
+trace(("out analogical_clustering(%d, %d, %s, %s)\n", lengthA, lengthB, li2s(lengthA, context->treeA), li2s(lengthB, context->treeB)))
 }
 
 /*
  * Reading the data from the temporary file.
  */
 
-FEATURES *read_features(char *fileA)
+FEATURES *read_features(char *fileA, int lineout)
 {
 	FEATURES *result = (FEATURES *) calloc(1, sizeof(FEATURES)) ;
 	FILE *fA = NULL ;
@@ -856,7 +1024,7 @@ trace(("in  read_features(%s)\n", fileA))
         fscanf(fA, "%d", &(result->thetree[i]));
     } ;
 	
-	if ( LINEOUT )
+	if ( lineout )
 	{
 		result->thelines = (char *) calloc(1000000, sizeof(char));
 		i = 0;
@@ -877,6 +1045,25 @@ trace(("out read_features(%s) = (%d, %s)\n", fileA, result->length, li2s(result-
 	return result ;
 }
 
+/*
+ * Set the parameters common to all interfaces in a context.
+ */
+
+void set_parameters(CONTEXT *context, int minsize, int maxsize, int verbose, int lineout, int focus)
+{
+	init_context(context) ;
+
+	context->focus_word = focus ;
+
+	context->cluster_minimal_length = minsize;
+	context->cluster_maximal_length = maxsize;
+	if ( -1 == context->cluster_maximal_length )
+		context->cluster_maximal_length = INT_MAX ;
+
+	context->verbose = verbose;
+	context->lineout = lineout;
+}
+
 /*
  * Interface with the Python program.
  * 	First, read the data contained in the input temporary file(s).
@@ -888,59 +1075,53 @@ trace(("out read_features(%s) = (%d, %s)\n", fileA, result->length, li2s(result-
 
 extern void nlgclu_in_C(char *fileA, char *fileB, char *clufile, int minsize, int maxsize, int verbose, int lineout, int focus)
 {
+	CONTEXT thecontext ;
+	CONTEXT *context = &thecontext ;
 	FEATURES *featuresA = NULL,
 			 *featuresB = NULL ;
     clock_t t1, t2 ;
 
 trace(("in  nlgclu_in_C(%s, %s, %s, min=%d, max=%d, %s, %s, focus=%d)\n", fileA, fileB, clufile, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", lineout?"LINEOUT":"NOT lineout", focus))
 
-
-	FOCUS_WORD = focus ;
-
-	CLUSTER_MINIMAL_LENGTH = minsize;
-	CLUSTER_MAXIMAL_LENGTH = maxsize;
-	if ( -1 == CLUSTER_MAXIMAL_LENGTH )
-		CLUSTER_MAXIMAL_LENGTH = INT_MAX ;
-
-	VERBOSE = verbose;
-	LINEOUT = lineout;
+	set_parameters(context, minsize, maxsize, verbose, lineout, focus) ;
 	
 	t1 = clock() ;
-	featuresA = read_features(fileA);
+	featuresA = read_features(fileA, context->lineout);
 	if ( 0 == strcmp(fileA,fileB) )
 	{
 		featuresB = featuresA ;
-		symmetry = TRUE ;
+		context->symmetry = TRUE ;
 	}
 	else
-		featuresB = read_features(fileB);
-	cluout = fopen(clufile, "w") ;
+		featuresB = read_features(fileB, context->lineout);
+	context->cluout = fopen(clufile, "w") ;
 
-	if (VERBOSE )
+	if (context->verbose )
     	fprintf(stderr, "## [C new version] Reading time: %.2fs\n",
 			(double) (clock() - t1) / CLOCKS_PER_SEC) ;
 
 trace(("mid nlgclu_in_C(%s, %s, %s, min=%d, max=%d, %s, %s, focus=%d)\n", fileA, fileB, clufile, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", lineout?"LINEOUT":"NOT lineout", focus))
 
 	t2 = clock() ;
-	analogical_clustering(VERBOSE,
+	analogical_clustering(context,
 		featuresA->length, featuresB->length,
 		featuresA->thetree, featuresB->thetree,
 		featuresA->thelines, featuresB->thelines) ;
+	fclose(context->cluout) ;
 
-	if (VERBOSE)
+	if (context->verbose)
 		fprintf(stderr, "## Max number of pairs: %d\n",
-			MAXPAIRNBR) ;
+			context->maxpairnbr) ;
 
-	if (VERBOSE)
+	if (context->verbose)
 		fprintf(stderr, "## _VALNBR: %d\n",
-			_VALNBR) ;
+			context->valnbr) ;
 
-	if (VERBOSE)
+	if (context->verbose)
 		fprintf(stderr, "## Number of early outputs of clusters: %d\n",
-			rest_n) ;
+			context->rest_n) ;
 
-	if (VERBOSE )
+	if (context->verbose )
     	fprintf(stderr, "## [C] Clustering time: %.2fs\n",
 			(double) (clock() - t2) / CLOCKS_PER_SEC) ;
 	fflush(stderr) ;
@@ -948,4 +1129,107 @@ trace(("mid nlgclu_in_C(%s, %s, %s, min=%d, max=%d, %s, %s, focus=%d)\n", fileA,
 trace(("out nlgclu_in_C(%s, %s, %s, min=%d, max=%d, %s, %s, focus=%d)\n", fileA, fileB, clufile, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", lineout?"LINEOUT":"NOT lineout", focus))
 }
 
+/*
+ * Interface with the Python program without temporary files.
+ * 	The feature trees are passed directly as arrays of integers.
+ * 	If the two trees are the same array, the clustering is symmetric.
+ * 	The clusters are returned as an array of integers of length *clulength:
+ * 		for each cluster, its number of ratios followed by the pairs of objects of each ratio.
+ * 	The caller is in charge of freeing the returned array.
+ * 	In parallel mode (1 < workers), only the units of work of the given worker are explored
+ * 	and the clusters of each unit are preceded by its mark (UNIT_MARK, followed by the mark, see mark_unit).
+ * 	This function does not use any global variable: it can be called from several threads at the same time.
+ */
 
+extern int *nlgclu_in_memory(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int worker, int workers, int *clulength)
+{
+	return nlgclu_in_memory_marked(lengthA, thetreeA, lengthB, thetreeB, minsize, maxsize, verbose, focus, 0, NULL, worker, workers, clulength) ;
+}
+
+/*
+ * Same as nlgclu_in_memory in incremental mode.
+ * 	marks is an array of nmarks integers, one for each object in the order of the feature tree:
+ * 	non-zero for the marked (new) objects.
+ * 	In symmetric mode, only the clusters which contain at least one marked object are output,
+ * 	and the lists of pairs of nodes without any marked object are not explored.
+ * 	With marks == NULL, same as nlgclu_in_memory.
+ */
+
+extern int *nlgclu_in_memory_marked(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int nmarks, int *marks, int worker, int workers, int *clulength)
+{
+	CONTEXT thecontext ;
+	CONTEXT *context = &thecontext ;
+	int *result = NULL ;
+	int i = 0 ;
+    clock_t t1 ;
+
+trace(("in  nlgclu_in_memory_marked(%d, %d, min=%d, max=%d, %s, focus=%d, nmarks=%d)\n", lengthA, lengthB, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", focus, nmarks))
+
+	set_parameters(context, minsize, maxsize, verbose, FALSE, focus) ;
+	context->symmetry = ( thetreeA == thetreeB && lengthA == lengthB ) ;
+	context->worker = worker ;
+	context->workers = workers ;
+	if ( marks )
+	{
+		/* Prefix sums of the marks. */
+		context->marked = (int *) calloc(nmarks + 1, sizeof(int)) ;
+		for ( i = 0 ; i < nmarks ; ++i )
+			context->marked[i+1] = context->marked[i] + ( 0 != marks[i] ) ;
+	} ;
+
+	context->cluin = newclusters() ;
+
+	t1 = clock() ;
+	analogical_clustering(context, lengthA, lengthB, thetreeA, thetreeB, NULL, NULL) ;
+
+	if (context->verbose )
+    	fprintf(stderr, "## [C] Clustering time: %.2fs\n",
+			(double) (clock() - t1) / CLOCKS_PER_SEC) ;
+	fflush(stderr) ;
+
+	*clulength = context->cluin->length ;
+	result = context->cluin->data ;
+	free(context->cluin) ;
+	free(context->marked) ;
+
+trace(("out nlgclu_in_memory_marked(%d, %d, min=%d, max=%d, %s, focus=%d, nmarks=%d) = %d integers\n", lengthA, lengthB, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", focus, nmarks, *clulength))
+
+	return result ;
+}
+
+/*
+ * Interface with the Python program in streaming mode.
+ * 	Same as nlgclu_in_memory, but the clusters are passed to the function sink
+ * 	each time there are at least chunksize integers in the buffer of clusters, and at the end.
+ * 	The sink is called as sink(sinkdata, length, clusters) where clusters is the buffer of length integers (same format as nlgclu_in_memory).
+ * 	The buffer is reused after the call.
+ * 	The sink returns 0 to continue, any other value to stop the clustering.
+ * 	Returns TRUE if the clustering was stopped by the sink.
+ */
+
+extern int nlgclu_to_sink(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int chunksize, CLUSTER_SINK sink, void *sinkdata)
+{
+	CONTEXT thecontext ;
+	CONTEXT *context = &thecontext ;
+
+trace(("in  nlgclu_to_sink(%d, %d, min=%d, max=%d, %s, focus=%d, chunksize=%d)\n", lengthA, lengthB, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", focus, chunksize))
+
+	set_parameters(context, minsize, maxsize, verbose, FALSE, focus) ;
+	context->symmetry = ( thetreeA == thetreeB && lengthA == lengthB ) ;
+	context->sink = sink ;
+	context->sinkdata = sinkdata ;
+	context->chunksize = chunksize ;
+
+	context->cluin = newclusters() ;
+
+	analogical_clustering(context, lengthA, lengthB, thetreeA, thetreeB, NULL, NULL) ;
+	if ( ! context->stop && 0 < context->cluin->length )
+		flush_clusters(context) ;
+
+	free(context->cluin->data) ;
+	free(context->cluin) ;
+
+trace(("out nlgclu_to_sink(%d, %d, min=%d, max=%d, %s, focus=%d, chunksize=%d) = %s\n", lengthA, lengthB, minsize, maxsize, verbose?"VERBOSE":"NOT verbose", focus, chunksize, context->stop ? "STOPPED" : "DONE"))
+
+	return context->stop ;
+}
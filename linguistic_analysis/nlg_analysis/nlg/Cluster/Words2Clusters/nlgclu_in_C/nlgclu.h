@@ -1,5 +1,16 @@
 /* File : nlgclu.h */
 /* Copyright (c) 2015, Yves Lepage */
 
+/*
+ * Sink for the clusters in streaming mode (see nlgclu_to_sink in nlgclu.c).
+ */
+
+typedef int (*CLUSTER_SINK)(void *sinkdata, int length, int *clusters) ;
+
 extern void nlgclu_in_C(char *fileA, char *fileB, char *clufile, int minsize, int maxsize, int verbose, int lineout, int focus) ;
 
+extern int *nlgclu_in_memory(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int worker, int workers, int *clulength) ;
+
+extern int *nlgclu_in_memory_marked(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int nmarks, int *marks, int worker, int workers, int *clulength) ;
+
+extern int nlgclu_to_sink(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int chunksize, CLUSTER_SINK sink, void *sinkdata) ;
@@ -4,5 +4,157 @@
 %{
 #include "nlgclu.h"
 extern void nlgclu_in_C(char *fileA, char *fileB, char *clufile, int minsize, int maxsize, int verbose, int lineout, int focus) ;
+extern int *nlgclu_in_memory(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int worker, int workers, int *clulength) ;
+extern int *nlgclu_in_memory_marked(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int nmarks, int *marks, int worker, int workers, int *clulength) ;
+extern int nlgclu_to_sink(int lengthA, int *thetreeA, int lengthB, int *thetreeB, int minsize, int maxsize, int verbose, int focus, int chunksize, CLUSTER_SINK sink, void *sinkdata) ;
+PyObject *nlgclu_in_buffer_marked(PyObject *treeA, PyObject *treeB, int minsize, int maxsize, int verbose, int focus, PyObject *marks, int worker, int workers) ;
+
+/*
+ * Get a contiguous buffer of C integers from a Python object
+ * (e.g., a NumPy array of dtype numpy.intc, i.e., int32, or an array.array('i')).
+ */
+
+static int get_int_buffer(PyObject *obj, Py_buffer *view)
+{
+	const char *format = NULL ;
+
+	if ( -1 == PyObject_GetBuffer(obj, view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) )
+		return -1 ;
+	format = view->format ? view->format : "B" ;
+	if ( '@' == *format || '=' == *format )
+		format += 1 ;
+	if ( sizeof(int) != view->itemsize || ! ( 0 == strcmp(format, "i") || 0 == strcmp(format, "l") ) )
+	{
+		PyErr_Format(PyExc_TypeError, "expected a contiguous buffer of C int, got format '%s'", view->format) ;
+		PyBuffer_Release(view) ;
+		return -1 ;
+	} ;
+	return 0 ;
+}
+
+/*
+ * Sink calling a Python function with the bytes of the buffer of clusters.
+ * The clustering stops if the Python function raises an exception or returns a true value.
+ */
+
+static int python_sink(void *sinkdata, int length, int *clusters)
+{
+	PyGILState_STATE state = PyGILState_Ensure() ;
+	PyObject *chunk = PyBytes_FromStringAndSize((char *) clusters, length * sizeof(int)) ;
+	PyObject *result = chunk ? PyObject_CallFunctionObjArgs((PyObject *) sinkdata, chunk, NULL) : NULL ;
+	int stop = ( NULL == result ) || PyObject_IsTrue(result) ;
+
+	Py_XDECREF(chunk) ;
+	Py_XDECREF(result) ;
+	PyGILState_Release(state) ;
+	return stop ;
+}
 %}
+
 extern void nlgclu_in_C(char *fileA, char *fileB, char *clufile, int minsize, int maxsize, int verbose, int lineout, int focus) ;
+
+/*
+ * Analogical clustering without temporary files.
+ * 	treeA and treeB are the flattened feature trees as buffers of C integers.
+ * 	Passing the same object twice means a symmetric clustering.
+ * 	With 1 < workers, only the units of work of worker are explored (parallel mode, see nlgclu.c).
+ * 	The GIL is released during the clustering, so that several clusterings can run in parallel in threads.
+ * 	Returns the clusters as the bytes of an array of C integers:
+ * 		for each cluster, its number of ratios followed by the pairs of objects of each ratio.
+ */
+
+%inline %{
+PyObject *nlgclu_in_buffer(PyObject *treeA, PyObject *treeB, int minsize, int maxsize, int verbose, int focus, int worker, int workers)
+{
+	return nlgclu_in_buffer_marked(treeA, treeB, minsize, maxsize, verbose, focus, Py_None, worker, workers) ;
+}
+
+/*
+ * Incremental mode.
+ * 	Same as nlgclu_in_buffer, with marks a buffer of C integers, one for each object of the feature tree:
+ * 	only the clusters containing at least one marked object (non-zero) are output (symmetric clustering only).
+ * 	marks = None: no marks, same as nlgclu_in_buffer.
+ */
+
+PyObject *nlgclu_in_buffer_marked(PyObject *treeA, PyObject *treeB, int minsize, int maxsize, int verbose, int focus, PyObject *marks, int worker, int workers)
+{
+	Py_buffer viewA, viewB, viewM ;
+	int *clusters = NULL ;
+	int clulength = 0 ;
+	int nmarks = 0 ;
+	int *themarks = NULL ;
+	PyObject *result = NULL ;
+
+	if ( -1 == get_int_buffer(treeA, &viewA) )
+		return NULL ;
+	if ( -1 == get_int_buffer(treeB, &viewB) )
+	{
+		PyBuffer_Release(&viewA) ;
+		return NULL ;
+	} ;
+	if ( Py_None != marks )
+	{
+		if ( -1 == get_int_buffer(marks, &viewM) )
+		{
+			PyBuffer_Release(&viewA) ;
+			PyBuffer_Release(&viewB) ;
+			return NULL ;
+		} ;
+		nmarks = (int) (viewM.len / sizeof(int)) ;
+		themarks = (int *) viewM.buf ;
+	} ;
+	/* The C program does not use any Python object nor any global variable: other Python threads may run meanwhile. */
+	Py_BEGIN_ALLOW_THREADS
+	clusters = nlgclu_in_memory_marked((int) (viewA.len / sizeof(int)), (int *) viewA.buf,
+								(int) (viewB.len / sizeof(int)), (int *) viewB.buf,
+								minsize, maxsize, verbose, focus, nmarks, themarks, worker, workers, &clulength) ;
+	Py_END_ALLOW_THREADS
+	PyBuffer_Release(&viewA) ;
+	PyBuffer_Release(&viewB) ;
+	if ( Py_None != marks )
+		PyBuffer_Release(&viewM) ;
+	result = PyBytes_FromStringAndSize((char *) clusters, clulength * sizeof(int)) ;
+	free(clusters) ;
+	return result ;
+}
+%}
+
+/*
+ * Analogical clustering in streaming mode.
+ * 	Same as nlgclu_in_buffer, but callback is called with the bytes of the clusters
+ * 	each time at least chunksize integers have been output, and at the end.
+ * 	callback returns a true value to stop the clustering.
+ * 	Returns True if the clustering was stopped.
+ */
+
+%inline %{
+PyObject *nlgclu_iter_buffer(PyObject *treeA, PyObject *treeB, int minsize, int maxsize, int verbose, int focus, int chunksize, PyObject *callback)
+{
+	Py_buffer viewA, viewB ;
+	int stopped = 0 ;
+
+	if ( ! PyCallable_Check(callback) )
+	{
+		PyErr_SetString(PyExc_TypeError, "callback should be callable") ;
+		return NULL ;
+	} ;
+	if ( -1 == get_int_buffer(treeA, &viewA) )
+		return NULL ;
+	if ( -1 == get_int_buffer(treeB, &viewB) )
+	{
+		PyBuffer_Release(&viewA) ;
+		return NULL ;
+	} ;
+	/* The GIL is taken back by the sink to call the Python function. */
+	Py_BEGIN_ALLOW_THREADS
+	stopped = nlgclu_to_sink((int) (viewA.len / sizeof(int)), (int *) viewA.buf,
+								(int) (viewB.len / sizeof(int)), (int *) viewB.buf,
+								minsize, maxsize, verbose, focus, chunksize, python_sink, (void *) callback) ;
+	Py_END_ALLOW_THREADS
+	PyBuffer_Release(&viewA) ;
+	PyBuffer_Release(&viewB) ;
+	if ( PyErr_Occurred() )
+		return NULL ;
+	return PyBool_FromLong(stopped) ;
+}
+%}
@@ -0,0 +1,176 @@
+/* File : fast_distance.c */
+/* Copyright (c) 2026, Yves Lepage */
+/* 18/10/2026: creation: LCS distance, bit-parallel (Hyyro) for words up to 64 symbols, dynamic programming above. */
+
+#define MODULE "fast_distance.c"
+#define TRACE 0
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "fast_distance.h"
+
+#define ytrace(x) { printf x ; fflush(stderr) ; fflush(stdout) ; }
+
+#if TRACE
+#define trace(x) { ytrace(x) ; }
+#else
+#define trace(x)
+#endif
+
+#if defined(__GNUC__) || defined(__clang__)
+#define popcount64(x) __builtin_popcountll(x)
+#else
+static int popcount64(uint64_t x)
+{
+	int n = 0 ;
+	for ( ; x ; x &= x - 1 )
+		n++ ;
+	return n ;
+}
+#endif
+
+/*
+ * Longest common subsequence by dynamic programming.
+ * Only one row of the table is kept.
+ */
+
+int lcs_dp(const int *a, int la, const int *b, int lb)
+{
+	int i = 0, j = 0 ;
+	int diagonal = 0, above = 0, result = 0 ;
+	int *row = (int *) calloc(lb + 1, sizeof(int)) ;
+
+	for ( i = 0 ; i < la ; i++ )
+	{
+		diagonal = 0 ;
+		for ( j = 0 ; j < lb ; j++ )
+		{
+			above = row[j+1] ;
+			if ( a[i] == b[j] )
+				row[j+1] = diagonal + 1 ;
+			else if ( row[j] > above )
+				row[j+1] = row[j] ;
+			diagonal = above ;
+		} ;
+	} ;
+	result = row[lb] ;
+	free(row) ;
+	return result ;
+}
+
+/*
+ * Precompute the masks of the positions of each symbol of a.
+ */
+
+void init_memo(MEMO *memo, const int *a, int la)
+{
+	int i = 0, k = 0 ;
+
+trace(("in  init_memo(%d)\n", la))
+
+	memo->length = la ;
+	memo->symbols = NULL ;
+	memo->nbig = 0 ;
+	if ( MEMO_MAXBITS < la )
+	{
+		/* Too long for the bit-parallel computation: keep the symbols for dynamic programming. */
+		memo->symbols = (int *) malloc((la + 1) * sizeof(int)) ;
+		memcpy(memo->symbols, a, la * sizeof(int)) ;
+		return ;
+	} ;
+	memset(memo->small, 0, sizeof(memo->small)) ;
+	for ( i = 0 ; i < la ; i++ )
+	{
+		if ( 0 <= a[i] && a[i] < MEMO_SMALL )
+			memo->small[a[i]] |= (uint64_t) 1 << i ;
+		else
+		{
+			for ( k = 0 ; k < memo->nbig && memo->big[k] != a[i] ; k++ )
+				;
+			if ( k == memo->nbig )
+			{
+				memo->big[k] = a[i] ;
+				memo->bigmask[k] = 0 ;
+				memo->nbig++ ;
+			} ;
+			memo->bigmask[k] |= (uint64_t) 1 << i ;
+		} ;
+	} ;
+
+trace(("out init_memo(%d)\n", la))
+}
+
+void free_memo(MEMO *memo)
+{
+	free(memo->symbols) ;
+	memo->symbols = NULL ;
+}
+
+static uint64_t mask_of(const MEMO *memo, int c)
+{
+	int k = 0 ;
+
+	if ( 0 <= c && c < MEMO_SMALL )
+		return memo->small[c] ;
+	for ( k = 0 ; k < memo->nbig ; k++ )
+		if ( memo->big[k] == c )
+			return memo->bigmask[k] ;
+	return 0 ;
+}
+
+/*
+ * Length of the longest common subsequence of the memoized word and b.
+ * Bit-parallel computation (H. Hyyro, 2004), one machine word for the memoized word:
+ *	V = (V + (V & M[c])) | (V & ~M[c]) for each symbol c of b,
+ *	the lcs is the number of 0s in V.
+ */
+
+int memo_lcs(const MEMO *memo, const int *b, int lb)
+{
+	uint64_t V = ~ (uint64_t) 0, U = 0, M = 0 ;
+	int j = 0 ;
+
+	if ( MEMO_MAXBITS < memo->length )
+		return lcs_dp(memo->symbols, memo->length, b, lb) ;
+	for ( j = 0 ; j < lb ; j++ )
+	{
+		M = mask_of(memo, b[j]) ;
+		U = V & M ;
+		V = (V + U) | (V - U) ;
+	} ;
+	if ( MEMO_MAXBITS == memo->length )
+		return popcount64(~V) ;
+	return popcount64(~V & (((uint64_t) 1 << memo->length) - 1)) ;
+}
+
+int memo_distance(const MEMO *memo, const int *b, int lb)
+{
+	return memo->length + lb - 2 * memo_lcs(memo, b, lb) ;
+}
+
+/*
+ * Length of the longest common subsequence of a and b.
+ * The shorter word is used as the pattern for the bit-parallel computation.
+ */
+
+int fast_lcs(const int *a, int la, const int *b, int lb)
+{
+	MEMO memo ;
+	int result = 0 ;
+
+	if ( lb < la )
+		return fast_lcs(b, lb, a, la) ;
+	if ( MEMO_MAXBITS < la )
+		return lcs_dp(a, la, b, lb) ;
+	init_memo(&memo, a, la) ;
+	result = memo_lcs(&memo, b, lb) ;
+	free_memo(&memo) ;
+	return result ;
+}
+
+int fast_distance_symbols(const int *a, int la, const int *b, int lb)
+{
+	return la + lb - 2 * fast_lcs(a, la, b, lb) ;
+}
@@ -0,0 +1,37 @@
+/* File : fast_distance.h */
+/* Copyright (c) 2026, Yves Lepage */
+
+/*
+ * LCS distance between words:
+ * number of insertions and deletions to transform one word into the other,
+ * i.e., |A| + |B| - 2 * lcs(A, B).
+ * Words are arrays of symbols (Unicode code points).
+ */
+
+#include <stdint.h>
+
+#define MEMO_MAXBITS 64		/* Maximal length of a word for the bit-parallel computation. */
+#define MEMO_SMALL 256		/* Symbols below this value have a direct entry in the table of masks. */
+
+/*
+ * Precomputed data for a fixed word A,
+ * so that the distances between A and many words B can be computed faster.
+ */
+
+typedef struct {
+	int length ;					/* Length of A. */
+	int *symbols ;					/* Symbols of A, only when A is too long for the bit-parallel computation. */
+	uint64_t small[MEMO_SMALL] ;	/* Masks of the positions of the symbols below MEMO_SMALL in A. */
+	int nbig ;						/* Number of distinct symbols above MEMO_SMALL in A. */
+	int big[MEMO_MAXBITS] ;			/* These symbols. */
+	uint64_t bigmask[MEMO_MAXBITS] ;	/* Their masks. */
+} MEMO ;
+
+extern void init_memo(MEMO *memo, const int *a, int la) ;
+extern void free_memo(MEMO *memo) ;
+extern int memo_lcs(const MEMO *memo, const int *b, int lb) ;
+extern int memo_distance(const MEMO *memo, const int *b, int lb) ;
+
+extern int lcs_dp(const int *a, int la, const int *b, int lb) ;
+extern int fast_lcs(const int *a, int la, const int *b, int lb) ;
+extern int fast_distance_symbols(const int *a, int la, const int *b, int lb) ;
@@ -0,0 +1,165 @@
+/* File: fast_distance.i */
+%module fast_distance
+
+%{
+#include "fast_distance.h"
+
+/*
+ * Symbols (Unicode code points) of a Python string, or of bytes in UTF-8.
+ */
+
+#define SYMBOLS_BUFFER 128
+
+typedef struct {
+	int *symbols ;
+	int length ;
+	int buffer[SYMBOLS_BUFFER] ;
+} SYMBOLS ;
+
+static int get_symbols(PyObject *obj, SYMBOLS *s)
+{
+	PyObject *str = NULL ;
+	Py_ssize_t k = 0 ;
+	int kind = 0 ;
+	const void *data = NULL ;
+
+	if ( PyBytes_Check(obj) )
+	{
+		str = PyUnicode_DecodeUTF8(PyBytes_AS_STRING(obj), PyBytes_GET_SIZE(obj), "strict") ;
+		if ( NULL == str )
+			return -1 ;
+	}
+	else if ( PyUnicode_Check(obj) )
+	{
+		str = obj ;
+		Py_INCREF(str) ;
+	}
+	else
+	{
+		PyErr_SetString(PyExc_TypeError, "expected a string or bytes in UTF-8") ;
+		return -1 ;
+	} ;
+	s->length = (int) PyUnicode_GET_LENGTH(str) ;
+	s->symbols = ( s->length <= SYMBOLS_BUFFER ) ? s->buffer : (int *) malloc(s->length * sizeof(int)) ;
+	if ( NULL == s->symbols )
+	{
+		Py_DECREF(str) ;
+		PyErr_NoMemory() ;
+		return -1 ;
+	} ;
+	kind = PyUnicode_KIND(str) ;
+	data = PyUnicode_DATA(str) ;
+	for ( k = 0 ; k < s->length ; k++ )
+		s->symbols[k] = (int) PyUnicode_READ(kind, data, k) ;
+	Py_DECREF(str) ;
+	return 0 ;
+}
+
+static void release_symbols(SYMBOLS *s)
+{
+	if ( s->symbols != s->buffer )
+		free(s->symbols) ;
+}
+
+/* The memoized word for memo_fast_distance and memo_fast_similitude. */
+static MEMO memo ;
+static int memo_initialized = 0 ;
+
+static PyObject *memo_lcs_of(PyObject *B, int distance)
+{
+	SYMBOLS b ;
+	int lcs = 0 ;
+
+	if ( ! memo_initialized )
+	{
+		PyErr_SetString(PyExc_RuntimeError, "init_memo_fast_distance should be called first") ;
+		return NULL ;
+	} ;
+	if ( -1 == get_symbols(B, &b) )
+		return NULL ;
+	lcs = memo_lcs(&memo, b.symbols, b.length) ;
+	release_symbols(&b) ;
+	return PyLong_FromLong(distance ? memo.length + b.length - 2 * lcs : lcs) ;
+}
+%}
+
+/*
+ * fast_distance(A, B): LCS distance between A and B.
+ * A and B are strings (or bytes in UTF-8): the symbols are Unicode characters, not bytes.
+ */
+
+%inline %{
+PyObject *fast_distance(PyObject *A, PyObject *B)
+{
+	SYMBOLS a, b ;
+	int d = 0 ;
+
+	if ( -1 == get_symbols(A, &a) )
+		return NULL ;
+	if ( -1 == get_symbols(B, &b) )
+	{
+		release_symbols(&a) ;
+		return NULL ;
+	} ;
+	d = fast_distance_symbols(a.symbols, a.length, b.symbols, b.length) ;
+	release_symbols(&a) ;
+	release_symbols(&b) ;
+	return PyLong_FromLong(d) ;
+}
+%}
+
+/*
+ * dp_distance(A, B): same as fast_distance(A, B), always by dynamic programming (for benchmarks).
+ */
+
+%inline %{
+PyObject *dp_distance(PyObject *A, PyObject *B)
+{
+	SYMBOLS a, b ;
+	int d = 0 ;
+
+	if ( -1 == get_symbols(A, &a) )
+		return NULL ;
+	if ( -1 == get_symbols(B, &b) )
+	{
+		release_symbols(&a) ;
+		return NULL ;
+	} ;
+	d = a.length + b.length - 2 * lcs_dp(a.symbols, a.length, b.symbols, b.length) ;
+	release_symbols(&a) ;
+	release_symbols(&b) ;
+	return PyLong_FromLong(d) ;
+}
+%}
+
+/*
+ * init_memo_fast_distance(A): memoize A for the next calls to memo_fast_distance and memo_fast_similitude.
+ * memo_fast_distance(B): LCS distance between the memoized word and B.
+ * memo_fast_similitude(B): length of the LCS of the memoized word and B.
+ */
+
+%inline %{
+PyObject *init_memo_fast_distance(PyObject *A)
+{
+	SYMBOLS a ;
+
+	if ( -1 == get_symbols(A, &a) )
+		return NULL ;
+	if ( memo_initialized )
+		free_memo(&memo) ;
+	init_memo(&memo, a.symbols, a.length) ;
+	memo_initialized = 1 ;
+	release_symbols(&a) ;
+	Py_RETURN_NONE ;
+}
+
+PyObject *memo_fast_distance(PyObject *B)
+{
+	return memo_lcs_of(B, 1) ;
+}
+
+PyObject *memo_fast_similitude(PyObject *B)
+{
+	return memo_lcs_of(B, 0) ;
+}
+%}
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import random
+
+from _fast_distance import fast_distance, dp_distance, init_memo_fast_distance, memo_fast_distance, memo_fast_similitude
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'	# Creation
+__description__ = 'Unitary tests and benchmark for library _fast_distance: ' \
+					'bit-parallel LCS distance against dynamic programming.'
+
+__verbose__ = False
+
+###############################################################################
+
+def read_argv():
+
+	from optparse import OptionParser
+	this_version = 'v%s (c) %s %s' % (__version__, __date__.split('/')[2], __author__)
+	this_description = __description__
+	this_usage = '''%prog
+	Run %prog -T for unitary tests.
+	Run %prog -r 100000 for a benchmark with 100,000 pairs of random strings for each length.
+	'''
+
+	parser = OptionParser(version=this_version, description=this_description, usage=this_usage)
+	parser.add_option('-L', '--max-len',
+                  action='store', dest='strlen', type=int, default=128,
+                  help='maximum length of strings (default: %default)')
+	parser.add_option('-V', '--vocabulary-size',
+                  action='store', dest='vocsize', type=int, default=26,
+                  help='size of the vocabulary for random generation of strings (default: %default)')
+	parser.add_option('-r', '--repeat-number',
+                  action='store', dest='repeat', type=int, default=10000,
+                  help='number of pairs of random strings for each length (default: %default)')
+	parser.add_option('-u', '--unicode',
+                  action='store_true', dest='unicode', default=False,
+                  help='use non-ASCII characters in random strings')
+	parser.add_option('-v', '--verbose',
+                  action='store_true', dest='verbose', default=False,
+                  help='runs in verbose mode')
+	parser.add_option('-T', '--test',
+                  action='store_true', dest='test', default=False,
+                  help='run all unitary tests')
+
+	(options, args) = parser.parse_args()
+	return options, args
+
+###############################################################################
+
+def python_dp_distance(A, B):
+	"""
+	LCS distance by dynamic programming in pure Python (reference).
+
+	>>> python_dp_distance('dreux', 'radeaux')
+	4
+	>>> fast_distance('dreux', 'radeaux'), dp_distance('dreux', 'radeaux')
+	(4, 4)
+	>>> fast_distance('', 'abc'), fast_distance('abc', ''), fast_distance('', '')
+	(3, 3, 0)
+	>>> fast_distance('日本語', '日本'), fast_distance('日本語'.encode('utf-8'), '日本'.encode('utf-8'))
+	(1, 1)
+	>>> fast_distance('a' * 64, 'a' * 65), fast_distance('ab' * 40, 'ba' * 40)
+	(1, 2)
+	>>> init_memo_fast_distance('radeaux')
+	>>> memo_fast_distance('dreux'), memo_fast_similitude('dreux')
+	(4, 4)
+	"""
+	row = [ 0 ] * (len(B) + 1)
+	for a in A:
+		diagonal = 0
+		for j, b in enumerate(B):
+			above = row[j+1]
+			if a == b:
+				row[j+1] = diagonal + 1
+			elif row[j] > above:
+				row[j+1] = row[j]
+			diagonal = above
+	return len(A) + len(B) - 2 * row[len(B)]
+
+def random_word(alphabet, length):
+	return ''.join( random.choice(alphabet) for _ in range(length) )
+
+def _test():
+	import doctest
+	doctest.testmod()
+	sys.exit(0)
+
+def timing(function, pairs):
+	t1 = time.time()
+	result = [ function(A, B) for A, B in pairs ]
+	return result, time.time() - t1
+
+def memo_timing(pairs):
+	t1 = time.time()
+	result = list()
+	for A, B in pairs:
+		init_memo_fast_distance(A)
+		result.append(memo_fast_distance(B))
+	return result, time.time() - t1
+
+def main(repeat=10000, vocsize=26, strlen=128, unicode=False):
+	"""
+	For lengths from 1 to strlen,
+	compare the times of the bit-parallel computation (fast_distance)
+	with the dynamic programming in C (dp_distance) and in Python,
+	and check that the results are the same.
+	"""
+	first = 0x3041 if unicode else ord('a')		# Hiragana or ASCII.
+	alphabet = [ chr(first + i) for i in range(vocsize) ]
+	print('# length\tpairs\tfast (s)\tmemo (s)\tC dp (s)\tPython dp (s)\tspeed-up vs C dp')
+	length = 1
+	while length <= strlen:
+		pairs = [ (random_word(alphabet, length), random_word(alphabet, length)) for _ in range(repeat) ]
+		fast, t_fast = timing(fast_distance, pairs)
+		memo, t_memo = memo_timing(pairs)
+		dp, t_dp = timing(dp_distance, pairs)
+		python_pairs = pairs[:max(1, repeat // 100)]
+		python, t_python = timing(python_dp_distance, python_pairs)
+		assert fast == dp == memo, 'Different results for length %d.' % length
+		assert python == fast[:len(python_pairs)], 'Different results from Python for length %d.' % length
+		print('%d\t%d\t%.4f\t%.4f\t%.4f\t%.4f\t%.2f' % \
+			(length, repeat, t_fast, t_memo, t_dp, t_python * len(pairs) / len(python_pairs), t_dp / t_fast if t_fast else 0))
+		length *= 2
+
+###############################################################################
+
+if __name__ == '__main__':
+	options, args = read_argv()
+	__verbose__ = options.verbose
+	if options.test: _test()
+	main(repeat=options.repeat, vocsize=options.vocsize, strlen=options.strlen, unicode=options.unicode)
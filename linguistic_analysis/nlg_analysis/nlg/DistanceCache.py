@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import collections
+import numpy as np
+
+from _fast_distance import fast_distance, init_memo_fast_distance, memo_fast_distance
+from _distance_matrix import distance_matrix_in_buffer, distance_rows_in_buffer
+
+###############################################################################
+
+__author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
+__date__, __version__ = '18/10/2026', '1.0'			# Creation.
+__date__, __version__ = '18/10/2026', '1.1'			# Add distance_matrix: all distances between a list of words in one call to a C program.
+__date__, __version__ = '18/10/2026', '1.2'			# Add set_distance_matrix: look up a precomputed distance matrix (see distances.py) first.
+__date__, __version__ = '18/10/2026', '1.3'			# Add distances_to_sample: distances between a sample of words and all words in one call to a C program.
+__date__, __version__ = '18/10/2026', '1.4'			# The keys are the pairs of words themselves: no more table of word identifiers growing without bound.
+__description__ = """Bounded cache of LCS distances between words,
+shared by all the modules which verify the distance constraint
+(StrCluster, Cluster, Analogy).
+The same words appear in many clusters:
+their distances are computed only once, as long as they stay in the cache.
+"""
+
+__verbose__ = False
+
+__cache_size__ = 1 << 20		# Maximal number of distances kept in the cache. None for no limit.
+
+###############################################################################
+
+class DistanceCache:
+	"""
+	Cache of LCS distances between words with a least recently used (LRU) policy.
+	The keys are the pairs of words themselves, so that nothing is kept for the words of evicted distances.
+	The LCS distance is symmetric, so that d(A, B) and d(B, A) share the same entry.
+
+	>>> cache = DistanceCache(maxsize=2)
+	>>> cache.distance('abc', 'abd'), cache.distance('abd', 'abc')
+	(2, 2)
+	>>> cache.distances_from('abc', ['abc', 'ab', 'abd'])	# d('abc', 'abd') was evicted by the two others.
+	[0, 1, 2]
+	>>> len(cache), cache.hits, cache.misses
+	(2, 1, 4)
+	>>> list(cache.cache)
+	[('ab', 'abc'), ('abc', 'abd')]
+	"""
+
+	def __init__(self, maxsize=__cache_size__):
+		self.maxsize = maxsize
+		self.cache = collections.OrderedDict()		# Distances, least recently used first.
+		self.matrix = None							# Precomputed distances (distances.DistanceMatrix), looked up first.
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return len(self.cache)
+
+	def key(self, A, B):
+		return (A, B) if A <= B else (B, A)
+
+	def lookup(self, key):
+		# Returns None if the distance is not in the cache.
+		d = self.cache.get(key)
+		if d is None:
+			self.misses += 1
+		else:
+			self.hits += 1
+			self.cache.move_to_end(key)
+		return d
+
+	def store(self, key, d):
+		self.cache[key] = d
+		if self.maxsize is not None and self.maxsize < len(self.cache):
+			self.cache.popitem(last=False)
+		return d
+
+	def distance(self, A, B):
+		if self.matrix is not None:
+			d = self.matrix.distance(A, B)
+			if d is not None:
+				self.hits += 1
+				return d
+		key = self.key(A, B)
+		d = self.lookup(key)
+		if d is None:
+			d = self.store(key, fast_distance(A, B))
+		return d
+
+	def distances_from(self, A, Bs):
+		"""
+		List of the distances between A and each B in Bs.
+		The distances not in the cache are computed with the memoized version of fast_distance
+		which reuses the computation for A.
+		"""
+		result = list()
+		memo = False
+		for B in Bs:
+			if self.matrix is not None:
+				d = self.matrix.distance(A, B)
+				if d is not None:
+					self.hits += 1
+					result.append(d)
+					continue
+			key = self.key(A, B)
+			d = self.lookup(key)
+			if d is None:
+				if not memo:
+					init_memo_fast_distance(A)
+					memo = True
+				d = self.store(key, memo_fast_distance(B))
+			result.append(d)
+		return result
+
+	def clear(self):
+		self.cache.clear()
+		self.hits = self.misses = 0
+
+	def statistics(self):
+		total = self.hits + self.misses
+		return '# Distance cache: %d distances (max: %s), %d hits, %d misses (hit rate: %.1f%%)' % \
+			(len(self.cache), self.maxsize, self.hits, self.misses, 100.0 * self.hits / total if total else 0.0)
+
+###############################################################################
+
+# The cache shared by all the modules in the same process.
+cache = DistanceCache()
+
+def distance(A, B):
+	return cache.distance(A, B)
+
+def distances_from(A, Bs):
+	return cache.distances_from(A, Bs)
+
+def set_cache_size(maxsize):
+	"""
+	Change the maximal number of distances in the shared cache. None for no limit.
+	"""
+	cache.maxsize = maxsize
+	while maxsize is not None and maxsize < len(cache.cache):
+		cache.cache.popitem(last=False)
+
+def set_distance_matrix(matrix):
+	"""
+	Look up the distances in a precomputed distance matrix before the shared cache.
+	matrix is a distances.DistanceMatrix or the path of its file; None to stop using it.
+	The distances missing from the matrix (unknown words, above its cutoff) are computed as usual.
+	"""
+	if isinstance(matrix, str):
+		from nlg.distances import DistanceMatrix
+		matrix = DistanceMatrix.load(matrix)
+	cache.matrix = matrix
+
+def statistics():
+	return cache.statistics()
+
+###############################################################################
+
+def distance_matrix(words):
+	"""
+	Matrix of the LCS distances between all pairs of words, as a NumPy array,
+	computed in one call to the C program (distance_matrix_in_C).
+	The distances do not go through the cache:
+	large clusters would evict all other distances.
+
+	>>> distance_matrix(['abc', 'abd', 'ab'])
+	array([[0, 2, 1],
+	       [2, 0, 1],
+	       [1, 1, 0]], dtype=int32)
+	"""
+	n = len(words)
+	return np.frombuffer(distance_matrix_in_buffer(words), dtype=np.intc).reshape(n, n)
+
+def distances_to_sample(words, sample):
+	"""
+	Matrix of the LCS distances between the words of indices in sample (rows) and all the words (columns),
+	as a NumPy array, computed in one call to the C program (distance_matrix_in_C).
+	The sample words are put first so that only the first rows of the upper triangle are computed.
+
+	>>> distances_to_sample(['abc', 'abd', 'ab', 'b'], [2, 0])
+	array([[1, 1, 0, 1],
+	       [0, 2, 1, 2]], dtype=int32)
+	"""
+	n, k = len(words), len(sample)
+	if k == n and list(sample) == list(range(n)):
+		return distance_matrix(words)
+	in_sample = set(sample)
+	order = list(sample) + [ j for j in range(n) if j not in in_sample ]
+	rows = np.frombuffer(distance_rows_in_buffer([ words[j] for j in order ], 0, k), dtype=np.intc)
+	result = np.zeros((k, n), dtype=np.intc)
+	offset = 0
+	for i in range(k):
+		result[i, i+1:] = rows[offset:offset + n - i - 1]
+		offset += n - i - 1
+	result[:, :k] += result[:, :k].T
+	# Put the columns back in the order of the words.
+	result[:, order] = result.copy()
+	return result
+
+###############################################################################
+
+if __name__ == '__main__':
+	import doctest
+	doctest.testmod()
@@ -5,15 +5,17 @@ import os
 import sys
 import time
 import argparse
+import multiprocessing
+import numpy as np
 
-from collections import namedtuple, defaultdict
+from itertools import islice
+from collections import namedtuple, defaultdict, ChainMap, Counter
 from tabulate import tabulate, simple_separated_format
-from copy import deepcopy
 
 import nlg.NlgSymbols as NlgSymbols
 
 from nlg.Cluster.Cluster import Cluster
-from _nlg import solvenlg
+from _nlg import solvenlg, solvenlg_batch
 
 ###############################################################################
 
@@ -22,29 +24,90 @@ __author__ = 'Fam Rashel <fam.rashel@fuji.waseda.jp>'
 __date__, __version__ = '01/05/2016', '0.10' # Creation
 __date__, __version__ = '15/06/2017', '1.00' # Class: NlgGrid
 __date__, __version__ = '21/05/2020', '1.01' # Update read_argv() and main() to fit the newest version of Python
+__date__, __version__ = '18/10/2026', '1.02' # Running count of filled cells; saturation check by a trial insertion
+												# without copying the grid (see _InsertionTrial).
+__date__, __version__ = '18/10/2026', '1.03' # Grid stored as a matrix of word identifiers (NumPy, int32, -1 for holes)
+												# with capacities doubled in both dimensions; no more a list of lists.
+__date__, __version__ = '18/10/2026', '1.04' # fill_all_holes: all the equations of the holes solved by batches (solvenlg_batch),
+												# possibly by a pool of processes; predictable_words uses it.
 
 __description__ = 'Class for analogical grids'
 
 __verbose__ = False		# Gives information about timing, etc. to the user.
 __trace__ = False		# To be used by the developper for debugging.
 
+__initial_capacity__ = 8	# Initial number of rows and of columns of the matrix of a grid.
+__workers__ = 1				# Number of processes to solve the equations of the holes.
+__chunk_size__ = 1 << 14	# Number of equations solved at once by a process.
+__mask_size__ = 1 << 22		# Maximal number of cells of the masks computed at once for the equations of holes.
+
+Attributes = namedtuple('Attributes', ['length', 'width', 'size', 'filled', 'saturation'])
+
 ###############################################################################
 
 
-class Grid(list):
+class Grid:
 	"""
 	Class for analogical grid for string.
 	It is basically list of list of strings where:
 		for any i, j, m, n in G's dimension
 			G[i][m] : G[i][n] :: G[j][m] : G[j][n]
+	The words are stored in a table and the grid is a matrix of their identifiers (-1 for holes).
+	The matrix is allocated with more rows and columns than needed, doubled when full.
+	Rows are read as lists of strings (None for holes), the cells are written with place.
+	The words placed at a new position are logged in placed (all words at creation), to be cleared by the user of the log.
+
+	>>> grid = Grid([['a', 'b', None], ['c', 'd', 'e']])
+	>>> len(grid), grid.width(), grid[1], grid.cell(0, 2), grid.term_index['e']
+	(2, 3, ['c', 'd', 'e'], None, (1, 2))
+	>>> grid.expand(row=False); grid.place(2, 0, 'f'); list(grid)
+	[['a', 'b', None], ['c', 'd', 'e'], ['f', None, None]]
 	"""
 
 	def __init__(self, list_of_rows=[]):
 		"""
-		Create an empty Grid.
+		Create a Grid from a list of rows (empty by default).
 		"""
-		list.__init__(self, list_of_rows)
+		rows = [ list(row) for row in list_of_rows ]
+		self.words, self.ids = [], dict()
+		self.length, self.columns = len(rows), len(rows[0]) if len(rows) != 0 else 0
+		self.matrix = np.full((max(__initial_capacity__, self.length), max(__initial_capacity__, self.columns)), -1, dtype=np.int32)
+		for i, row in enumerate(rows):
+			self.matrix[i, :len(row)] = [ -1 if word is None else self.word_id(word) for word in row ]
 		self._update_term_index()
+		self.filled = int(np.count_nonzero(self.matrix >= 0))
+		self.placed = list(self.term_index)
+
+	def word_id(self, word):
+		i = self.ids.get(word)
+		if i is None:
+			i = self.ids[word] = len(self.words)
+			self.words.append(word)
+		return i
+
+	def __len__(self):
+		return self.length
+
+	def width(self):
+		return self.columns
+
+	def cell(self, i, j):
+		k = self.matrix[i, j]
+		return None if k < 0 else self.words[k]
+
+	def __getitem__(self, i):
+		"""
+		Row i of the grid, as a list of strings (None for holes).
+		The list is a copy: cells are written with place.
+		"""
+		if i < 0: i += self.length
+		if not 0 <= i < self.length: raise IndexError('grid index out of range')
+		words = self.words
+		return [ None if k < 0 else words[k] for k in self.matrix[i, :self.columns].tolist() ]
+
+	def __iter__(self):
+		for i in range(self.length):
+			yield self[i]
 
 	@classmethod
 	def fromFile(cls, line):
@@ -62,39 +125,47 @@ class Grid(list):
 		Cast a cluster into an empty Grid
 		"""
 		A, B = cluster.AB_list()
-		self.extend([list (A), list (B)])
-		self._update_term_index()
+		self.__init__([list (A), list (B)])
 
 	def _update_term_index(self):
 		term_index = dict()
-		for i in range(len(self)):
-			for j in range(len(self[i])):
-				term_index[self[i][j]] = (i, j)
+		words = self.words
+		for i, j in np.argwhere(self.matrix[:self.length, :self.columns] >= 0).tolist():
+			term_index[words[self.matrix[i, j]]] = (i, j)
 		self.term_index = term_index
 
-	def checkninsert(self, cluster, saturation_threshold):
+	def checkninsert(self, cluster, saturation_threshold=0):
 		"""
 		Check and then insert cluster if it can be inserted into the grid.
 		
 		>>> grid = Grid()
-		>>> cluster = Cluster('minum : diminum :: makan : dimakan :: beli : dibeli')
+		>>> cluster = Cluster.fromFile('minum : diminum :: makan : dimakan :: beli : dibeli')
 		>>> grid.checkninsert(cluster)
 		(True, 'column')
-		>>> cluster = Cluster('minum : makan :: minuman : makanan :: meminum : memakan :: diminum : dimakan')
+		>>> cluster = Cluster.fromFile('minum : makan :: minuman : makanan :: meminum : memakan :: diminum : dimakan')
 		>>> grid.checkninsert(cluster)
 		(True, 'row')
-		>>> cluster = Cluster('main : mainan :: minum : minuman :: makan : makanan')
+		>>> cluster = Cluster.fromFile('main : mainan :: minum : minuman :: makan : makanan')
 		>>> grid.checkninsert(cluster)
 		(True, 'column')
-		>>> cluster = Cluster('minum : minumlah :: makan : makanlah :: beli : belilah')
+		>>> cluster = Cluster.fromFile('minum : minumlah :: makan : makanlah :: beli : belilah')
 		>>> grid.checkninsert(cluster)
 		(True, 'column')
-		>>> cluster = Cluster('mainan : main :: makanan : makan :: pukulan : pukul')
+		>>> cluster = Cluster.fromFile('mainan : main :: makanan : makan :: pukulan : pukul')
 		>>> grid.checkninsert(cluster)
 		(True, 'column')
-		>>> cluster = Cluster('masak : makan :: dimasak : dimakan :: memasak : memakan :: masakan : makanan')
+		>>> cluster = Cluster.fromFile('masak : makan :: dimasak : dimakan :: memasak : memakan :: masakan : makanan')
 		>>> grid.checkninsert(cluster)
 		(True, 'row')
+		>>> grid.filled, len(grid), grid.width()
+		(21, 5, 6)
+		>>> cluster = Cluster.fromFile('pukul : dipukul :: masak : dimasak :: tulis : ditulis')
+		>>> grid.checkninsert(cluster, 0.7)
+		(False, None)
+		>>> grid.checkninsert(cluster, 0.6)
+		(True, 'column')
+		>>> grid.set_attributes(); grid.attributes
+		Attributes(length=5, width=7, size=35, filled=24, saturation=0.6857142857142857)
 		"""
 		if len(self) == 0:
 			self._new(cluster)
@@ -111,10 +182,10 @@ class Grid(list):
 					if __trace__: print('### Inserted - column',details, file=sys.stderr)
 					return (True, 'column')
 			else:
-				newGrid = deepcopy(self)
-				newGrid.insert(cluster, details[0], details[1], details[2], details[3], details[4])
-				newGrid.set_attributes()
-				if newGrid.attributes[4] >= saturation_threshold:
+				# The insertion is tried on an overlay of the grid: its cost depends on the size of the cluster only.
+				trial = _InsertionTrial(self)
+				trial.insert(cluster, details[0], details[1], details[2], details[3], details[4])
+				if trial.saturation() >= saturation_threshold:
 					self.insert(cluster, details[0], details[1], details[2], details[3], details[4])
 					if details[0]:
 						if __trace__: print('### Inserted - row', details, file=sys.stderr)
@@ -123,7 +194,7 @@ class Grid(list):
 						if __trace__: print('### Inserted - column',details, file=sys.stderr)
 						return (True, 'column')
 				else:
-					if __trace__: print('### Insertable but rejected - saturation %.3f < %.3f' % (newGrid.attributes[4], saturation_threshold), file=sys.stderr)
+					if __trace__: print('### Insertable but rejected - saturation %.3f < %.3f' % (trial.saturation(), saturation_threshold), file=sys.stderr)
 					return (False, None)
 		else:
 			if __trace__: print('### Rejected', file=sys.stderr)
@@ -201,8 +272,8 @@ class Grid(list):
 			iBs = 0
 		else:
 			if row:
-				if not A_exist: iAs = len(self[0])
-				elif not B_exist: iBs = len(self[0])
+				if not A_exist: iAs = self.width()
+				elif not B_exist: iBs = self.width()
 			else:
 				if not A_exist: iAs = len(self)
 				elif not B_exist: iBs = len(self)
@@ -228,8 +299,7 @@ class Grid(list):
 						if self.term_index.get(A)[1] != iAs:
 							continue
 						else:
-							self.term_index[B] = (self.term_index.get(A)[0], iBs)
-							self[self.term_index.get(A)[0]][iBs] = B
+							self.place(self.term_index.get(A)[0], iBs, B)
 			else:
 				for A, B in cluster:
 					if self.term_index.get(B) is None:
@@ -238,29 +308,26 @@ class Grid(list):
 						if self.term_index.get(B)[1] != iBs:
 							continue
 						else:
-							self.term_index[A] = (self.term_index.get(B)[0], iAs)
-							self[self.term_index.get(B)[0]][iAs] = A
+							self.place(self.term_index.get(B)[0], iAs, A)
 		else:
 			if A_exist:
 				for A, B in cluster:
 					if self.term_index.get(A) is None:
-						self.glue(True, iAs, len(self[0]), A, iBs, len(self[0]), B)
+						self.glue(True, iAs, self.width(), A, iBs, self.width(), B)
 					else:
 						if self.term_index.get(A)[0] !=  iAs:
 							continue
 						else:
-							self.term_index[B] = (iBs, self.term_index.get(A)[1])
-							self[iBs][self.term_index.get(A)[1]] = B
+							self.place(iBs, self.term_index.get(A)[1], B)
 			else:
 				for A, B in cluster:
 					if self.term_index.get(B) is None:
-						self.glue(True, iAs, len(self[0]), A, iBs, len(self[0]), B)
+						self.glue(True, iAs, self.width(), A, iBs, self.width(), B)
 					else:
 						if self.term_index.get(B)[0] != iBs:
 							continue
 						else:
-							self.term_index[A] = (iAs, self.term_index.get(B)[1])
-							self[iAs][self.term_index.get(B)[1]] = A
+							self.place(iAs, self.term_index.get(B)[1], A)
 
 	def glue(self, expand_row, col_A, row_A, A, col_B, row_B, B):
 		"""
@@ -269,70 +336,118 @@ class Grid(list):
 			2. assign the ratio into the designated indexes
 		"""
 		self.expand(expand_row)
-		self.term_index[A] = (col_A, row_A)	# Update grid index for the term
-		self[col_A][row_A] = A
-		self.term_index[B] = (col_B, row_B)	# Update grid index for the term
-		self[col_B][row_B] = B
+		self.place(col_A, row_A, A)
+		self.place(col_B, row_B, B)
+
+	def place(self, i, j, word):
+		"""
+		Put a word into cell [i,j], update the grid index for the term and keep the count of filled cells.
+		The word is logged if its position changed.
+		"""
+		if self.term_index.get(word) != (i, j): self.placed.append(word)
+		self.term_index[word] = (i, j)
+		if self.matrix[i, j] < 0: self.filled += 1
+		self.matrix[i, j] = self.word_id(word)
 
 	def expand(self, row=True):
 		"""
 		Expand the grid by adding one column or row based on the parameter.
+		The new cells are holes. The matrix is reallocated with double capacity only when it is full.
 		"""
+		capacity_rows, capacity_columns = self.matrix.shape
 		if row:
-			for i in range(len(self)):
-				self[i] += (None, )
+			if self.columns == capacity_columns: capacity_columns *= 2
+			self.columns += 1
 		else:
-			self.append([None] * len(self[0]))
+			if self.length == capacity_rows: capacity_rows *= 2
+			self.length += 1
+		if (capacity_rows, capacity_columns) != self.matrix.shape:
+			matrix = np.full((capacity_rows, capacity_columns), -1, dtype=np.int32)
+			matrix[:self.matrix.shape[0], :self.matrix.shape[1]] = self.matrix
+			self.matrix = matrix
 
 	def set_attributes(self):
 		"""
 		Set the attributes of the grid.
 		"""
-		Attributes = namedtuple('Attributes', ['length', 'width', 'size', 'filled', 'saturation'])
 		length = len(self)
-		width = len(self[0])
+		width = self.width()
 		size = length * width
-		filled_cells = 0
-		for line in self:
-			filled_cells += sum(x is not None for x in line)
+		filled_cells = int(np.count_nonzero(self.matrix[:length, :width] >= 0))
 		saturation = filled_cells/float(size)
 		self.attributes = Attributes(length, width, size, filled_cells, saturation)
 
 	def predictable_words(self):
 		"""
 		Return a set of new word forms generated from holes in the grid.
+		For each hole, the solution of the first equation which has one (see _fill_hole), None if there is none.
 		"""
 		predictable_words = set()
 		self.set_attributes()
 
 		if self.attributes[4] == 1: return	# Complete grid (no holes)
-		for i in range(len(self)):
-			for j in range(len(self[i])):
-				if self[i][j] is None:
-					predictable_words.add(self._fill_hole(i, j))
-				else:
-					continue
+		holes, equations = self.hole_equations()
+		solutions = iter(solvenlg_batch(equations))
+		for hole, number in holes:
+			hole_solutions = [ solution for solution in islice(solutions, number) if solution is not None ]
+			predictable_words.add(hole_solutions[0] if hole_solutions else None)
 		return predictable_words
 
+	def hole_equations(self):
+		"""
+		Equations to fill the holes of the grid:
+		the list of the holes (i, j) with their numbers of equations, and the list of all equations (triples of strings).
+		The equations of hole [i,j] are G[i_masked][j_masked] : G[i][j_masked] :: G[i_masked][j] : x, in the order of _fill_hole.
+		"""
+		matrix = self.matrix[:len(self), :self.width()]
+		filled = matrix >= 0
+		I, J = np.nonzero(~filled)
+		holes, ids = [], []
+		# The masks of the equations of several holes are computed at once: (holes, rows, columns), in chunks of bounded size.
+		step = max(1, __mask_size__ // max(1, matrix.size))
+		for start in range(0, len(I), step):
+			i, j = I[start:start+step], J[start:start+step]
+			masks = filled[np.newaxis, :, :] & filled[i, np.newaxis, :] & filled.T[j, :, np.newaxis]
+			k, i_masked, j_masked = np.nonzero(masks)
+			i, j = i[k], j[k]
+			ids.append(np.stack((matrix[i_masked, j_masked], matrix[i, j_masked], matrix[i_masked, j]), axis=1))
+			holes += zip(zip(I[start:start+step].tolist(), J[start:start+step].tolist()), np.bincount(k, minlength=len(masks)).tolist())
+		# The words are looked up once for all the equations.
+		words = self.words
+		equations = [ (words[a], words[b], words[c]) for a, b, c in np.concatenate(ids).tolist() ] if ids else []
+		return holes, equations
+
+	def fill_all_holes(self, workers=__workers__):
+		"""
+		Solve all the equations of all the holes of the grid.
+		Returns a dictionary: for each hole (i, j), the solutions with the number of equations which give them (votes).
+		With 1 < workers, the equations are solved by a pool of processes.
+
+		>>> grid = Grid([['walk', 'walks', 'walked'], ['talk', 'talks', 'talked'], ['jump', 'jumps', None]])
+		>>> grid.fill_all_holes()
+		{(2, 2): Counter({'jumped': 4})}
+		"""
+		holes, equations = self.hole_equations()
+		return votes(holes, solve_equations(equations, workers))
+
 	def _fill_hole(self, i, j):
 		"""
 		Fill hole [i,j] in the grid by solving analogy
 		"""
 		if __trace__: print('### Filling hole [%d][%d]' % (i, j), file=sys.stderr)
-		for i_masked in range(len(self)):
-			for j_masked in range(len(self[i])):
-				if self[i][j_masked] is not None and \
-					self[i_masked][j] is not None and \
-					self[i_masked][j_masked] is not None:
-					solution = solvenlg(self[i_masked][j_masked], self[i][j_masked], self[i_masked][j])
-					if solution is not None:
-						if __trace__: print('### Solving analogy =>  [%d][%d]:[%d][%d]::[%d][%d]:[%d][%d]' \
-								% (i_masked, j_masked, i, j_masked, i_masked, j, i, j), file=sys.stderr)
-						if __trace__: print('### Solving analogy =>  %s : %s :: %s : %s' \
-								% (self[i_masked][j_masked], self[i][j_masked], self[i_masked][j], solution), file=sys.stderr)
-						return solution
-					else:
-						if __trace__: print('### No luck with this analogy. Finding another equation.', file=sys.stderr)
+		filled = self.matrix[:len(self), :self.width()] >= 0
+		# Cells [i_masked][j_masked] such that [i][j_masked] and [i_masked][j] are also filled.
+		equations = filled & filled[i, :][np.newaxis, :] & filled[:, j][:, np.newaxis]
+		for i_masked, j_masked in np.argwhere(equations).tolist():
+			solution = solvenlg(self.cell(i_masked, j_masked), self.cell(i, j_masked), self.cell(i_masked, j))
+			if solution is not None:
+				if __trace__: print('### Solving analogy =>  [%d][%d]:[%d][%d]::[%d][%d]:[%d][%d]' \
+						% (i_masked, j_masked, i, j_masked, i_masked, j, i, j), file=sys.stderr)
+				if __trace__: print('### Solving analogy =>  %s : %s :: %s : %s' \
+						% (self.cell(i_masked, j_masked), self.cell(i, j_masked), self.cell(i_masked, j), solution), file=sys.stderr)
+				return solution
+			else:
+				if __trace__: print('### No luck with this analogy. Finding another equation.', file=sys.stderr)
 		if __trace__: print('### No solution for this cell.', file=sys.stderr)
 
 	def pretty_print(self):
@@ -341,7 +456,7 @@ class Grid(list):
 		Using ratio symbol as column separator.
 		"""
 		separator = simple_separated_format(NlgSymbols.ratio)
-		s = tabulate(self, tablefmt=separator)
+		s = tabulate(list(self), tablefmt=separator)
 		return s + '\n'
 
 	def __str__(self):
@@ -353,6 +468,71 @@ class Grid(list):
 		
 ###############################################################################
 
+def solve_equations(equations, workers=__workers__, chunk_size=__chunk_size__):
+	"""
+	Solutions of a list of analogical equations (triples of strings), None for no solution.
+	The equations are solved by the C program in one call,
+	or by chunks of chunk_size equations by a pool of processes with 1 < workers
+	(the C program is not reentrant: threads would not run in parallel).
+	"""
+	if workers <= 1 or len(equations) <= chunk_size:
+		return solvenlg_batch(equations)
+	chunks = [ equations[i:i+chunk_size] for i in range(0, len(equations), chunk_size) ]
+	with multiprocessing.Pool(workers) as pool:
+		return [ solution for solutions in pool.imap(solvenlg_batch, chunks) for solution in solutions ]
+
+def votes(holes, solutions):
+	"""
+	Solutions of the equations of each hole, counted (see Grid.hole_equations).
+	"""
+	solutions = iter(solutions)
+	return { hole: Counter( solution for solution in islice(solutions, number) if solution is not None )
+				for hole, number in holes }
+
+###############################################################################
+
+class _InsertionTrial:
+	"""
+	Overlay of a grid, to know the dimensions and the number of filled cells
+	after the insertion of a cluster, without modifying nor copying the grid.
+	Only the cells and the entries of the term index written by the insertion are kept.
+	"""
+
+	def __init__(self, grid):
+		self.grid = grid
+		self.term_index = ChainMap(dict(), grid.term_index)
+		self.cells = dict()
+		self.length, self.columns = len(grid), grid.width()
+		self.filled = grid.filled
+
+	def __len__(self):
+		return self.length
+
+	def width(self):
+		return self.columns
+
+	def cell(self, i, j):
+		if (i, j) in self.cells: return self.cells[(i, j)]
+		if i < len(self.grid) and j < self.grid.width(): return self.grid.cell(i, j)
+		return None
+
+	def place(self, i, j, word):
+		self.term_index[word] = (i, j)
+		if self.cell(i, j) is None: self.filled += 1
+		self.cells[(i, j)] = word
+
+	def expand(self, row=True):
+		if row: self.columns += 1
+		else: self.length += 1
+
+	def saturation(self):
+		return self.filled/float(self.length * self.columns)
+
+	insert = Grid.insert
+	glue = Grid.glue
+
+###############################################################################
+
 class ListOfGrids(list):
 	"""
 	Class for list of analogical grids (Grid).
@@ -376,6 +556,19 @@ class ListOfGrids(list):
 		from nlg.Grid.Words2Grids.nlgclu2grid import nlgclus2grids
 		return cls(nlgclus2grids(clusters, saturation))
 
+	def fill_all_holes(self, workers=__workers__):
+		"""
+		Same as Grid.fill_all_holes for all the grids, in the same order.
+		The equations of all the grids are solved together.
+		"""
+		all_holes, equations = [], []
+		for grid in self:
+			holes, grid_equations = grid.hole_equations()
+			all_holes.append(holes)
+			equations += grid_equations
+		solutions = iter(solve_equations(equations, workers))
+		return [ votes(holes, solutions) for holes in all_holes ]
+
 	def pretty_print(self):
 		"""
 		Give the string representation of the list of grids for HUMAN.
@@ -3,7 +3,9 @@
 
 import sys
 import time
+import heapq
 import argparse
+from collections import defaultdict
 
 from nlg.Cluster.Cluster import Cluster
 from nlg.Grid.Grid import Grid
@@ -14,6 +16,9 @@ from nlg.Grid.Grid import ListOfGrids
 __author__ = 'Fam Rashel <fam.rashel@fuji.waseda.jp>'
 
 __date__, __version__ = '01/05/2016', '1.00' # Creation
+__date__, __version__ = '18/10/2026', '1.01' # iter_grids: index from words to clusters and priority queues by size,
+												# instead of sweeping all remaining clusters until nothing changes.
+__date__, __version__ = '18/10/2026', '1.02' # Words placed by an insertion read from the log of the grid (Grid.placed).
 
 __description__ = 'Build analogical grids from list of analogical clusters ' \
 					'typically produced by nlgclu.py -f simplified or by strnlgclu.py.'
@@ -43,32 +48,78 @@ def read_clusters(file):
 		print('# Building grids with saturation threshold ≥ %.3f...' % __saturation_threshold__, file=sys.stderr)
 	return sorted(clusters, key=len, reverse=True)
 
-def nlgclus2grids(clusters, saturation=__saturation_threshold__):
+def iter_grids(clusters, saturation=__saturation_threshold__):
 	"""
-	Build list of analogical grids from list of analogical clusters.
+	Generator of analogical grids built from a list of analogical clusters.
+	A grid is started with the largest cluster not yet inserted in a grid.
+	Then, the clusters which share a word with the grid are tried, by decreasing sizes.
+	A cluster can be inserted only if some of its words are already in the grid
+	and the result depends only on the positions of its words in the grid:
+	a rejected cluster is tried again only after an insertion which placed one of its words
+	(new in the grid or moved).
+	The clusters rejected because of the saturation threshold are tried again
+	when there are no more candidates, if some cluster was inserted in the meantime.
+	The input list is not modified.
 	"""
-	list_of_grids = ListOfGrids([])
+	clusters = list(clusters)
+	# Index from words to the clusters which contain them.
+	words = [ set(As) | set(Bs) for As, Bs in ( cluster.AB_list() for cluster in clusters ) ]
+	index = defaultdict(list)
+	for number, cluster_words in enumerate(words):
+		for word in cluster_words:
+			index[word].append(number)
+	# Priority queues: by decreasing sizes, then in the order of the list.
+	remaining = [ (-len(cluster), number) for number, cluster in enumerate(clusters) ]
+	heapq.heapify(remaining)
+	inserted = [ False ] * len(clusters)
 	inserted_clu = 0
 	gridnbr = 0
-	while len(clusters) > 0:
+	while remaining:
+		_, number = heapq.heappop(remaining)
+		if inserted[number]: continue
 		grid = Grid([])
-		last_size = 0
-		while last_size != len(clusters) and len(clusters) != 0:
-			last_size = len(clusters)
-			for cluster in clusters:
-				if __trace__: print('### Trying to insert:\n### %s' % (cluster), file=sys.stderr)
-				insertable, position = grid.checkninsert(cluster, saturation)
-				if insertable:
-					clusters.remove(cluster)
-					inserted_clu += 1
-				if __trace__: print('### %s - %s\n%s' % (insertable, position, grid.pretty_print()), file=sys.stderr)
+		candidates, queued, pending = [], set(), set()
+		inserted_since = False
+
+		def retry(numbers):
+			for n in numbers:
+				if not inserted[n] and n not in queued:
+					heapq.heappush(candidates, (-len(clusters[n]), n))
+					queued.add(n)
+
+		retry([ number ])
+		while candidates or (pending and inserted_since):
+			if not candidates:
+				retry(pending)
+				pending.clear()
+				inserted_since = False
+			_, n = heapq.heappop(candidates)
+			queued.discard(n)
+			cluster = clusters[n]
+			if __trace__: print('### Trying to insert:\n### %s' % (cluster), file=sys.stderr)
+			insertable, position = grid.checkninsert(cluster, saturation)
+			if insertable:
+				inserted[n] = True
+				inserted_clu += 1
+				pending.discard(n)
+				inserted_since = True
+				# Only the words placed by the insertion (new in the grid or moved) can make other clusters insertable.
+				placed = set(grid.placed)
+				grid.placed.clear()
+				retry( m for word in placed for m in index[word] )
+			elif saturation != 0 and grid.check(cluster)[0]:
+				pending.add(n)
+			if __trace__: print('### %s - %s\n%s' % (insertable, position, grid.pretty_print()), file=sys.stderr)
 		grid.set_attributes()
-		list_of_grids.append(grid)
 		gridnbr += 1
-		del grid
 		if __verbose__: print('\r## No of grids produced: %d - No of inserted clusters: %d' % (gridnbr, inserted_clu), end=' ', file=sys.stderr)
+		yield grid
 
-	return list_of_grids
+def nlgclus2grids(clusters, saturation=__saturation_threshold__):
+	"""
+	Build list of analogical grids from list of analogical clusters.
+	"""
+	return ListOfGrids(iter_grids(clusters, saturation))
 
 ###############################################################################
 
@@ -114,30 +165,15 @@ def _test():
 
 def main(file=sys.stdin):
 	"""
-	Mainly a copy of nlgclus2grids function w/o holding the constructed grids in the memory.
-	This function is way more inexpensive in memory load.
+	Same as nlgclus2grids, but the grids are output as they are built, not kept in memory.
 	Grid's class objects are expensive!
-	(Need to work on it :p)
 	"""
 	clusters = read_clusters(file)		# Reading clusters
 
 	# grids_words = Set()
 	# grids_predictablewords = Set()
 	gridnbr = 0
-	inserted_clu = 0
-	while len(clusters) > 0:
-		grid = Grid([])
-		last_size = 0
-		while last_size != len(clusters) and len(clusters) != 0:
-			last_size = len(clusters)
-			for cluster in clusters:
-				if __trace__: print('### Trying to insert:\n### %s' % (cluster), file=sys.stderr)
-				insertable, position = grid.checkninsert(cluster, __saturation_threshold__)
-				if insertable:
-					clusters.remove(cluster)
-					inserted_clu += 1
-				if __trace__: print('### %s - %s\n%s' % (insertable, position, grid.pretty_print()), file=sys.stderr)
-		grid.set_attributes()
+	for grid in iter_grids(clusters, __saturation_threshold__):
 		print(grid)
 		gridnbr += 1
 
@@ -156,7 +192,6 @@ def main(file=sys.stdin):
 		# if len(empty_cells) != 0: grids_predictablewords |= empty_cells
 		
 		del grid	# Free the memory
-		if __verbose__: print('\r## No of grids produced: %d - No of inserted clusters: %d' % (gridnbr, inserted_clu), end=' ', file=sys.stderr)
 	
 	# print 'List of words in the grids:'
 	# print grids_words
@@ -1,21 +1,261 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from _fast_distance import init_memo_fast_distance, memo_fast_distance
+import os
+import sys
+import json
+import time
+import bisect
+import argparse
+from multiprocessing.pool import ThreadPool
+import numpy as np
+
+from _distance_matrix import distance_rows_in_buffer
 
 ###############################################################################
 
 __author__ = 'Yves Lepage <yves.lepage@waseda.jp>'
 __date__, __version__ = '29/08/2017', '1.0'			# Creation.
+__date__, __version__ = '18/10/2026', '2.0'			# Rewritten: the upper triangle of the distance matrix of a list of words
+													# is computed by blocks of rows, in parallel (threads, the C program releases the GIL),
+													# into a memory-mapped .npy file (uint8 or uint16) which can be resumed if interrupted.
+													# Optional cutoff: the distances above are stored as cutoff + 1.
+__date__, __version__ = '18/10/2026', '2.1'			# A previous computation with other words or parameters is no more silently overwritten:
+													# ValueError, unless force (option -f).
+__description__ = """Compute the LCS distances between all pairs of words in a list
+into a memory-mapped file, for later look-up (see DistanceCache.set_distance_matrix).
+"""
+
+__verbose__ = False
+
+__block_pairs__ = 1 << 22			# Approximative number of distances in a block of rows.
+
+###############################################################################
+
+def condensed_offset(i, n):
+	"""
+	Position of the distance between words i and i + 1 in the upper triangle in condensed form:
+	the distances of word i with words i + 1 to n - 1 follow.
+
+	>>> [ condensed_offset(i, 4) for i in range(5) ]
+	[0, 3, 5, 6, 6]
+	"""
+	return i * (2 * n - i - 1) // 2
+
+def row_blocks(n, block_pairs=__block_pairs__):
+	"""
+	Split the rows of the upper triangle into blocks (first, last) of about block_pairs distances.
+
+	>>> row_blocks(5, block_pairs=4)
+	[(0, 1), (1, 2), (2, 4)]
+	"""
+	blocks = []
+	first = 0
+	while first < n - 1:
+		last, pairs = first, 0
+		while last < n - 1 and (0 == pairs or pairs + (n - 1 - last) <= block_pairs):
+			pairs += n - 1 - last
+			last += 1
+		blocks.append((first, last))
+		first = last
+	return blocks
+
+def distance_dtype(words, cutoff=None):
+	"""
+	Smallest unsigned integer type for the distances between the words.
+
+	>>> distance_dtype(['a', 'abc']), distance_dtype(['a' * 200]), distance_dtype(['a' * 200], cutoff=10)
+	(<class 'numpy.uint8'>, <class 'numpy.uint16'>, <class 'numpy.uint8'>)
+	"""
+	maximum = 2 * max( (len(word) for word in words), default=0 )
+	if cutoff is not None: maximum = min(maximum, cutoff + 1)
+	if maximum <= np.iinfo(np.uint8).max: return np.uint8
+	if maximum <= np.iinfo(np.uint16).max: return np.uint16
+	return np.uint32
+
+###############################################################################
+
+class DistanceMatrix:
+	"""
+	Upper triangle of the matrix of the LCS distances between the words of a list, in condensed form,
+	stored in a memory-mapped .npy file (path).
+	Two other files are kept along:
+		path + '.words': the words, one per line;
+		path + '.json': the parameters and the blocks of rows already computed (to resume).
+	A computation kept in path is resumed if it was started with the same words and parameters.
+	Otherwise, it is an error, unless force, in which case it is started again from scratch.
+
+	>>> import tempfile
+	>>> path = os.path.join(tempfile.mkdtemp(), 'test.npy')
+	>>> matrix = DistanceMatrix(['dreux', 'radeaux', 'rad'], path, block_pairs=1).compute()
+	>>> matrix.is_complete(), matrix.distance('radeaux', 'dreux'), matrix.distance('rad', 'rad'), matrix.distance('rad', 'x')
+	(True, 4, 0, None)
+	>>> DistanceMatrix.load(path).distance('dreux', 'rad')
+	6
+	>>> DistanceMatrix(['dreux', 'radeaux', 'rad'], path, block_pairs=2)		# doctest: +ELLIPSIS
+	Traceback (most recent call last):
+	...
+	ValueError: ...: distances kept with other parameters (block_pairs: 1 instead of 2)
+	>>> DistanceMatrix(['dreux', 'radeaux'], path, block_pairs=1)		# doctest: +ELLIPSIS
+	Traceback (most recent call last):
+	...
+	ValueError: ...: distances kept for other words (see ....words)
+	>>> DistanceMatrix(['dreux', 'radeaux'], path, block_pairs=1, force=True).compute().distance('radeaux', 'dreux')
+	4
+	"""
+
+	def __init__(self, words, path, cutoff=None, block_pairs=__block_pairs__, force=False):
+		self.words = list(words)
+		self.index = { word: i for i, word in enumerate(self.words) }
+		self.path = path
+		self.cutoff = cutoff
+		n = len(self.words)
+		self.blocks = row_blocks(n, block_pairs)
+		self.firsts = [ first for first, _ in self.blocks ]
+		dtype = distance_dtype(self.words, cutoff)
+		parameters = { 'words': n, 'cutoff': cutoff, 'block_pairs': block_pairs, 'dtype': np.dtype(dtype).name }
+		if not force and self._resumable(parameters):
+			self.matrix = np.lib.format.open_memmap(path, mode='r+')
+			if __verbose__: print('# Resuming: %d blocks out of %d already computed.' % (len(self.done), len(self.blocks)), file=sys.stderr)
+		else:
+			self.matrix = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n * (n - 1) // 2,))
+			with open(path + '.words', 'w') as file:
+				file.write(''.join( '%s\n' % word for word in self.words ))
+			self.done = set()
+			self.parameters = parameters
+			self._save_state()
+
+	def _resumable(self, parameters):
+		# False if there is no previous computation in self.path, ValueError if it cannot be resumed.
+		if not os.path.exists(self.path + '.json'):
+			return False
+		with open(self.path + '.json') as file:
+			state = json.load(file)
+		with open(self.path + '.words') as file:
+			words = [ line.rstrip('\n') for line in file ]
+		if words != self.words:
+			raise ValueError('%s: distances kept for other words (see %s)' % (self.path, self.path + '.words'))
+		if state['parameters'] != parameters:
+			differences = ', '.join( '%s: %s instead of %s' % (key, state['parameters'].get(key), value)
+							for key, value in parameters.items() if state['parameters'].get(key) != value )
+			raise ValueError('%s: distances kept with other parameters (%s)' % (self.path, differences))
+		if not os.path.exists(self.path):
+			raise ValueError('%s: missing file' % self.path)
+		self.parameters = parameters
+		self.done = set(state['done'])
+		return True
+
+	def _save_state(self):
+		# Write to a temporary file, then rename, so that the state is never half written.
+		with open(self.path + '.json.tmp', 'w') as file:
+			json.dump({ 'parameters': self.parameters, 'done': sorted(self.done) }, file)
+		os.replace(self.path + '.json.tmp', self.path + '.json')
+
+	@classmethod
+	def load(cls, path):
+		"""
+		Open an existing distance matrix (possibly incomplete) for look-up.
+		"""
+		self = cls.__new__(cls)
+		with open(path + '.json') as file:
+			state = json.load(file)
+		with open(path + '.words') as file:
+			self.words = [ line.rstrip('\n') for line in file ]
+		self.index = { word: i for i, word in enumerate(self.words) }
+		self.path = path
+		self.parameters = state['parameters']
+		self.cutoff = self.parameters['cutoff']
+		self.blocks = row_blocks(len(self.words), self.parameters['block_pairs'])
+		self.firsts = [ first for first, _ in self.blocks ]
+		self.done = set(state['done'])
+		self.matrix = np.load(path, mmap_mode='r')
+		return self
+
+	def _compute_block(self, b):
+		first, last = self.blocks[b]
+		distances = np.frombuffer(distance_rows_in_buffer(self.words, first, last), dtype=np.intc)
+		if self.cutoff is not None: distances = np.minimum(distances, self.cutoff + 1)
+		n = len(self.words)
+		self.matrix[condensed_offset(first, n):condensed_offset(last, n)] = distances
+		return b
+
+	def compute(self, workers=1):
+		"""
+		Compute the blocks of rows not yet computed, in parallel with several workers.
+		The state is saved after each block, so that an interrupted computation can be resumed.
+		"""
+		todo = [ b for b in range(len(self.blocks)) if b not in self.done ]
+		t1 = time.time()
+		with ThreadPool(max(1, workers)) as pool:
+			for b in pool.imap_unordered(self._compute_block, todo):
+				# The distances should be on disk before the block is recorded as computed.
+				self.matrix.flush()
+				self.done.add(b)
+				self._save_state()
+				if __verbose__: print('\r# Blocks computed: %d/%d (%.2fs)' % (len(self.done), len(self.blocks), time.time() - t1), end='', file=sys.stderr)
+		if __verbose__ and todo: print('', file=sys.stderr)
+		return self
+
+	def is_complete(self):
+		return len(self.done) == len(self.blocks)
+
+	def distance(self, A, B):
+		"""
+		Distance between words A and B,
+		None if a word is not in the list, if the distance was not computed yet or is above the cutoff.
+		"""
+		i, j = self.index.get(A), self.index.get(B)
+		if i is None or j is None: return None
+		if i == j: return 0
+		if j < i: i, j = j, i
+		if bisect.bisect_right(self.firsts, i) - 1 not in self.done: return None
+		d = int(self.matrix[condensed_offset(i, len(self.words)) + j - i - 1])
+		if self.cutoff is not None and self.cutoff < d: return None
+		return d
 
 ###############################################################################
 
-words = open('tmp.wrd').readlines()
+def read_argv():
+	this_version = 'v%s (c) %s %s' % (__version__, __date__.split('/')[2], __author__)
+	this_description = __description__
+	this_usage = """
+	%(prog)s  -o DISTANCES.npy  <  FILE_OF_WORDS
+	"""
+
+	parser = argparse.ArgumentParser(description=this_description, usage=this_usage)
+	parser.add_argument('-o', '--output',
+						action='store', type=str, default='distances.npy',
+						help='file for the distances (default: %(default)s)')
+	parser.add_argument('-c', '--cutoff',
+						action='store', type=int, default=None,
+						help='store the distances above CUTOFF as CUTOFF + 1 (default: no cutoff)')
+	parser.add_argument('-b', '--block-pairs',
+						action='store', type=int, default=__block_pairs__,
+						help='approximative number of distances in a block (default: %(default)s)')
+	parser.add_argument('-j', '--workers',
+						action='store', type=int, default=1,
+						help='number of threads computing blocks (default: %(default)s)')
+	parser.add_argument('-f', '--force',
+						action='store_true', default=False,
+						help='start again from scratch, overwriting a previous computation ' \
+								'(default: resume it, error if it was started with other words or parameters)')
+	parser.add_argument('-V', '--verbose',
+						action='store_true', default=False,
+						help='runs in verbose mode')
+	return parser.parse_args()
 
-d = dict()
-for i1, word1 in enumerate(words):
-	if not word1.startswith('#'):
-		if word1 not in d: d[word1] = dict()
-		init_memo_fast_distance(word1.decode('UTF-8'))
-		for word2 in words[i1+1:]:
-			d[word1][word2] = memo_fast_distance(word2.decode('UTF-8'))
+if __name__ == '__main__':
+	options = read_argv()
+	__verbose__ = options.verbose
+	t1 = time.time()
+	words = [ line.rstrip('\n') for line in sys.stdin if not line.startswith('#') ]
+	try:
+		matrix = DistanceMatrix(words, options.output,
+				cutoff=options.cutoff,
+				block_pairs=options.block_pairs,
+				force=options.force)
+	except ValueError as error:
+		sys.exit('%s; use option -f to start again from scratch.' % error)
+	matrix.compute(workers=options.workers)
+	if __verbose__: print('# %d words, %d distances (%s) in %s. Processing time: %.2fs' % \
+			(len(words), len(matrix.matrix), matrix.matrix.dtype, options.output, time.time() - t1), file=sys.stderr)
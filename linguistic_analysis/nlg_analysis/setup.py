@@ -16,6 +16,15 @@ setup(name = 'nlg',
 					 Extension('_nlgclu',
 						sources = ['nlg/Cluster/Words2Clusters/nlgclu_in_C/nlgclu.i', 'nlg/Cluster/Words2Clusters/nlgclu_in_C/nlgclu.c'],
 						# swig_opts=['-modern', '-new_repr'] # Comment this line if you have newer version of swig
+					),
+					 Extension('_fast_distance',
+						sources = ['nlg/Distance/C/fast_distance.i', 'nlg/Distance/C/fast_distance.c'],
+						extra_compile_args = ['-std=c99']
+					),
+					 Extension('_distance_matrix',
+						sources = ['nlg/Cluster/Words2Clusters/distance_matrix_in_C/distance_matrix.i', 'nlg/Cluster/Words2Clusters/distance_matrix_in_C/distance_matrix.c', 'nlg/Distance/C/fast_distance.c'],
+						include_dirs = ['nlg/Distance/C'],
+						extra_compile_args = ['-std=c99']
 					)],
 	# packages=['nlg'],
 	packages = setuptools.find_packages(),